@@ -182,6 +182,7 @@ class Command(BaseCommand):
                     negotiation = Negotiation.objects.create(
                         buyer=buyer,
                         vehicle=vehicle,
+                        dealer=vehicle.dealer,
                         status=Negotiation.Status.ACTIVE,
                         expires_at=timezone.now() + timedelta(hours=72)
                     )
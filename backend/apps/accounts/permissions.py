@@ -75,12 +75,13 @@ class IsNegotiationParticipant(permissions.BasePermission):
             return False
         
         # Check if user is the buyer
-        if hasattr(obj, 'buyer') and obj.buyer == request.user:
+        if hasattr(obj, 'buyer_id') and obj.buyer_id == request.user.id:
             return True
         
-        # Check if user is the dealer (via vehicle)
-        if hasattr(obj, 'vehicle') and hasattr(obj.vehicle, 'dealer'):
-            if obj.vehicle.dealer.user == request.user:
+        # Check if user is the dealer
+        if hasattr(obj, 'dealer_id'):
+            dealer = getattr(request.user, 'dealer_profile', None)
+            if dealer is not None and obj.dealer_id == dealer.pk:
                 return True
         
         return False
@@ -11,6 +11,10 @@ from core.models import TimeStampedModel
 class DealerMetrics(TimeStampedModel):
     """
     Aggregated metrics for dealer analytics.
+    
+    One row per dealer and day, written by the rollup tasks. Activity
+    counts are for things that happened that day; vehicle counts are a
+    snapshot taken when the row was rolled up.
     """
     dealer = models.ForeignKey(
         Dealer,
@@ -28,8 +32,15 @@ class DealerMetrics(TimeStampedModel):
     offers_received = models.PositiveIntegerField(default=0)
     offers_accepted = models.PositiveIntegerField(default=0)
     offers_rejected = models.PositiveIntegerField(default=0)
+    counter_offers = models.PositiveIntegerField(default=0)
+    
+    # Negotiation metrics
+    negotiations_started = models.PositiveIntegerField(default=0)
+    negotiations_expired = models.PositiveIntegerField(default=0)
+    negotiations_cancelled = models.PositiveIntegerField(default=0)
     
     # Performance metrics
+    dealer_responses = models.PositiveIntegerField(default=0)  # Weight of avg_response_time_hours
     avg_response_time_hours = models.DecimalField(
         max_digits=6,
         decimal_places=2,
@@ -2,11 +2,29 @@
 Analytics Service Layer for CarNegotiate.
 Handles dealer and platform analytics.
 """
-from typing import Dict, List
-from datetime import timedelta
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Sum, F, Q
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
+from django.db.models import (
+    Avg, Count, DecimalField, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+)
+from django.db.models.functions import TruncWeek, TruncMonth
+
+# Additive DealerMetrics columns, summed over a period
+ROLLUP_COUNT_FIELDS = [
+    'vehicles_sold', 'offers_received', 'offers_accepted', 'offers_rejected',
+    'counter_offers', 'negotiations_started', 'negotiations_expired',
+    'negotiations_cancelled', 'dealer_responses', 'total_revenue',
+]
+
+# DealerMetrics columns written by the daily rollup
+ROLLUP_FIELDS = ROLLUP_COUNT_FIELDS + [
+    'total_vehicles', 'active_vehicles', 'avg_response_time_hours',
+    'avg_discount_percentage', 'conversion_rate',
+]
 
 
 class AnalyticsService:
@@ -21,118 +39,88 @@ class AnalyticsService:
     @classmethod
     def get_dealer_overview(cls, dealer, days: int = 30) -> Dict:
         """
-        Get dealer performance overview.
+        Get dealer performance overview for the last `days` days, today included.
+        
+        Past days are summed from the DealerMetrics rollups and only today
+        is computed live. Activity is counted on the day it happened, so a
+        negotiation accepted in the period counts even if it started
+        earlier; inventory and active negotiations are current.
         """
-        from apps.vehicles.models import Vehicle
         from apps.negotiations.models import Negotiation
+        from .models import DealerMetrics
         
-        now = timezone.now()
-        start_date = now - timedelta(days=days)
+        today = timezone.localdate()
+        first_day = today - timedelta(days=days - 1)
         
-        vehicles = Vehicle.objects.filter(dealer=dealer)
-        negotiations = Negotiation.objects.filter(
-            vehicle__dealer=dealer,
-            created_at__gte=start_date
+        # Aliases must not shadow the summed columns
+        sums = DealerMetrics.objects.filter(
+            dealer=dealer, date__gte=first_day, date__lt=today
+        ).aggregate(
+            **{f'{field}__sum': Sum(field) for field in ROLLUP_COUNT_FIELDS},
+            response_hours__sum=Sum(
+                F('avg_response_time_hours') * F('dealer_responses'),
+                output_field=DecimalField()
+            ),
         )
+        totals = {key.removesuffix('__sum'): value or 0 for key, value in sums.items()}
+        
+        live = cls.compute_dealer_metrics(
+            cls._day_bounds(today)[0], timezone.now(), dealer_ids=[dealer.pk]
+        ).get(dealer.pk) or cls._empty_metrics()
+        for field in ROLLUP_COUNT_FIELDS:
+            totals[field] += live[field]
+        if live['dealer_responses']:
+            totals['response_hours'] += live['avg_response_time_hours'] * live['dealer_responses']
+        
+        period_start = cls._day_bounds(first_day)[0]
+        negotiated_vehicles = Negotiation.objects.filter(
+            dealer=dealer, created_at__gte=period_start
+        ).values('vehicle').distinct().count()
+        started = totals['negotiations_started']
+        accepted = totals['offers_accepted']
+        revenue = totals['total_revenue']
+        responses = totals['dealer_responses']
         
-        # Calculate metrics
-        overview = {
+        return {
             'period_days': days,
             
             # Inventory metrics
             'inventory': {
-                'total': vehicles.count(),
-                'active': vehicles.filter(status='active').count(),
-                'pending_sale': vehicles.filter(status='pending_sale').count(),
-                'sold': vehicles.filter(status='sold', sold_at__gte=start_date).count(),
-                'total_value': float(vehicles.filter(
-                    status='active'
-                ).aggregate(Sum('asking_price'))['asking_price__sum'] or 0),
+                'total': live['total_vehicles'],
+                'active': live['active_vehicles'],
+                'pending_sale': live['pending_sale_vehicles'],
+                'sold': totals['vehicles_sold'],
+                'total_value': float(live['active_value']),
             },
             
             # Negotiation metrics
             'negotiations': {
-                'total': negotiations.count(),
-                'active': negotiations.filter(status='active').count(),
-                'accepted': negotiations.filter(status='accepted').count(),
-                'rejected': negotiations.filter(status='rejected').count(),
-                'expired': negotiations.filter(status='expired').count(),
-                'cancelled': negotiations.filter(status='cancelled').count(),
+                'total': started,
+                'active': Negotiation.objects.filter(
+                    dealer=dealer, status=Negotiation.Status.ACTIVE
+                ).count(),
+                'accepted': accepted,
+                'rejected': totals['offers_rejected'],
+                'expired': totals['negotiations_expired'],
+                'cancelled': totals['negotiations_cancelled'],
             },
             
             # Revenue metrics
-            'revenue': cls._calculate_revenue_metrics(dealer, start_date),
+            'revenue': {
+                'total': float(revenue),
+                'deal_count': accepted,
+                'average_deal': float(revenue / accepted) if accepted else 0,
+            },
             
             # Performance metrics
-            'performance': cls._calculate_performance_metrics(dealer, start_date),
-        }
-        
-        return overview
-    
-    @classmethod
-    def _calculate_revenue_metrics(cls, dealer, start_date) -> Dict:
-        """Calculate revenue metrics."""
-        from apps.negotiations.models import Negotiation
-        
-        accepted = Negotiation.objects.filter(
-            vehicle__dealer=dealer,
-            status='accepted',
-            updated_at__gte=start_date
-        )
-        
-        total_revenue = sum(n.accepted_price or 0 for n in accepted)
-        deal_count = accepted.count()
-        
-        return {
-            'total': float(total_revenue),
-            'deal_count': deal_count,
-            'average_deal': float(total_revenue / deal_count) if deal_count > 0 else 0,
-        }
-    
-    @classmethod
-    def _calculate_performance_metrics(cls, dealer, start_date) -> Dict:
-        """Calculate performance metrics."""
-        from apps.negotiations.models import Negotiation, Offer
-        
-        negotiations = Negotiation.objects.filter(
-            vehicle__dealer=dealer,
-            created_at__gte=start_date
-        )
-        
-        total = negotiations.count()
-        accepted = negotiations.filter(status='accepted').count()
-        
-        # Calculate average response time
-        dealer_responses = Offer.objects.filter(
-            negotiation__vehicle__dealer=dealer,
-            offered_by='dealer',
-            created_at__gte=start_date
-        )
-        
-        response_times = []
-        for offer in dealer_responses[:50]:  # Sample
-            prev_offer = Offer.objects.filter(
-                negotiation=offer.negotiation,
-                offered_by='buyer',
-                created_at__lt=offer.created_at
-            ).order_by('-created_at').first()
-            
-            if prev_offer:
-                delta = (offer.created_at - prev_offer.created_at).total_seconds() / 3600
-                response_times.append(delta)
-        
-        avg_response = sum(response_times) / len(response_times) if response_times else 0
-        
-        return {
-            'conversion_rate': round((accepted / total * 100) if total > 0 else 0, 1),
-            'avg_response_hours': round(avg_response, 1),
-            'offers_per_vehicle': round(
-                Offer.objects.filter(
-                    negotiation__vehicle__dealer=dealer,
-                    created_at__gte=start_date
-                ).count() / max(negotiations.values('vehicle').distinct().count(), 1),
-                1
-            ),
+            'performance': {
+                'conversion_rate': round((accepted / started * 100) if started else 0, 1),
+                'avg_response_hours': round(float(totals['response_hours']) / responses, 1) if responses else 0,
+                'offers_per_vehicle': round(
+                    (totals['offers_received'] + totals['counter_offers']) / max(negotiated_vehicles, 1),
+                    1
+                ),
+            },
         }
     
     @classmethod
@@ -140,34 +128,55 @@ class AnalyticsService:
         """
         Get dealer trends over time.
         
+        Past days come from the DealerMetrics rollups; today is computed
+        live and added to its period.
+        
         Args:
             dealer: Dealer to analyze
-            days: Number of days to analyze
+            days: Number of days to analyze, today included
             granularity: 'day', 'week', or 'month'
         """
-        from apps.negotiations.models import Negotiation
+        from .models import DealerMetrics
         
-        now = timezone.now()
-        start_date = now - timedelta(days=days)
+        today = timezone.localdate()
+        first_day = today - timedelta(days=days - 1)
         
         truncator = {
-            'day': TruncDate,
             'week': TruncWeek,
             'month': TruncMonth
-        }.get(granularity, TruncDate)
+        }.get(granularity)
+        period = truncator('date') if truncator else F('date')
         
-        trends = Negotiation.objects.filter(
-            vehicle__dealer=dealer,
-            created_at__gte=start_date
+        rows = DealerMetrics.objects.filter(
+            dealer=dealer, date__gte=first_day, date__lt=today
         ).annotate(
-            period=truncator('created_at')
+            period=period
         ).values('period').annotate(
-            negotiations=Count('id'),
-            accepted=Count('id', filter=Q(status='accepted')),
-            revenue=Sum('accepted_price', filter=Q(status='accepted'))
+            negotiations=Sum('negotiations_started'),
+            accepted=Sum('offers_accepted'),
+            revenue=Sum('total_revenue')
         ).order_by('period')
+        trends = {row['period']: row for row in rows}
         
-        return list(trends)
+        live = cls.compute_dealer_metrics(
+            cls._day_bounds(today)[0], timezone.now(), dealer_ids=[dealer.pk]
+        ).get(dealer.pk)
+        if live:
+            if granularity == 'week':
+                today_period = today - timedelta(days=today.weekday())
+            elif granularity == 'month':
+                today_period = today.replace(day=1)
+            else:
+                today_period = today
+            row = trends.setdefault(
+                today_period,
+                {'period': today_period, 'negotiations': 0, 'accepted': 0, 'revenue': Decimal('0')}
+            )
+            row['negotiations'] += live['negotiations_started']
+            row['accepted'] += live['offers_accepted']
+            row['revenue'] += live['total_revenue']
+        
+        return [trends[key] for key in sorted(trends)]
     
     @classmethod
     def get_vehicle_performance(cls, dealer, limit: int = 10) -> List[Dict]:
@@ -198,6 +207,196 @@ class AnalyticsService:
             for v in vehicles
         ]
     
+    # -------------------------------------------------------------------------
+    # Dealer Metrics Rollup
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def rollup_dealer_metrics(cls, day: date) -> int:
+        """
+        Compute every dealer's metrics for a day and upsert DealerMetrics.
+        
+        Runs a handful of grouped queries whatever the number of dealers
+        (see compute_dealer_metrics); re-running a day overwrites its rows.
+        
+        Returns:
+            Count of rows written
+        """
+        from .models import DealerMetrics
+        
+        start, end = cls._day_bounds(day)
+        metrics = cls.compute_dealer_metrics(start, min(end, timezone.now()))
+        rows = [
+            DealerMetrics(dealer_id=dealer_id, date=day, **{field: values[field] for field in ROLLUP_FIELDS})
+            for dealer_id, values in metrics.items()
+        ]
+        DealerMetrics.objects.bulk_create(
+            rows,
+            batch_size=settings.DEALER_METRICS_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['dealer', 'date'],
+            update_fields=ROLLUP_FIELDS + ['updated_at']
+        )
+        return len(rows)
+    
+    @classmethod
+    def compute_dealer_metrics(
+        cls,
+        start: datetime,
+        end: datetime,
+        dealer_ids: Optional[Iterable] = None
+    ) -> Dict:
+        """
+        Compute DealerMetrics values for activity between start and end.
+        
+        Each source is read with one query grouped by dealer: offers (plus
+        archived offers for old windows), negotiation events, dealer
+        response times and vehicles.
+        
+        Args:
+            start: Window start
+            end: Window end (exclusive)
+            dealer_ids: Optional dealers to restrict to
+            
+        Returns:
+            Dict of dealer id to metric values; dealers with no vehicles
+            and no activity are left out
+        """
+        from apps.negotiations.models import NegotiationEvent, Offer, OfferArchive
+        from apps.vehicles.models import Vehicle
+        
+        EventType = NegotiationEvent.EventType
+        metrics = defaultdict(cls._empty_metrics)
+        
+        def scoped(queryset, dealer_field):
+            if dealer_ids is not None:
+                queryset = queryset.filter(**{f'{dealer_field}__in': list(dealer_ids)})
+            return queryset.order_by().values(dealer_field)
+        
+        # Offers made in the window; older offers may have been archived
+        offer_models = [Offer]
+        if start < timezone.now() - timedelta(days=settings.OFFER_ARCHIVE_AFTER_DAYS):
+            offer_models.append(OfferArchive)
+        for model in offer_models:
+            rows = scoped(
+                model.objects.filter(created_at__gte=start, created_at__lt=end),
+                'negotiation__dealer_id'
+            ).annotate(
+                received=Count('id', filter=Q(offered_by=Offer.OfferedBy.BUYER)),
+                countered=Count('id', filter=Q(offered_by=Offer.OfferedBy.DEALER)),
+            )
+            for row in rows:
+                values = metrics[row['negotiation__dealer_id']]
+                values['offers_received'] += row['received']
+                values['counter_offers'] += row['countered']
+        
+        # Negotiation transitions, counted on the day they happened
+        accepted = Q(event_type=EventType.OFFER_ACCEPTED)
+        asking = F('negotiation__vehicle__asking_price')
+        rows = scoped(
+            NegotiationEvent.objects.filter(
+                created_at__gte=start,
+                created_at__lt=end,
+                event_type__in=[
+                    EventType.STARTED, EventType.OFFER_ACCEPTED, EventType.REJECTED,
+                    EventType.EXPIRED, EventType.CANCELLED,
+                ]
+            ),
+            'negotiation__dealer_id'
+        ).annotate(
+            started=Count('id', filter=Q(event_type=EventType.STARTED)),
+            accepted=Count('id', filter=accepted),
+            rejected=Count('id', filter=Q(event_type=EventType.REJECTED)),
+            expired=Count('id', filter=Q(event_type=EventType.EXPIRED)),
+            cancelled=Count('id', filter=Q(event_type=EventType.CANCELLED)),
+            revenue=Sum('negotiation__accepted_price', filter=accepted),
+            discount=Avg(
+                ExpressionWrapper(
+                    (asking - F('negotiation__accepted_price')) * 100 / asking,
+                    output_field=DecimalField()
+                ),
+                filter=accepted & Q(negotiation__vehicle__asking_price__gt=0)
+            ),
+        )
+        for row in rows:
+            values = metrics[row['negotiation__dealer_id']]
+            values['negotiations_started'] = row['started']
+            values['offers_accepted'] = row['accepted']
+            values['offers_rejected'] = row['rejected']
+            values['negotiations_expired'] = row['expired']
+            values['negotiations_cancelled'] = row['cancelled']
+            values['total_revenue'] = row['revenue'] or Decimal('0')
+            if row['discount'] is not None:
+                values['avg_discount_percentage'] = Decimal(row['discount']).quantize(Decimal('0.01'))
+            if row['started']:
+                values['conversion_rate'] = Decimal(
+                    row['accepted'] * 100 / row['started']
+                ).quantize(Decimal('0.01'))
+        
+        # Dealer offers, timed from the buyer offer before them
+        asked_at = Offer.objects.filter(
+            negotiation=OuterRef('negotiation'),
+            offered_by=Offer.OfferedBy.BUYER,
+            created_at__lt=OuterRef('created_at')
+        ).order_by('-created_at').values('created_at')[:1]
+        rows = scoped(
+            Offer.objects.filter(
+                offered_by=Offer.OfferedBy.DEALER,
+                created_at__gte=start,
+                created_at__lt=end
+            ).annotate(asked_at=Subquery(asked_at)).filter(asked_at__isnull=False),
+            'negotiation__dealer_id'
+        ).annotate(
+            responses=Count('id'),
+            response_time=Avg(ExpressionWrapper(F('created_at') - F('asked_at'), output_field=DurationField())),
+        )
+        for row in rows:
+            values = metrics[row['negotiation__dealer_id']]
+            values['dealer_responses'] = row['responses']
+            values['avg_response_time_hours'] = Decimal(
+                row['response_time'].total_seconds() / 3600
+            ).quantize(Decimal('0.01'))
+        
+        # Inventory snapshot and sales in the window. Vehicle has no sold
+        # timestamp; a sold vehicle's last update is when it was marked sold
+        rows = scoped(Vehicle.objects.all(), 'dealer_id').annotate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            pending_sale=Count('id', filter=Q(status='pending_sale')),
+            sold=Count('id', filter=Q(status='sold', updated_at__gte=start, updated_at__lt=end)),
+            active_value=Sum('asking_price', filter=Q(status='active')),
+        )
+        for row in rows:
+            values = metrics[row['dealer_id']]
+            values['total_vehicles'] = row['total']
+            values['active_vehicles'] = row['active']
+            values['pending_sale_vehicles'] = row['pending_sale']
+            values['vehicles_sold'] = row['sold']
+            values['active_value'] = row['active_value'] or Decimal('0')
+        
+        return dict(metrics)
+    
+    @classmethod
+    def _empty_metrics(cls) -> Dict:
+        """Metric values for a dealer with no activity."""
+        values = {field: 0 for field in ROLLUP_FIELDS}
+        values.update({
+            'avg_response_time_hours': None,
+            'avg_discount_percentage': None,
+            'conversion_rate': None,
+            'total_revenue': Decimal('0'),
+            # Live-only inventory figures, not stored
+            'pending_sale_vehicles': 0,
+            'active_value': Decimal('0'),
+        })
+        return values
+    
+    @classmethod
+    def _day_bounds(cls, day: date):
+        """Start and end of a day in the current time zone."""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, start + timedelta(days=1)
+    
     # -------------------------------------------------------------------------
     # Platform Analytics (Admin)
     # -------------------------------------------------------------------------
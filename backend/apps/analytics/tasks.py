@@ -0,0 +1,40 @@
+"""
+Celery tasks for analytics app.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task
+def rollup_dealer_metrics(days: int = 1):
+    """
+    Roll up every dealer's metrics for the last completed days.
+    Run nightly via Celery Beat; pass days to backfill.
+    
+    Returns:
+        Count of DealerMetrics rows written
+    """
+    from .services import AnalyticsService
+    
+    today = timezone.localdate()
+    return sum(
+        AnalyticsService.rollup_dealer_metrics(today - timedelta(days=offset))
+        for offset in range(days, 0, -1)
+    )
+
+
+@shared_task
+def rollup_dealer_metrics_today():
+    """
+    Refresh today's partial dealer metrics so readers of DealerMetrics stay
+    close to live; the nightly run overwrites it with the full day.
+    Run hourly via Celery Beat.
+    
+    Returns:
+        Count of DealerMetrics rows written
+    """
+    from .services import AnalyticsService
+    
+    return AnalyticsService.rollup_dealer_metrics(timezone.localdate())
@@ -30,7 +30,7 @@ class DealerAnalyticsViewSet(viewsets.ViewSet):
         Query params:
         - days: Number of days to analyze (default: 30)
         """
-        dealer = request.user.dealer
+        dealer = request.user.dealer_profile
         days = int(request.query_params.get('days', 30))
         
         overview = AnalyticsService.get_dealer_overview(dealer, days)
@@ -46,7 +46,7 @@ class DealerAnalyticsViewSet(viewsets.ViewSet):
         - days: Number of days (default: 30)
         - granularity: 'day', 'week', or 'month' (default: 'day')
         """
-        dealer = request.user.dealer
+        dealer = request.user.dealer_profile
         days = int(request.query_params.get('days', 30))
         granularity = request.query_params.get('granularity', 'day')
         
@@ -62,7 +62,7 @@ class DealerAnalyticsViewSet(viewsets.ViewSet):
         Query params:
         - limit: Number of vehicles (default: 10)
         """
-        dealer = request.user.dealer
+        dealer = request.user.dealer_profile
         limit = int(request.query_params.get('limit', 10))
         
         vehicles = AnalyticsService.get_vehicle_performance(dealer, limit)
@@ -3,7 +3,7 @@ Django admin configuration for negotiations app.
 """
 from django.contrib import admin
 
-from .models import Negotiation, Offer
+from .models import Negotiation, NegotiationEvent, Offer, OfferArchive, PricingRule
 
 
 class OfferInline(admin.TabularInline):
@@ -13,6 +13,31 @@ class OfferInline(admin.TabularInline):
     ordering = ['-created_at']
 
 
+class OfferArchiveInline(admin.TabularInline):
+    model = OfferArchive
+    extra = 0
+    can_delete = False
+    readonly_fields = [
+        'amount', 'offered_by', 'message', 'status',
+        'created_at', 'responded_at', 'archived_at'
+    ]
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class NegotiationEventInline(admin.TabularInline):
+    model = NegotiationEvent
+    extra = 0
+    can_delete = False
+    readonly_fields = ['event_type', 'actor', 'payload', 'created_at']
+    ordering = ['id']
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Negotiation)
 class NegotiationAdmin(admin.ModelAdmin):
     list_display = [
@@ -21,18 +46,18 @@ class NegotiationAdmin(admin.ModelAdmin):
     ]
     list_filter = ['status']
     search_fields = ['vehicle__vin', 'buyer__email', 'vehicle__make', 'vehicle__model']
-    readonly_fields = ['created_at', 'updated_at', 'version']
-    inlines = [OfferInline]
+    readonly_fields = ['created_at', 'updated_at', 'offers_archived_at', 'version']
+    inlines = [OfferInline, OfferArchiveInline, NegotiationEventInline]
     
     fieldsets = (
         ('Parties', {
-            'fields': ('vehicle', 'buyer')
+            'fields': ('vehicle', 'dealer', 'buyer')
         }),
         ('Status', {
             'fields': ('status', 'expires_at', 'accepted_price', 'completed_at')
         }),
         ('Metadata', {
-            'fields': ('version', 'created_at', 'updated_at')
+            'fields': ('version', 'offers_archived_at', 'created_at', 'updated_at')
         }),
     )
 
@@ -43,3 +68,14 @@ class OfferAdmin(admin.ModelAdmin):
     list_filter = ['status', 'offered_by']
     search_fields = ['negotiation__vehicle__vin', 'negotiation__buyer__email']
     readonly_fields = ['created_at', 'responded_at']
+
+
+@admin.register(PricingRule)
+class PricingRuleAdmin(admin.ModelAdmin):
+    list_display = [
+        'dealer', 'vehicle', 'is_active', 'auto_accept_percentage',
+        'counter_position', 'reject_below_floor', 'max_auto_counters'
+    ]
+    list_filter = ['is_active', 'reject_below_floor']
+    search_fields = ['dealer__business_name', 'vehicle__vin']
+    raw_id_fields = ['dealer', 'vehicle']
@@ -0,0 +1,92 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.negotiations.simulation import PricingSimulator
+
+
+def _percentages(value):
+    """Parse '90,95,none' into [90.0, 95.0, None]."""
+    result = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        result.append(None if part in ('', 'none', 'off') else float(part))
+    return result
+
+
+class Command(BaseCommand):
+    help = 'Backtest candidate pricing rules against historical offers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dealer', help='Dealer id to restrict the history to')
+        parser.add_argument('--since', help='Only negotiations started on or after YYYY-MM-DD')
+        parser.add_argument(
+            '--accept', type=_percentages, default=[None, 90.0, 95.0, 98.0],
+            help='Comma-separated auto-accept percentages ("none" to disable)'
+        )
+        parser.add_argument(
+            '--counter', type=_percentages, default=[None, 25.0, 50.0, 75.0],
+            help='Comma-separated counter positions between offer and asking ("none" to disable)'
+        )
+        parser.add_argument('--reject-below-floor', action='store_true')
+        parser.add_argument('--max-counters', type=int, default=3)
+        parser.add_argument(
+            '--basis', choices=['asking_price', 'msrp'], default='asking_price',
+            help='Price the accept percentage applies to'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+
+        started = time.monotonic()
+        history = PricingSimulator.load_history(dealer_id=options['dealer'], since=since)
+        loaded = time.monotonic()
+        self.stdout.write(
+            f'Loaded {history.negotiation_count} negotiations and {history.offer_count} offers '
+            f'in {loaded - started:.2f}s'
+        )
+        if not history.negotiation_count:
+            self.stdout.write(self.style.WARNING('No closed negotiations to replay'))
+            return
+
+        rules = PricingSimulator.build_rules(
+            options['accept'],
+            options['counter'],
+            reject_below_floor=options['reject_below_floor'],
+            max_auto_counters=options['max_counters'],
+            accept_basis=options['basis'],
+        )
+        results = PricingSimulator.simulate(history, rules)
+        elapsed = time.monotonic() - loaded
+
+        baseline = results[0]
+        self.stdout.write(
+            f'Baseline: {baseline["baseline_deals"]} deals '
+            f'({baseline["baseline_acceptance_rate"]:.1%}), '
+            f'revenue ${baseline["baseline_revenue"]:,.0f}'
+        )
+        self.stdout.write(
+            f'{"accept%":>8} {"counter":>8} {"deals":>8} {"rate":>7} '
+            f'{"revenue":>15} {"delta":>14} {"auto acc":>9} {"auto ctr":>9} {"ctr lost":>9} '
+            f'{"auto rej":>9}'
+        )
+        for result in sorted(results, key=lambda r: r['revenue'], reverse=True):
+            rule = result['rule']
+            accept = '-' if rule.auto_accept_percentage is None else f'{rule.auto_accept_percentage:g}'
+            counter = '-' if rule.counter_position is None else f'{rule.counter_position:g}'
+            self.stdout.write(
+                f'{accept:>8} {counter:>8} {result["deals"]:>8} '
+                f'{result["acceptance_rate"]:>7.1%} {result["revenue"]:>15,.0f} '
+                f'{result["revenue_delta"]:>+14,.0f} {result["auto_accepted"]:>9} '
+                f'{result["auto_countered"]:>9} {result["counters_refused"]:>9} '
+                f'{result["auto_rejected"]:>9}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Simulated {len(rules)} rules in {elapsed:.2f}s'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('negotiations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NegotiationEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('started', 'Negotiation Started'), ('offer_submitted', 'Offer Submitted'), ('offer_accepted', 'Offer Accepted'), ('rejected', 'Negotiation Rejected'), ('cancelled', 'Negotiation Cancelled'), ('expired', 'Negotiation Expired')], max_length=30)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('negotiation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='negotiations.negotiation')),
+            ],
+            options={
+                'verbose_name': 'negotiation event',
+                'verbose_name_plural': 'negotiation events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['negotiation', 'id'], name='negotiation_negotia_b1cdd3_idx')],
+            },
+        ),
+    ]
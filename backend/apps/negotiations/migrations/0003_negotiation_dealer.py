@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0001_initial'),
+        ('negotiations', '0002_negotiationevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='negotiation',
+            name='dealer',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='negotiations', to='dealers.dealer'),
+        ),
+        migrations.AddIndex(
+            model_name='negotiation',
+            index=models.Index(fields=['dealer', 'status'], name='negotiation_dealer__5b0cfb_idx'),
+        ),
+    ]
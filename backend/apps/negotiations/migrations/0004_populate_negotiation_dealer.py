@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_dealer(apps, schema_editor):
+    """Copy each negotiation's dealer from its vehicle."""
+    Negotiation = apps.get_model('negotiations', 'Negotiation')
+    Vehicle = apps.get_model('vehicles', 'Vehicle')
+    Negotiation.objects.filter(dealer__isnull=True).update(
+        dealer_id=Subquery(
+            Vehicle.objects.filter(pk=OuterRef('vehicle_id')).values('dealer_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('negotiations', '0003_negotiation_dealer'),
+        ('vehicles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_dealer, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('negotiations', '0004_populate_negotiation_dealer'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='negotiation',
+            name='dealer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='negotiations', to='dealers.dealer'),
+        ),
+    ]
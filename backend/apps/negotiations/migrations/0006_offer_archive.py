@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('negotiations', '0005_alter_negotiation_dealer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='negotiation',
+            name='offers_archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='OfferArchive',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('offered_by', models.CharField(choices=[('buyer', 'Buyer'), ('dealer', 'Dealer')], max_length=10)),
+                ('message', models.TextField(blank=True, max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('countered', 'Countered'), ('expired', 'Expired')], max_length=20)),
+                ('responded_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('negotiation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_offers', to='negotiations.negotiation')),
+            ],
+            options={
+                'verbose_name': 'archived offer',
+                'verbose_name_plural': 'archived offers',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['negotiation', '-created_at'], name='negotiation_negotia_1be041_idx')],
+            },
+        ),
+    ]
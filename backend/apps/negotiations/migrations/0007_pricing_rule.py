@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:38
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0001_initial'),
+        ('negotiations', '0006_offer_archive'),
+        ('vehicles', '0003_add_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='is_automatic',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='offerarchive',
+            name='is_automatic',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('auto_accept_percentage', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('counter_position', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('reject_below_floor', models.BooleanField(default=False)),
+                ('max_auto_counters', models.PositiveSmallIntegerField(default=3)),
+                ('dealer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='dealers.dealer')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='vehicles.vehicle')),
+            ],
+            options={
+                'verbose_name': 'pricing rule',
+                'verbose_name_plural': 'pricing rules',
+                'constraints': [models.UniqueConstraint(fields=('dealer', 'vehicle'), name='unique_pricing_rule_per_vehicle'), models.UniqueConstraint(condition=models.Q(('vehicle__isnull', True)), fields=('dealer',), name='unique_default_pricing_rule')],
+            },
+        ),
+    ]
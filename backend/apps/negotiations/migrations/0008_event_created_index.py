@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('negotiations', '0007_pricing_rule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='negotiationevent',
+            index=models.Index(fields=['created_at', 'event_type'], name='negotiation_created_678324_idx'),
+        ),
+    ]
@@ -2,11 +2,13 @@
 Negotiation models for CarNegotiate.
 """
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import F
 from django.utils import timezone
 
 from apps.accounts.models import CustomUser
+from apps.dealers.models import Dealer
 from apps.vehicles.models import Vehicle
 from core.models import TimeStampedModel
 
@@ -34,6 +36,12 @@ class Negotiation(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name='negotiations'
     )
+    # Denormalized from vehicle.dealer so dealer-side lists avoid the vehicle join
+    dealer = models.ForeignKey(
+        Dealer,
+        on_delete=models.PROTECT,
+        related_name='negotiations'
+    )
     
     status = models.CharField(
         max_length=20,
@@ -48,6 +56,8 @@ class Negotiation(TimeStampedModel):
         blank=True
     )
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Set once the offers of a closed negotiation move to OfferArchive
+    offers_archived_at = models.DateTimeField(null=True, blank=True)
     
     # Optimistic locking
     version = models.PositiveIntegerField(default=1)
@@ -58,6 +68,7 @@ class Negotiation(TimeStampedModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'buyer']),
+            models.Index(fields=['dealer', 'status']),
             models.Index(fields=['vehicle', 'status']),
             models.Index(fields=['expires_at']),
         ]
@@ -90,11 +101,6 @@ class Negotiation(TimeStampedModel):
         """Get the pending offer if any."""
         return self.offers.filter(status=Offer.Status.PENDING).first()
     
-    @property
-    def dealer(self):
-        """Get the dealer for this negotiation."""
-        return self.vehicle.dealer
-    
     def reset_expiration(self, hours=None):
         """Reset the expiration time."""
         if hours is None:
@@ -136,6 +142,8 @@ class Offer(TimeStampedModel):
         default=Status.PENDING
     )
     responded_at = models.DateTimeField(null=True, blank=True)
+    # Made by a dealer PricingRule rather than by hand
+    is_automatic = models.BooleanField(default=False)
     
     class Meta:
         verbose_name = 'offer'
@@ -160,3 +168,148 @@ class Offer(TimeStampedModel):
     @property
     def is_from_dealer(self):
         return self.offered_by == self.OfferedBy.DEALER
+
+
+class PricingRule(TimeStampedModel):
+    """
+    Dealer-defined rule for answering buyer offers automatically.
+    
+    A rule without a vehicle is the dealer's default; a vehicle rule
+    overrides it. Each part of the rule is optional, so a dealer can for
+    example only auto-reject offers below the floor price.
+    """
+    dealer = models.ForeignKey(
+        Dealer,
+        on_delete=models.CASCADE,
+        related_name='pricing_rules'
+    )
+    vehicle = models.ForeignKey(
+        Vehicle,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='pricing_rules'
+    )
+    is_active = models.BooleanField(default=True)
+    
+    # Accept offers at or above this percentage of the asking price
+    auto_accept_percentage = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+    # Counter at this point between the offer (0) and the asking price (100)
+    counter_position = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+    reject_below_floor = models.BooleanField(default=False)
+    max_auto_counters = models.PositiveSmallIntegerField(default=3)
+    
+    class Meta:
+        verbose_name = 'pricing rule'
+        verbose_name_plural = 'pricing rules'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dealer', 'vehicle'],
+                name='unique_pricing_rule_per_vehicle'
+            ),
+            models.UniqueConstraint(
+                fields=['dealer'],
+                condition=models.Q(vehicle__isnull=True),
+                name='unique_default_pricing_rule'
+            ),
+        ]
+    
+    def __str__(self):
+        target = self.vehicle or 'all vehicles'
+        return f"Pricing rule for {target} ({self.dealer})"
+
+
+class OfferArchive(models.Model):
+    """
+    Offers of closed negotiations, moved out of the Offer table.
+    
+    Rows keep the original offer id and timestamps so archived history
+    reads exactly like live offers, while the Offer indexes only cover
+    negotiations that can still change.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    negotiation = models.ForeignKey(
+        Negotiation,
+        on_delete=models.CASCADE,
+        related_name='archived_offers'
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    offered_by = models.CharField(max_length=10, choices=Offer.OfferedBy.choices)
+    message = models.TextField(blank=True, max_length=500)
+    status = models.CharField(max_length=20, choices=Offer.Status.choices)
+    responded_at = models.DateTimeField(null=True, blank=True)
+    is_automatic = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'archived offer'
+        verbose_name_plural = 'archived offers'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['negotiation', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Archived ${self.amount} offer by {self.offered_by} on {self.negotiation_id}"
+
+
+class NegotiationEvent(models.Model):
+    """
+    Append-only log of everything that happens in a negotiation.
+    
+    Ids are monotonically increasing, so polling clients only ask for
+    events after the last id they have seen instead of re-fetching the
+    whole negotiation.
+    """
+    
+    class EventType(models.TextChoices):
+        STARTED = 'started', 'Negotiation Started'
+        OFFER_SUBMITTED = 'offer_submitted', 'Offer Submitted'
+        OFFER_ACCEPTED = 'offer_accepted', 'Offer Accepted'
+        REJECTED = 'rejected', 'Negotiation Rejected'
+        CANCELLED = 'cancelled', 'Negotiation Cancelled'
+        EXPIRED = 'expired', 'Negotiation Expired'
+    
+    id = models.BigAutoField(primary_key=True)
+    negotiation = models.ForeignKey(
+        Negotiation,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    event_type = models.CharField(max_length=30, choices=EventType.choices)
+    actor = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'negotiation event'
+        verbose_name_plural = 'negotiation events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['negotiation', 'id']),
+            # Daily dealer metrics rollup
+            models.Index(fields=['created_at', 'event_type']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} on {self.negotiation_id}"
@@ -0,0 +1,77 @@
+"""
+Pricing rule engine for CarNegotiate.
+Decides how a dealer's PricingRule answers a buyer offer.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import NamedTuple, Optional
+
+from django.db.models import F, Q
+
+from .models import PricingRule
+
+
+class PricingDecision(NamedTuple):
+    """Outcome of evaluating a pricing rule against an offer."""
+    action: Optional[str]
+    amount: Optional[Decimal] = None
+
+
+class PricingEngine:
+    """
+    Evaluates dealer pricing rules.
+    Pure decision logic: NegotiationService applies the result.
+    """
+
+    ACCEPT = 'accept'
+    COUNTER = 'counter'
+    REJECT = 'reject'
+
+    @classmethod
+    def get_rule(cls, vehicle) -> Optional[PricingRule]:
+        """Get the active rule for a vehicle, falling back to the dealer default."""
+        return PricingRule.objects.filter(
+            Q(vehicle_id=vehicle.pk) | Q(vehicle__isnull=True),
+            dealer_id=vehicle.dealer_id,
+            is_active=True
+        ).order_by(F('vehicle_id').asc(nulls_last=True)).first()
+
+    @classmethod
+    def evaluate(
+        cls,
+        rule: PricingRule,
+        vehicle,
+        amount: Decimal,
+        auto_counters: int = 0
+    ) -> PricingDecision:
+        """
+        Decide how to answer a buyer offer.
+
+        Args:
+            rule: Pricing rule to apply
+            vehicle: Vehicle being negotiated
+            amount: Buyer's offer amount
+            auto_counters: Automatic counters already made in this negotiation
+
+        Returns:
+            PricingDecision; action is None when the dealer should answer
+        """
+        floor = vehicle.floor_price or Decimal('0')
+        asking = vehicle.asking_price
+
+        if rule.reject_below_floor and amount < floor:
+            return PricingDecision(cls.REJECT)
+
+        if rule.auto_accept_percentage is not None:
+            threshold = max(asking * rule.auto_accept_percentage / 100, floor)
+            if amount >= threshold:
+                return PricingDecision(cls.ACCEPT)
+
+        if rule.counter_position is not None and auto_counters < rule.max_auto_counters:
+            counter = amount + (asking - amount) * rule.counter_position / 100
+            counter = max(counter, floor).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+            if counter <= amount:
+                # Meeting the buyer is at least as good as any counter
+                return PricingDecision(cls.ACCEPT)
+            return PricingDecision(cls.COUNTER, counter)
+
+        return PricingDecision(None)
@@ -2,9 +2,10 @@
 Negotiation Serializers for CarNegotiate API.
 """
 from decimal import Decimal
+from django.conf import settings
 from rest_framework import serializers
 from apps.vehicles.models import Vehicle
-from .models import Negotiation, Offer
+from .models import Negotiation, NegotiationEvent, Offer, PricingRule
 
 
 class OfferSerializer(serializers.ModelSerializer):
@@ -18,9 +19,19 @@ class OfferSerializer(serializers.ModelSerializer):
         model = Offer
         fields = [
             'id', 'amount', 'offered_by', 'offered_by_display',
-            'message', 'status', 'created_at', 'responded_at'
+            'message', 'status', 'is_automatic', 'created_at', 'responded_at'
         ]
-        read_only_fields = ['id', 'status', 'created_at', 'responded_at']
+        read_only_fields = ['id', 'status', 'is_automatic', 'created_at', 'responded_at']
+
+
+class NegotiationEventSerializer(serializers.ModelSerializer):
+    """Serializer for negotiation event log entries."""
+    seq = serializers.IntegerField(source='id', read_only=True)
+    
+    class Meta:
+        model = NegotiationEvent
+        fields = ['seq', 'event_type', 'payload', 'created_at']
+        read_only_fields = fields
 
 
 class VehicleMiniSerializer(serializers.Serializer):
@@ -88,7 +99,7 @@ class NegotiationListSerializer(serializers.ModelSerializer):
         
         if user == obj.buyer:
             # User is buyer, show dealer name
-            return obj.vehicle.dealer.business_name
+            return obj.dealer.business_name
         else:
             # User is dealer, show buyer name
             return obj.buyer.get_full_name() or obj.buyer.email
@@ -100,7 +111,7 @@ class NegotiationListSerializer(serializers.ModelSerializer):
         
         if user == obj.buyer:
             return 'buyer'
-        elif hasattr(obj.vehicle, 'dealer') and user == obj.vehicle.dealer.user:
+        elif user.id == obj.dealer.user_id:
             return 'dealer'
         return None
     
@@ -117,7 +128,7 @@ class NegotiationListSerializer(serializers.ModelSerializer):
             return False
         
         is_buyer = user == obj.buyer
-        is_dealer = hasattr(obj.vehicle, 'dealer') and user == obj.vehicle.dealer.user
+        is_dealer = user.id == obj.dealer.user_id
         
         # If last offer was from buyer, it's dealer's turn
         if pending.offered_by == 'buyer' and is_dealer:
@@ -132,7 +143,7 @@ class NegotiationListSerializer(serializers.ModelSerializer):
 class NegotiationDetailSerializer(serializers.ModelSerializer):
     """Full serializer for negotiation detail view."""
     vehicle = VehicleMiniSerializer(read_only=True)
-    offers = OfferSerializer(many=True, read_only=True)
+    offers = serializers.SerializerMethodField()
     can_accept = serializers.SerializerMethodField()
     can_counter = serializers.SerializerMethodField()
     can_cancel = serializers.SerializerMethodField()
@@ -149,45 +160,47 @@ class NegotiationDetailSerializer(serializers.ModelSerializer):
             'my_role', 'other_party'
         ]
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._actions_cache = {}
+    
+    def get_offers(self, obj):
+        # Closed negotiations may have part of their history in the archive
+        offers = list(obj.offers.all())
+        if obj.offers_archived_at:
+            offers.extend(obj.archived_offers.all())
+            offers.sort(key=lambda offer: offer.created_at, reverse=True)
+        return OfferSerializer(offers, many=True).data
+    
+    def _get_actions(self, obj):
+        """Compute the user's available actions once per negotiation."""
+        if obj.pk not in self._actions_cache:
+            from .state_machine import NegotiationStateMachine
+            user = self.context.get('request').user if self.context.get('request') else None
+            self._actions_cache[obj.pk] = (
+                NegotiationStateMachine.get_available_actions(obj, user) if user else []
+            )
+        return self._actions_cache[obj.pk]
+    
     def get_can_accept(self, obj):
-        from .state_machine import NegotiationStateMachine
-        user = self.context.get('request').user if self.context.get('request') else None
-        if not user:
-            return False
-        actions = NegotiationStateMachine.get_available_actions(obj, user)
-        return 'accept' in actions
+        return 'accept' in self._get_actions(obj)
     
     def get_can_counter(self, obj):
-        from .state_machine import NegotiationStateMachine
-        user = self.context.get('request').user if self.context.get('request') else None
-        if not user:
-            return False
-        actions = NegotiationStateMachine.get_available_actions(obj, user)
-        return 'counter_offer' in actions
+        return 'counter_offer' in self._get_actions(obj)
     
     def get_can_cancel(self, obj):
-        from .state_machine import NegotiationStateMachine
-        user = self.context.get('request').user if self.context.get('request') else None
-        if not user:
-            return False
-        actions = NegotiationStateMachine.get_available_actions(obj, user)
-        return 'cancel' in actions
+        return 'cancel' in self._get_actions(obj)
     
     def get_can_reject(self, obj):
-        from .state_machine import NegotiationStateMachine
-        user = self.context.get('request').user if self.context.get('request') else None
-        if not user:
-            return False
-        actions = NegotiationStateMachine.get_available_actions(obj, user)
-        return 'reject' in actions
+        return 'reject' in self._get_actions(obj)
     
     def get_my_role(self, obj):
         user = self.context.get('request').user if self.context.get('request') else None
         if not user:
             return None
-        if user == obj.buyer:
+        if user.id == obj.buyer_id:
             return 'buyer'
-        elif hasattr(obj.vehicle, 'dealer') and user == obj.vehicle.dealer.user:
+        elif user.id == obj.dealer.user_id:
             return 'dealer'
         return None
     
@@ -196,9 +209,9 @@ class NegotiationDetailSerializer(serializers.ModelSerializer):
         if not user:
             return None
         
-        if user == obj.buyer:
+        if user.id == obj.buyer_id:
             # Show dealer info
-            dealer = obj.vehicle.dealer
+            dealer = obj.dealer
             return {
                 'name': dealer.business_name,
                 'type': 'dealer',
@@ -283,3 +296,75 @@ class AcceptOfferSerializer(serializers.Serializer):
 class RejectNegotiationSerializer(serializers.Serializer):
     """Serializer for rejecting negotiations."""
     reason = serializers.CharField(max_length=500, required=False, allow_blank=True)
+
+
+class BulkActionItemSerializer(serializers.Serializer):
+    """One action in a bulk dealer request."""
+    negotiation_id = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=['reject', 'counter'])
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    message = serializers.CharField(max_length=500, required=False, allow_blank=True)
+    reason = serializers.CharField(max_length=500, required=False, allow_blank=True)
+    
+    def validate(self, data):
+        if data['action'] == 'counter':
+            if data.get('amount') is None:
+                raise serializers.ValidationError({'amount': "Required for counter actions"})
+            if data['amount'] <= 0:
+                raise serializers.ValidationError({'amount': "Amount must be positive"})
+        return data
+
+
+class BulkNegotiationActionSerializer(serializers.Serializer):
+    """Serializer for bulk dealer actions on negotiations."""
+    actions = BulkActionItemSerializer(many=True, allow_empty=False)
+    
+    def validate_actions(self, value):
+        if len(value) > settings.NEGOTIATION_BULK_MAX_ACTIONS:
+            raise serializers.ValidationError(
+                f"At most {settings.NEGOTIATION_BULK_MAX_ACTIONS} actions per request"
+            )
+        ids = [item['negotiation_id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each negotiation may appear only once")
+        return value
+
+
+class PricingRuleSerializer(serializers.ModelSerializer):
+    """Serializer for dealer pricing rules."""
+    vehicle_id = serializers.PrimaryKeyRelatedField(
+        source='vehicle',
+        queryset=Vehicle.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    
+    class Meta:
+        model = PricingRule
+        fields = [
+            'id', 'vehicle_id', 'is_active', 'auto_accept_percentage',
+            'counter_position', 'reject_below_floor', 'max_auto_counters',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate_vehicle_id(self, value):
+        """Dealers can only set rules on their own vehicles."""
+        dealer = self.context['dealer']
+        if value is not None and value.dealer_id != dealer.pk:
+            raise serializers.ValidationError("You can only set rules on your own vehicles")
+        return value
+    
+    def validate(self, data):
+        """One rule per vehicle, plus one dealer-wide default."""
+        dealer = self.context['dealer']
+        vehicle = data.get('vehicle', getattr(self.instance, 'vehicle', None))
+        existing = PricingRule.objects.filter(dealer=dealer, vehicle=vehicle)
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError({
+                'vehicle_id': "A pricing rule already exists for this vehicle"
+                if vehicle else "A default pricing rule already exists"
+            })
+        return data
@@ -4,16 +4,20 @@ Encapsulates all negotiation business logic in a testable service class.
 """
 from decimal import Decimal
 from datetime import timedelta
-from typing import Optional
+from typing import List, Optional
 
-from django.db import transaction
-from django.db.models import F
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Prefetch, Q, Value, When
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import APIException
 
 from apps.vehicles.models import Vehicle
-from .models import Negotiation, Offer
-from .state_machine import NegotiationStateMachine
+from .models import Negotiation, NegotiationEvent, Offer, OfferArchive
+from .pricing import PricingEngine
+from .state_machine import NegotiationStateMachine, VALID_TRANSITIONS
 from .exceptions import (
     VehicleNotAvailable,
     ActiveNegotiationExists,
@@ -24,12 +28,15 @@ from .exceptions import (
     NegotiationExpired,
 )
 from core.exceptions import ConcurrencyError
+from core.realtime import publish_many, publish_to_users
 
 User = get_user_model()
 
 # Default expiration period (72 hours)
 DEFAULT_EXPIRATION_HOURS = 72
 
+STATS_CACHE_KEY = 'negotiation_stats:{user_id}'
+
 
 class NegotiationService:
     """
@@ -90,21 +97,28 @@ class NegotiationService:
         negotiation = Negotiation.objects.create(
             buyer=buyer,
             vehicle=vehicle,
+            dealer_id=vehicle.dealer_id,
             status=Negotiation.Status.ACTIVE,
             expires_at=timezone.now() + timedelta(hours=DEFAULT_EXPIRATION_HOURS)
         )
         
         # 5. Create initial offer
-        Offer.objects.create(
+        offer = Offer.objects.create(
             negotiation=negotiation,
             amount=amount,
             offered_by=Offer.OfferedBy.BUYER,
             message=message,
             status=Offer.Status.PENDING
         )
+        cls._record_event(
+            negotiation, NegotiationEvent.EventType.STARTED, actor=buyer, offer=offer
+        )
         
-        # 6. Send notification to dealer (async)
-        cls._notify_new_offer(negotiation)
+        # 6. Let the dealer's pricing rule answer, otherwise notify the dealer
+        if cls._apply_pricing_rule(negotiation, offer):
+            negotiation.refresh_from_db()
+        else:
+            cls._notify_new_offer(negotiation)
         
         return negotiation
     
@@ -115,7 +129,8 @@ class NegotiationService:
         negotiation: Negotiation,
         user: User,
         amount: Decimal,
-        message: str = ""
+        message: str = "",
+        is_automatic: bool = False
     ) -> Offer:
         """
         Submit a counter-offer in an existing negotiation.
@@ -125,6 +140,7 @@ class NegotiationService:
             user: User making the offer
             amount: Offer amount
             message: Optional message
+            is_automatic: Whether a pricing rule made the offer
             
         Returns:
             Created Offer instance
@@ -177,10 +193,7 @@ class NegotiationService:
             previous_offer.save()
         
         # 6. Determine offered_by
-        is_dealer = (
-            hasattr(negotiation.vehicle, 'dealer') and
-            user == negotiation.vehicle.dealer.user
-        )
+        is_dealer = user.id == negotiation.dealer.user_id
         offered_by = Offer.OfferedBy.DEALER if is_dealer else Offer.OfferedBy.BUYER
         
         # 7. Create new offer
@@ -189,15 +202,22 @@ class NegotiationService:
             amount=amount,
             offered_by=offered_by,
             message=message,
-            status=Offer.Status.PENDING
+            status=Offer.Status.PENDING,
+            is_automatic=is_automatic
         )
         
         # 8. Reset expiration timer
         negotiation.expires_at = timezone.now() + timedelta(hours=DEFAULT_EXPIRATION_HOURS)
         negotiation.save()
+        cls._record_event(
+            negotiation, NegotiationEvent.EventType.OFFER_SUBMITTED, actor=user, offer=offer
+        )
         
-        # 9. Notify other party
-        cls._notify_counter_offer(negotiation, offer)
+        # 9. Let the dealer's pricing rule answer, otherwise notify other party
+        if offered_by == Offer.OfferedBy.BUYER and cls._apply_pricing_rule(negotiation, offer):
+            offer.refresh_from_db()
+        else:
+            cls._notify_counter_offer(negotiation, offer)
         
         return offer
     
@@ -207,6 +227,10 @@ class NegotiationService:
         """
         Accept the current pending offer.
         
+        The negotiation, its sibling negotiations on the same vehicle, their
+        offers and the vehicle are updated with a fixed number of set-based
+        statements, however many buyers were negotiating on the vehicle.
+        
         Args:
             negotiation: Negotiation to accept
             user: User accepting the offer
@@ -219,82 +243,126 @@ class NegotiationService:
             CannotAcceptOwnOffer: If user made the pending offer
             ConcurrencyError: If negotiation was modified concurrently
         """
-        # Get current version for optimistic locking
-        current_version = negotiation.version
-        
         # 1. Validate negotiation is active
         if negotiation.status != Negotiation.Status.ACTIVE:
             raise NegotiationNotActive()
         
         # 2. Get pending offer
-        pending_offer = negotiation.offers.filter(
-            status=Offer.Status.PENDING
-        ).order_by('-created_at').first()
-        
+        pending_offer = NegotiationStateMachine.get_pending_offer(negotiation)
         if not pending_offer:
             raise NegotiationNotActive("No pending offer to accept")
         
         # 3. Validate user is not accepting their own offer
-        is_buyer = user == negotiation.buyer
-        is_dealer = (
-            hasattr(negotiation.vehicle, 'dealer') and
-            user == negotiation.vehicle.dealer.user
-        )
+        is_buyer = user.id == negotiation.buyer_id
+        is_dealer = user.id == negotiation.dealer.user_id
         
-        if pending_offer.offered_by == 'buyer' and is_buyer:
+        if pending_offer.offered_by == Offer.OfferedBy.BUYER and is_buyer:
             raise CannotAcceptOwnOffer()
-        if pending_offer.offered_by == 'dealer' and is_dealer:
+        if pending_offer.offered_by == Offer.OfferedBy.DEALER and is_dealer:
             raise CannotAcceptOwnOffer()
         
-        # 4. Update negotiation with optimistic locking
-        updated = Negotiation.objects.filter(
-            pk=negotiation.pk,
-            version=current_version,
-            status=Negotiation.Status.ACTIVE
-        ).update(
-            status=Negotiation.Status.ACCEPTED,
-            accepted_price=pending_offer.amount,
-            version=F('version') + 1
+        # 4. Accept this negotiation and cancel the other active ones on
+        #    the vehicle in one version-checked statement
+        now = timezone.now()
+        cancelled = cls._close_vehicle_negotiations(
+            negotiation, pending_offer.amount, now
         )
         
-        if not updated:
-            raise ConcurrencyError(
-                "Negotiation was modified by another process. Please refresh."
-            )
-        
-        # 5. Update the offer status
+        # 5. Accept the offer and expire the siblings' pending offers
+        Offer.objects.filter(
+            Q(pk=pending_offer.pk) |
+            Q(negotiation_id__in=[pk for pk, _ in cancelled], status=Offer.Status.PENDING)
+        ).update(
+            status=Case(
+                When(pk=pending_offer.pk, then=Value(Offer.Status.ACCEPTED)),
+                default=Value(Offer.Status.EXPIRED)
+            ),
+            responded_at=now,
+            updated_at=now
+        )
         pending_offer.status = Offer.Status.ACCEPTED
-        pending_offer.responded_at = timezone.now()
-        pending_offer.save()
+        pending_offer.responded_at = now
         
         # 6. Update vehicle status
-        print(f"Updating vehicle {negotiation.vehicle_id} status to pending_sale")
-        from apps.vehicles.models import Vehicle
-        v = Vehicle.objects.get(pk=negotiation.vehicle_id)
-        v.status = Vehicle.Status.PENDING_SALE
-        v.save()
-        print(f"Vehicle {v.id} status saved as {v.status}")
-        
-        # 7. Cancel other active negotiations on this vehicle
-        other_negotiations = Negotiation.objects.filter(
-            vehicle_id=negotiation.vehicle_id,
-            status=Negotiation.Status.ACTIVE
-        ).exclude(pk=negotiation.pk)
-        
-        other_negotiations.update(status=Negotiation.Status.CANCELLED)
-        
-        # 8. Expire pending offers on cancelled negotiations
-        Offer.objects.filter(
-            negotiation__in=other_negotiations,
-            status=Offer.Status.PENDING
-        ).update(status=Offer.Status.EXPIRED)
-        
-        # 9. Notify both parties
-        negotiation.refresh_from_db()
-        cls._notify_offer_accepted(negotiation)
+        Vehicle.objects.filter(pk=negotiation.vehicle_id).update(
+            status=Vehicle.Status.PENDING_SALE,
+            updated_at=now
+        )
+        if 'vehicle' in negotiation._state.fields_cache:
+            negotiation.vehicle.status = Vehicle.Status.PENDING_SALE
+        
+        negotiation.status = Negotiation.Status.ACCEPTED
+        negotiation.accepted_price = pending_offer.amount
+        negotiation.version += 1
+        negotiation.updated_at = now
+        
+        # 7. Record events and notify everyone affected
+        cls._record_event(
+            negotiation, NegotiationEvent.EventType.OFFER_ACCEPTED,
+            actor=user, offer=pending_offer
+        )
+        cls._record_bulk_events(
+            [pk for pk, _ in cancelled], NegotiationEvent.EventType.CANCELLED,
+            payload={'status': Negotiation.Status.CANCELLED, 'reason': 'vehicle_sold'},
+            participants=[
+                (pk, buyer_id, negotiation.dealer.user_id) for pk, buyer_id in cancelled
+            ]
+        )
+        cls._notify_offer_accepted(negotiation, cancelled)
         
         return negotiation
     
+    @classmethod
+    def _close_vehicle_negotiations(cls, negotiation: Negotiation, price, now) -> list:
+        """
+        Mark the negotiation accepted and cancel every other active
+        negotiation on its vehicle with a single UPDATE ... RETURNING.
+        
+        Returns:
+            (negotiation id, buyer id) of each cancelled negotiation
+            
+        Raises:
+            ConcurrencyError: If the negotiation changed since it was read
+        """
+        meta = Negotiation._meta
+        field = meta.get_field
+        sql = (
+            f'UPDATE {connection.ops.quote_name(meta.db_table)} SET '
+            f'status = CASE WHEN id = %s THEN %s ELSE %s END, '
+            f'accepted_price = CASE WHEN id = %s THEN %s ELSE accepted_price END, '
+            f'version = version + 1, updated_at = %s '
+            f'WHERE vehicle_id = %s AND status = %s AND (id <> %s OR version = %s) '
+            f'RETURNING id, buyer_id'
+        )
+        pk = field('id').get_db_prep_value(negotiation.pk, connection)
+        price = field('accepted_price').get_db_prep_save(price, connection)
+        params = [
+            pk, Negotiation.Status.ACCEPTED, Negotiation.Status.CANCELLED,
+            pk, price,
+            field('updated_at').get_db_prep_value(now, connection),
+            field('vehicle').get_db_prep_value(negotiation.vehicle_id, connection),
+            Negotiation.Status.ACTIVE, pk, negotiation.version,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        
+        to_uuid = field('id').to_python
+        accepted = False
+        cancelled = []
+        for row_id, buyer_id in rows:
+            row_id = to_uuid(row_id)
+            if row_id == negotiation.pk:
+                accepted = True
+            else:
+                cancelled.append((row_id, field('buyer').to_python(buyer_id)))
+        
+        if not accepted:
+            raise ConcurrencyError(
+                "Negotiation was modified by another process. Please refresh."
+            )
+        return cancelled
+    
     @classmethod
     @transaction.atomic
     def reject_negotiation(
@@ -319,10 +387,7 @@ class NegotiationService:
             raise NegotiationNotActive()
         
         # Validate user is dealer
-        is_dealer = (
-            hasattr(negotiation.vehicle, 'dealer') and
-            user == negotiation.vehicle.dealer.user
-        )
+        is_dealer = user.id == negotiation.dealer.user_id
         if not is_dealer:
             raise CannotAcceptOwnOffer("Only dealers can reject negotiations")
         
@@ -339,6 +404,11 @@ class NegotiationService:
             pending_offer.responded_at = timezone.now()
             pending_offer.save()
         
+        cls._record_event(
+            negotiation, NegotiationEvent.EventType.REJECTED,
+            actor=user, reason=reason
+        )
+        
         # Notify buyer
         cls._notify_offer_rejected(negotiation, reason)
         
@@ -381,11 +451,80 @@ class NegotiationService:
             responded_at=timezone.now()
         )
         
+        cls._record_event(
+            negotiation, NegotiationEvent.EventType.CANCELLED, actor=buyer
+        )
+        
         # Notify dealer
         cls._notify_negotiation_cancelled(negotiation)
         
         return negotiation
     
+    @classmethod
+    @transaction.atomic
+    def bulk_dealer_actions(cls, user: User, actions: list) -> list:
+        """
+        Reject or counter many of a dealer's negotiations in one transaction.
+        
+        All target rows are locked up front in id order, so overlapping bulk
+        requests cannot deadlock. Each action runs in its own savepoint: a
+        failing item is rolled back and reported without affecting the
+        others. Notifications are saved in bulk after the last action.
+        
+        Args:
+            user: Dealer user
+            actions: Dicts with negotiation_id, action ('reject' or 'counter')
+                and amount/message or reason
+            
+        Returns:
+            One result dict per action, in request order
+        """
+        from apps.notifications.services import NotificationService
+        
+        ids = sorted({item['negotiation_id'] for item in actions})
+        negotiations = {
+            negotiation.pk: negotiation
+            for negotiation in Negotiation.objects.select_for_update(of=('self',)).select_related(
+                'vehicle__dealer__user', 'dealer', 'buyer'
+            ).filter(pk__in=ids, dealer_id=cls._get_dealer_id(user)).order_by('pk')
+        }
+        
+        results = []
+        with NotificationService.batched() as pending:
+            for item in actions:
+                result = {'negotiation_id': str(item['negotiation_id']), 'action': item['action']}
+                negotiation = negotiations.get(item['negotiation_id'])
+                if negotiation is None:
+                    result.update(success=False, error={
+                        'code': 'not_found', 'message': 'Negotiation not found.'
+                    })
+                    results.append(result)
+                    continue
+                
+                mark = len(pending)
+                try:
+                    with transaction.atomic():
+                        if item['action'] == 'reject':
+                            negotiation = cls.reject_negotiation(
+                                negotiation, user, reason=item.get('reason', '')
+                            )
+                        else:
+                            negotiation = cls.submit_offer(
+                                negotiation, user, item['amount'],
+                                message=item.get('message', '')
+                            ).negotiation
+                except APIException as e:
+                    # Drop notifications of the rolled-back action
+                    del pending[mark:]
+                    result.update(success=False, error={
+                        'code': e.get_codes(), 'message': str(e.detail)
+                    })
+                else:
+                    result.update(success=True, status=negotiation.status)
+                results.append(result)
+        
+        return results
+    
     @classmethod
     def expire_negotiations(cls) -> int:
         """
@@ -395,54 +534,410 @@ class NegotiationService:
         Returns:
             Count of expired negotiations
         """
-        # Find and expire active negotiations past expiration
-        expired_count = Negotiation.objects.filter(
-            status=Negotiation.Status.ACTIVE,
-            expires_at__lt=timezone.now()
-        ).update(status=Negotiation.Status.EXPIRED)
+        with transaction.atomic():
+            # Lock active negotiations past expiration, with what the
+            # notifications need
+            expired = list(
+                Negotiation.objects
+                .select_for_update(of=('self',))
+                .select_related('buyer', 'vehicle__dealer__user')
+                .filter(status=Negotiation.Status.ACTIVE, expires_at__lt=timezone.now())
+            )
+            if not expired:
+                return 0
+            expired_ids = [negotiation.pk for negotiation in expired]
+            
+            Negotiation.objects.filter(pk__in=expired_ids).update(
+                status=Negotiation.Status.EXPIRED
+            )
+            
+            # Expire pending offers on those negotiations
+            Offer.objects.filter(
+                negotiation_id__in=expired_ids,
+                status=Offer.Status.PENDING
+            ).update(
+                status=Offer.Status.EXPIRED,
+                responded_at=timezone.now()
+            )
+            
+            cls._record_bulk_events(
+                expired_ids, NegotiationEvent.EventType.EXPIRED,
+                payload={'status': Negotiation.Status.EXPIRED},
+                participants=[
+                    (n.pk, n.buyer_id, n.vehicle.dealer.user_id) for n in expired
+                ]
+            )
+            
+            cls._notify_negotiations_expired(expired)
         
-        # Expire pending offers on those negotiations
-        Offer.objects.filter(
-            negotiation__status=Negotiation.Status.EXPIRED,
-            status=Offer.Status.PENDING
-        ).update(
-            status=Offer.Status.EXPIRED,
-            responded_at=timezone.now()
-        )
+        return len(expired)
+    
+    @classmethod
+    def archive_offers(
+        cls,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Move offers of closed negotiations into OfferArchive.
+        
+        Only negotiations in a terminal state that have not changed for
+        OFFER_ARCHIVE_AFTER_DAYS are archived, one batch per transaction,
+        so the Offer table and its indexes only hold live history.
         
-        return expired_count
+        Args:
+            older_than_days: Override for OFFER_ARCHIVE_AFTER_DAYS
+            batch_size: Override for OFFER_ARCHIVE_BATCH_SIZE
+            
+        Returns:
+            Count of archived offers
+        """
+        if older_than_days is None:
+            older_than_days = settings.OFFER_ARCHIVE_AFTER_DAYS
+        if batch_size is None:
+            batch_size = settings.OFFER_ARCHIVE_BATCH_SIZE
+        
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        terminal = [state.value for state, targets in VALID_TRANSITIONS.items() if not targets]
+        fields = [
+            'id', 'negotiation_id', 'amount', 'offered_by', 'message',
+            'status', 'responded_at', 'is_automatic', 'created_at', 'updated_at'
+        ]
+        
+        archived_count = 0
+        while True:
+            with transaction.atomic():
+                negotiation_ids = list(
+                    Negotiation.objects.select_for_update(skip_locked=True).filter(
+                        status__in=terminal,
+                        offers_archived_at__isnull=True,
+                        updated_at__lt=cutoff
+                    ).values_list('pk', flat=True)[:batch_size]
+                )
+                if not negotiation_ids:
+                    break
+                
+                offers = Offer.objects.filter(negotiation_id__in=negotiation_ids)
+                OfferArchive.objects.bulk_create(
+                    [OfferArchive(**row) for row in offers.values(*fields)],
+                    ignore_conflicts=True
+                )
+                deleted, _ = offers.delete()
+                # update() leaves updated_at alone, so the cutoff still applies
+                Negotiation.objects.filter(pk__in=negotiation_ids).update(
+                    offers_archived_at=timezone.now()
+                )
+                archived_count += deleted
+        
+        return archived_count
     
     @classmethod
     def get_user_negotiations(
         cls,
         user: User,
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        role: Optional[str] = None
     ):
         """
         Get all negotiations for a user (as buyer or dealer).
         
+        Each side is read from its own index (buyer_id / dealer_id) and the
+        two branches are combined with UNION ALL, so no join is needed to
+        decide participation. The result is a combined queryset: it can be
+        counted, sliced and ordered but not filtered further, so apply
+        filters through the arguments.
+        
         Args:
             user: User to get negotiations for
             status_filter: Optional status to filter by
+            role: Optional side to restrict to ('buyer' or 'dealer')
             
         Returns:
             QuerySet of Negotiation
         """
-        from django.db.models import Q
+        if role not in ('buyer', 'dealer'):
+            role = None
+        
+        branches = []
+        if role in (None, 'buyer'):
+            branches.append(Negotiation.objects.filter(buyer_id=user.id))
+        
+        dealer_id = cls._get_dealer_id(user)
+        if role in (None, 'dealer') and dealer_id is not None:
+            # Exclude own-vehicle rows already returned by the buyer branch
+            branches.append(
+                Negotiation.objects.filter(dealer_id=dealer_id).exclude(buyer_id=user.id)
+            )
         
-        # Get negotiations where user is buyer or dealer
-        queryset = Negotiation.objects.filter(
-            Q(buyer=user) | Q(vehicle__dealer__user=user)
-        ).select_related(
-            'vehicle', 'vehicle__dealer', 'buyer'
-        ).prefetch_related('offers').defer(
-            'vehicle__specifications', 'vehicle__features'
-        ).order_by('-created_at')
+        if not branches:
+            return Negotiation.objects.none()
+        
+        branches = [
+            cls._list_queryset(branch, status_filter) for branch in branches
+        ]
+        queryset = branches[0]
+        if len(branches) > 1:
+            queryset = queryset.union(*branches[1:], all=True)
+        
+        return queryset.order_by('-created_at')
+    
+    @classmethod
+    def get_stats(cls, user: User) -> dict:
+        """
+        Get negotiation counts for a user's dashboard.
+        
+        All counts come from a single conditional-aggregate query and are
+        cached per user until one of their negotiations changes state.
+        
+        Returns:
+            Dict of status counts, buyer/dealer splits and "my turn" counts
+        """
+        cache_key = STATS_CACHE_KEY.format(user_id=user.id)
+        stats = cache.get(cache_key)
+        if stats is not None:
+            return stats
+        
+        # Every row is the user's as buyer or, failing that, as dealer
+        as_buyer = Q(buyer_id=user.id)
+        as_dealer = ~as_buyer
+        
+        pending = Offer.objects.filter(
+            negotiation=OuterRef('pk'),
+            status=Offer.Status.PENDING
+        )
+        awaiting_buyer = Exists(pending.filter(offered_by=Offer.OfferedBy.DEALER))
+        awaiting_dealer = Exists(pending.filter(offered_by=Offer.OfferedBy.BUYER))
+        active = Q(status=Negotiation.Status.ACTIVE)
+        
+        aggregates = {
+            'total': Count('pk'),
+            **{
+                value: Count('pk', filter=Q(status=value))
+                for value in Negotiation.Status.values
+            },
+            'as_buyer': Count('pk', filter=as_buyer),
+            'as_dealer': Count('pk', filter=as_dealer),
+            'my_turn_as_buyer': Count('pk', filter=awaiting_buyer & active & as_buyer),
+            'my_turn_as_dealer': Count('pk', filter=awaiting_dealer & active & as_dealer),
+        }
+        stats = cls.get_participant_negotiations(user).order_by().aggregate(**aggregates)
+        stats['my_turn'] = stats['my_turn_as_buyer'] + stats['my_turn_as_dealer']
+        
+        cache.set(cache_key, stats, settings.NEGOTIATION_STATS_CACHE_SECONDS)
+        return stats
+    
+    @classmethod
+    def invalidate_stats(cls, user_ids) -> None:
+        """Drop cached stats for these users once the transaction commits."""
+        keys = [STATS_CACHE_KEY.format(user_id=user_id) for user_id in user_ids if user_id]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+    
+    @classmethod
+    def get_detail_queryset(cls, user: User):
+        """
+        Get the user's negotiations with everything the detail view reads.
         
+        The related rows are loaded in a fixed number of queries regardless
+        of how many offers or vehicle images a negotiation has.
+        """
+        return cls.get_participant_negotiations(user).select_related(
+            'vehicle', 'dealer', 'buyer', 'buyer__profile'
+        ).prefetch_related(
+            Prefetch('offers', queryset=Offer.objects.order_by('-created_at')),
+            'vehicle__images'
+        )
+    
+    @classmethod
+    def get_participant_negotiations(cls, user: User):
+        """
+        Get a filterable queryset of negotiations the user participates in.
+        
+        Used for single-object lookups, where the OR on two indexed columns
+        is cheap and no joins are needed.
+        """
+        condition = Q(buyer_id=user.id)
+        dealer_id = cls._get_dealer_id(user)
+        if dealer_id is not None:
+            condition |= Q(dealer_id=dealer_id)
+        return Negotiation.objects.filter(condition)
+    
+    @classmethod
+    def _list_queryset(cls, queryset, status_filter: Optional[str] = None):
+        """Apply the list projection to one branch of the union (unordered)."""
         if status_filter:
             queryset = queryset.filter(status=status_filter)
+        return queryset.select_related(
+            'vehicle', 'dealer', 'buyer', 'buyer__profile'
+        ).prefetch_related('offers', 'vehicle__images').defer(
+            'vehicle__specifications', 'vehicle__features'
+        ).order_by()
+    
+    @classmethod
+    def _get_dealer_id(cls, user: User):
+        """Get the dealer profile id for a dealer user, or None."""
+        if not user.is_dealer:
+            return None
+        dealer = getattr(user, 'dealer_profile', None)
+        return dealer.pk if dealer else None
+    
+    @classmethod
+    def get_events_since(cls, negotiation: Negotiation, since: int = 0, limit: int = 100):
+        """
+        Get events recorded after the given sequence number.
         
-        return queryset
+        Args:
+            negotiation: Negotiation to read events for
+            since: Last sequence number the client has seen
+            limit: Maximum number of events to return
+            
+        Returns:
+            List of NegotiationEvent, oldest first
+        """
+        return list(
+            NegotiationEvent.objects.filter(
+                negotiation_id=negotiation.pk,
+                id__gt=since
+            ).order_by('id')[:limit]
+        )
+    
+    # -------------------------------------------------------------------------
+    # Pricing Rules
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def _apply_pricing_rule(cls, negotiation: Negotiation, offer: Offer) -> bool:
+        """
+        Answer a buyer offer with the dealer's pricing rule, if one applies.
+        
+        Runs inside the caller's transaction, acting as the dealer through
+        the regular accept/submit/reject paths.
+        
+        Returns:
+            True if the rule answered the offer
+        """
+        vehicle = negotiation.vehicle
+        rule = PricingEngine.get_rule(vehicle)
+        if rule is None:
+            return False
+        
+        auto_counters = negotiation.offers.filter(
+            offered_by=Offer.OfferedBy.DEALER,
+            is_automatic=True
+        ).count()
+        decision = PricingEngine.evaluate(rule, vehicle, offer.amount, auto_counters)
+        dealer_user = negotiation.dealer.user
+        
+        if decision.action == PricingEngine.ACCEPT:
+            cls.accept_offer(negotiation, dealer_user)
+        elif decision.action == PricingEngine.COUNTER:
+            cls.submit_offer(
+                negotiation, dealer_user, decision.amount,
+                message="Automatic counter-offer", is_automatic=True
+            )
+        elif decision.action == PricingEngine.REJECT:
+            cls.reject_negotiation(
+                negotiation, dealer_user,
+                reason="The offer is below the dealer's minimum price."
+            )
+        else:
+            return False
+        return True
+    
+    # -------------------------------------------------------------------------
+    # Event Log Helpers
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def _record_event(
+        cls,
+        negotiation: Negotiation,
+        event_type: str,
+        actor: Optional[User] = None,
+        offer: Optional[Offer] = None,
+        **extra
+    ) -> NegotiationEvent:
+        """Append an event for a negotiation state change."""
+        payload = {'status': negotiation.status, **extra}
+        if offer is not None:
+            payload['offer'] = {
+                'id': str(offer.id),
+                'amount': str(offer.amount),
+                'offered_by': offer.offered_by,
+                'message': offer.message,
+                'status': offer.status,
+                'is_automatic': offer.is_automatic,
+            }
+        if negotiation.accepted_price is not None:
+            payload['accepted_price'] = str(negotiation.accepted_price)
+        if negotiation.status == Negotiation.Status.ACTIVE:
+            payload['expires_at'] = negotiation.expires_at.isoformat()
+        
+        event = NegotiationEvent.objects.create(
+            negotiation=negotiation,
+            event_type=event_type,
+            actor=actor,
+            payload=payload
+        )
+        
+        participants = [negotiation.buyer_id, negotiation.dealer.user_id]
+        cls.invalidate_stats(participants)
+        publish_to_users(
+            participants,
+            'negotiation',
+            cls._event_message(negotiation.pk, event)
+        )
+        return event
+    
+    @classmethod
+    def _record_bulk_events(
+        cls,
+        negotiation_ids,
+        event_type: str,
+        payload: dict,
+        participants: Optional[list] = None
+    ):
+        """
+        Append the same event to many negotiations in one INSERT.
+        
+        participants may pass the (negotiation id, buyer id, dealer user id)
+        rows when the caller already has them, saving a query.
+        """
+        if not negotiation_ids:
+            return
+        events = NegotiationEvent.objects.bulk_create([
+            NegotiationEvent(
+                negotiation_id=negotiation_id,
+                event_type=event_type,
+                payload=payload
+            )
+            for negotiation_id in negotiation_ids
+        ])
+        
+        if participants is None:
+            participants = list(Negotiation.objects.filter(
+                pk__in=negotiation_ids
+            ).values_list('pk', 'buyer_id', 'dealer__user_id'))
+        events_by_negotiation = {event.negotiation_id: event for event in events}
+        cls.invalidate_stats({user_id for row in participants for user_id in row[1:]})
+        publish_many(
+            (
+                [buyer_id, dealer_user_id],
+                'negotiation',
+                cls._event_message(negotiation_id, events_by_negotiation[negotiation_id])
+            )
+            for negotiation_id, buyer_id, dealer_user_id in participants
+        )
+    
+    @classmethod
+    def _event_message(cls, negotiation_id, event: NegotiationEvent) -> dict:
+        """Realtime payload telling clients which negotiation to poll."""
+        return {
+            'negotiation_id': str(negotiation_id),
+            'seq': event.id,
+            'event_type': event.event_type,
+            'status': event.payload.get('status'),
+        }
     
     # -------------------------------------------------------------------------
     # Notification Helpers (delegate to NotificationService)
@@ -473,15 +968,29 @@ class NegotiationService:
             logging.getLogger(__name__).error(f"Failed to send counter-offer notification: {e}")
     
     @classmethod
-    def _notify_offer_accepted(cls, negotiation: Negotiation):
-        """Notify both parties of acceptance."""
+    def _notify_offer_accepted(cls, negotiation: Negotiation, cancelled=()):
+        """Notify both parties of acceptance and the buyers who lost the vehicle."""
         try:
             from apps.notifications.services import NotificationService
-            NotificationService.notify_offer_accepted(negotiation)
+            with NotificationService.batched():
+                NotificationService.notify_offer_accepted(negotiation)
+                NotificationService.notify_vehicle_sold(negotiation.vehicle, cancelled)
         except Exception as e:
             import logging
             logging.getLogger(__name__).error(f"Failed to send offer accepted notification: {e}")
     
+    @classmethod
+    def _notify_negotiations_expired(cls, negotiations: List[Negotiation]):
+        """Notify both parties of every expired negotiation in one batch."""
+        try:
+            from apps.notifications.services import NotificationService
+            with NotificationService.batched():
+                for negotiation in negotiations:
+                    NotificationService.notify_negotiation_expired(negotiation)
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(f"Failed to send expiration notifications: {e}")
+    
     @classmethod
     def _notify_offer_rejected(cls, negotiation: Negotiation, reason: str):
         """Notify buyer of rejection."""
@@ -0,0 +1,244 @@
+"""
+Pricing rule backtesting for CarNegotiate.
+
+Replays historical offers against candidate pricing rules to estimate how
+many deals a rule would have closed and at what revenue. Offers are loaded
+once into NumPy arrays and every rule is evaluated over all offers at once.
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from .models import Negotiation, Offer, OfferArchive
+
+# Statuses counted as a closed deal in the historical baseline
+DEAL_STATUSES = [Negotiation.Status.ACCEPTED, Negotiation.Status.COMPLETED]
+
+
+@dataclass(frozen=True)
+class SimulatedRule:
+    """Candidate rule; mirrors the fields of PricingRule."""
+    auto_accept_percentage: Optional[float] = None
+    counter_position: Optional[float] = None
+    reject_below_floor: bool = False
+    max_auto_counters: int = 3
+    # Price the accept percentage applies to: 'asking_price' or 'msrp'
+    accept_basis: str = 'asking_price'
+
+
+@dataclass
+class OfferHistory:
+    """Column arrays of historical negotiations and their offers."""
+    # Per negotiation
+    asking_price: np.ndarray
+    floor_price: np.ndarray
+    msrp: np.ndarray
+    historical_price: np.ndarray  # accepted price, 0 if no deal
+    willingness: np.ndarray  # highest price the buyer showed they would pay
+    # Per offer, sorted by negotiation then time
+    negotiation_index: np.ndarray
+    amount: np.ndarray
+    is_buyer: np.ndarray
+
+    @property
+    def negotiation_count(self) -> int:
+        return len(self.asking_price)
+
+    @property
+    def offer_count(self) -> int:
+        return len(self.amount)
+
+
+class PricingSimulator:
+    """
+    Backtests pricing rules against historical offers.
+
+    The buyer is assumed to make the same offers as they did historically
+    and to accept an automatic counter-offer only if it does not exceed the
+    highest price they offered or agreed to; a counter above that loses the
+    deal. Negotiations the rule would not have answered keep their
+    historical outcome.
+    """
+
+    # Outcome codes per negotiation
+    MANUAL, ACCEPTED, COUNTERED, REJECTED = 0, 1, 2, 3
+
+    @classmethod
+    def load_history(cls, dealer_id=None, since=None) -> OfferHistory:
+        """
+        Load closed negotiations and their offers (live and archived).
+
+        Args:
+            dealer_id: Optional dealer to restrict to
+            since: Optional datetime; only negotiations started after it
+
+        Returns:
+            OfferHistory
+        """
+        negotiations = Negotiation.objects.exclude(status=Negotiation.Status.ACTIVE)
+        if dealer_id:
+            negotiations = negotiations.filter(dealer_id=dealer_id)
+        if since:
+            negotiations = negotiations.filter(created_at__gte=since)
+
+        rows = list(negotiations.order_by().values_list(
+            'pk', 'status', 'accepted_price',
+            'vehicle__asking_price', 'vehicle__floor_price', 'vehicle__msrp'
+        ).iterator(chunk_size=5000))
+        index = {row[0]: i for i, row in enumerate(rows)}
+
+        asking = np.fromiter((row[3] or 0 for row in rows), dtype=np.float64, count=len(rows))
+        floor = np.fromiter((row[4] or 0 for row in rows), dtype=np.float64, count=len(rows))
+        msrp = np.fromiter((row[5] or 0 for row in rows), dtype=np.float64, count=len(rows))
+        historical = np.fromiter(
+            ((row[2] or 0) if row[1] in DEAL_STATUSES else 0 for row in rows),
+            dtype=np.float64, count=len(rows)
+        )
+
+        offer_rows = []
+        for model in (Offer, OfferArchive):
+            offers = model.objects.filter(negotiation__in=negotiations.values('pk'))
+            offer_rows.extend(offers.order_by().values_list(
+                'negotiation_id', 'created_at', 'amount', 'offered_by'
+            ).iterator(chunk_size=5000))
+
+        n = len(offer_rows)
+        negotiation_index = np.fromiter((index[r[0]] for r in offer_rows), dtype=np.int64, count=n)
+        timestamps = np.fromiter((r[1].timestamp() for r in offer_rows), dtype=np.float64, count=n)
+        amount = np.fromiter((r[2] for r in offer_rows), dtype=np.float64, count=n)
+        is_buyer = np.fromiter(
+            (r[3] == Offer.OfferedBy.BUYER for r in offer_rows), dtype=bool, count=n
+        )
+
+        order = np.lexsort((timestamps, negotiation_index))
+        negotiation_index = negotiation_index[order]
+        amount = amount[order]
+        is_buyer = is_buyer[order]
+
+        willingness = historical.copy()
+        if n:
+            buyer_offers = np.where(is_buyer, amount, 0)
+            np.maximum.at(willingness, negotiation_index, buyer_offers)
+
+        return OfferHistory(
+            asking_price=asking,
+            floor_price=floor,
+            msrp=msrp,
+            historical_price=historical,
+            willingness=willingness,
+            negotiation_index=negotiation_index,
+            amount=amount,
+            is_buyer=is_buyer,
+        )
+
+    @classmethod
+    def simulate(cls, history: OfferHistory, rules: Iterable[SimulatedRule]) -> List[dict]:
+        """
+        Evaluate each rule over the full history.
+
+        Returns:
+            One result dict per rule, with the historical baseline alongside
+        """
+        baseline_deals = int(np.count_nonzero(history.historical_price))
+        baseline_revenue = float(history.historical_price.sum())
+        total = history.negotiation_count
+
+        results = []
+        for rule in rules:
+            price, outcome = cls._replay(history, rule)
+            deals = int(np.count_nonzero(price))
+            revenue = float(price.sum())
+            results.append({
+                'rule': rule,
+                'negotiations': total,
+                'offers': history.offer_count,
+                'deals': deals,
+                'acceptance_rate': deals / total if total else 0.0,
+                'revenue': revenue,
+                'baseline_deals': baseline_deals,
+                'baseline_acceptance_rate': baseline_deals / total if total else 0.0,
+                'baseline_revenue': baseline_revenue,
+                'revenue_delta': revenue - baseline_revenue,
+                'auto_accepted': int(np.count_nonzero(outcome == cls.ACCEPTED)),
+                'auto_countered': int(np.count_nonzero(outcome == cls.COUNTERED)),
+                'counters_refused': int(np.count_nonzero((outcome == cls.COUNTERED) & (price == 0))),
+                'auto_rejected': int(np.count_nonzero(outcome == cls.REJECTED)),
+            })
+        return results
+
+    @classmethod
+    def _replay(cls, history: OfferHistory, rule: SimulatedRule):
+        """Return the simulated deal price and outcome code per negotiation."""
+        idx = history.negotiation_index
+        amount = history.amount
+        floor = history.floor_price[idx]
+        asking = history.asking_price[idx]
+        basis = (history.msrp if rule.accept_basis == 'msrp' else history.asking_price)[idx]
+
+        no = np.zeros(len(amount), dtype=bool)
+        reject = (amount < floor) if rule.reject_below_floor else no
+        if rule.auto_accept_percentage is not None:
+            accept = amount >= np.maximum(basis * rule.auto_accept_percentage / 100, floor)
+        else:
+            accept = no
+        # The first decisive offer settles the negotiation, so no automatic
+        # counter has been made before it
+        if rule.counter_position is not None and rule.max_auto_counters > 0:
+            # Half up, as the engine quantizes with ROUND_HALF_UP
+            counter_price = np.floor(np.maximum(
+                amount + (asking - amount) * rule.counter_position / 100, floor
+            ) + 0.5)
+            # A counter at or below the offer is an accept in the live engine
+            accept = accept | (counter_price <= amount)
+            counter = np.ones(len(amount), dtype=bool)
+        else:
+            counter_price = amount
+            counter = no
+
+        # Same precedence as PricingEngine.evaluate
+        code = np.select(
+            [reject, accept, counter],
+            [cls.REJECTED, cls.ACCEPTED, cls.COUNTERED],
+            default=cls.MANUAL
+        )
+        code = np.where(history.is_buyer, code, cls.MANUAL)
+        # A counter above what the buyer would pay is refused: no deal
+        refused = counter_price > history.willingness[idx]
+        offer_price = np.select(
+            [code == cls.ACCEPTED, (code == cls.COUNTERED) & ~refused], [amount, counter_price], default=0
+        )
+
+        # First decisive offer in each negotiation settles it
+        price = history.historical_price.copy()
+        outcome = np.full(history.negotiation_count, cls.MANUAL, dtype=np.int8)
+        decisive = np.flatnonzero(code != cls.MANUAL)
+        if len(decisive):
+            negotiations, first = np.unique(idx[decisive], return_index=True)
+            first = decisive[first]
+            price[negotiations] = offer_price[first]
+            outcome[negotiations] = code[first]
+        return price, outcome
+
+    @classmethod
+    def build_rules(
+        cls,
+        accept_percentages: Iterable[Optional[float]],
+        counter_positions: Iterable[Optional[float]],
+        reject_below_floor: bool = False,
+        max_auto_counters: int = 3,
+        accept_basis: str = 'asking_price'
+    ) -> List[SimulatedRule]:
+        """Cartesian product of candidate rule parameters."""
+        counter_positions = list(counter_positions)
+        return [
+            SimulatedRule(
+                auto_accept_percentage=accept,
+                counter_position=counter,
+                reject_below_floor=reject_below_floor,
+                max_auto_counters=max_auto_counters,
+                accept_basis=accept_basis,
+            )
+            for accept in accept_percentages
+            for counter in counter_positions
+        ]
@@ -129,17 +129,13 @@ class NegotiationStateMachine:
             return []
         
         actions = []
-        is_buyer = user == negotiation.buyer
-        is_dealer = hasattr(negotiation.vehicle, 'dealer') and \
-                   user == negotiation.vehicle.dealer.user
+        is_buyer = user.id == negotiation.buyer_id
+        is_dealer = user.id == negotiation.dealer.user_id
         
         if not is_buyer and not is_dealer:
             return []
         
-        # Get pending offer
-        pending_offer = negotiation.offers.filter(
-            status='pending'
-        ).order_by('-created_at').first()
+        pending_offer = cls.get_pending_offer(negotiation)
         
         if pending_offer:
             # Determine whose turn it is
@@ -158,6 +154,19 @@ class NegotiationStateMachine:
         
         return actions
     
+    @classmethod
+    def get_pending_offer(cls, negotiation):
+        """
+        Get the latest pending offer, using prefetched offers when present.
+        """
+        prefetched = getattr(negotiation, '_prefetched_objects_cache', {})
+        if 'offers' in prefetched:
+            pending = [o for o in prefetched['offers'] if o.status == 'pending']
+            return max(pending, key=lambda o: o.created_at, default=None)
+        return negotiation.offers.filter(
+            status='pending'
+        ).order_by('-created_at').first()
+    
     @classmethod
     def validate_actor(cls, negotiation, user, action: str) -> bool:
         """
@@ -172,8 +181,7 @@ class NegotiationStateMachine:
             True if user can perform action
         """
         is_buyer = user == negotiation.buyer
-        is_dealer = hasattr(negotiation.vehicle, 'dealer') and \
-                   user == negotiation.vehicle.dealer.user
+        is_dealer = user.id == negotiation.dealer.user_id
         
         if not is_buyer and not is_dealer:
             return False
@@ -249,8 +257,7 @@ class NegotiationStateMachine:
             return user == negotiation.buyer
         
         is_buyer = user == negotiation.buyer
-        is_dealer = hasattr(negotiation.vehicle, 'dealer') and \
-                   user == negotiation.vehicle.dealer.user
+        is_dealer = user.id == negotiation.dealer.user_id
         
         # If last offer was from buyer, dealer responds
         if pending_offer.offered_by == 'buyer':
@@ -79,3 +79,17 @@ def check_expiring_negotiations():
         
         if not warning_exists:
             send_expiration_warning.delay(str(negotiation.id))
+
+
+@shared_task
+def archive_closed_negotiation_offers():
+    """
+    Move offers of long-closed negotiations into the archive table.
+    Run daily via Celery Beat.
+    
+    Returns:
+        Count of archived offers
+    """
+    from .services import NegotiationService
+    
+    return NegotiationService.archive_offers()
@@ -5,6 +5,8 @@ from rest_framework.routers import DefaultRouter
 from . import views
 
 router = DefaultRouter()
+# Registered before the '' prefix so its path isn't read as a negotiation id
+router.register(r'pricing-rules', views.PricingRuleViewSet, basename='pricing-rule')
 router.register(r'', views.NegotiationViewSet, basename='negotiation')
 
 urlpatterns = [
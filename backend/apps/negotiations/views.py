@@ -4,16 +4,20 @@ Complete implementation with all actions.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from apps.vehicles.models import Vehicle
-from apps.accounts.permissions import IsBuyer, IsNegotiationParticipant
-from .models import Negotiation
+from apps.accounts.permissions import IsBuyer, IsDealer, IsNegotiationParticipant
+from .models import Negotiation, PricingRule
 from .services import NegotiationService
 from .serializers import (
     NegotiationListSerializer,
     NegotiationDetailSerializer,
+    NegotiationEventSerializer,
+    PricingRuleSerializer,
+    BulkNegotiationActionSerializer,
     CreateNegotiationSerializer,
     SubmitOfferSerializer,
     AcceptOfferSerializer,
@@ -33,6 +37,8 @@ class NegotiationViewSet(viewsets.ModelViewSet):
     - POST /negotiations/{id}/accept/ - Accept current offer
     - POST /negotiations/{id}/reject/ - Reject negotiation (dealers)
     - POST /negotiations/{id}/cancel/ - Cancel negotiation (buyers)
+    - GET /negotiations/{id}/events/?since=<seq> - Poll for new events
+    - POST /negotiations/bulk/ - Reject or counter many negotiations (dealers)
     """
     queryset = Negotiation.objects.all()
     permission_classes = [IsAuthenticated]
@@ -50,20 +56,48 @@ class NegotiationViewSet(viewsets.ModelViewSet):
             return AcceptOfferSerializer
         elif self.action == 'reject':
             return RejectNegotiationSerializer
+        elif self.action == 'bulk':
+            return BulkNegotiationActionSerializer
         return NegotiationDetailSerializer
     
     def get_permissions(self):
         """Set permissions based on action."""
         if self.action == 'create':
             return [IsAuthenticated(), IsBuyer()]
-        elif self.action in ['retrieve', 'submit_offer', 'accept', 'reject', 'cancel']:
+        elif self.action == 'bulk':
+            return [IsAuthenticated(), IsDealer()]
+        elif self.action in ['retrieve', 'submit_offer', 'accept', 'reject', 'cancel', 'events']:
             return [IsAuthenticated(), IsNegotiationParticipant()]
         return [IsAuthenticated()]
     
     def get_queryset(self):
         """Filter negotiations to only those the user participates in."""
         user = self.request.user
-        return NegotiationService.get_user_negotiations(user)
+        if self.action == 'list':
+            return NegotiationService.get_user_negotiations(
+                user,
+                status_filter=self.request.query_params.get('status'),
+                role=self.request.query_params.get('role')
+            )
+        
+        queryset = NegotiationService.get_participant_negotiations(user)
+        if self.action == 'retrieve':
+            return NegotiationService.get_detail_queryset(user)
+        if self.action == 'events':
+            # Polling only needs enough to check participation
+            return queryset.only('id', 'buyer_id', 'dealer_id')
+        # State changes read offers fresh inside the service
+        return queryset.select_related('vehicle', 'dealer', 'buyer')
+    
+    def _detail_response(self, negotiation, status_code=status.HTTP_200_OK):
+        """Serialize a negotiation after a change, reloaded with detail prefetches."""
+        negotiation = NegotiationService.get_detail_queryset(
+            self.request.user
+        ).get(pk=negotiation.pk)
+        return Response(
+            NegotiationDetailSerializer(negotiation, context={'request': self.request}).data,
+            status=status_code
+        )
     
     def list(self, request):
         """
@@ -74,20 +108,9 @@ class NegotiationViewSet(viewsets.ModelViewSet):
         - status: Filter by status (active, accepted, rejected, etc.)
         - role: Filter by role (buyer, dealer)
         """
+        # Status and role filters are applied per branch in get_queryset()
         queryset = self.get_queryset()
         
-        # Status filter
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Role filter
-        role_filter = request.query_params.get('role')
-        if role_filter == 'buyer':
-            queryset = queryset.filter(buyer=request.user)
-        elif role_filter == 'dealer':
-            queryset = queryset.filter(vehicle__dealer__user=request.user)
-        
         # Pagination
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -135,10 +158,7 @@ class NegotiationViewSet(viewsets.ModelViewSet):
             message=serializer.validated_data.get('message', '')
         )
         
-        return Response(
-            NegotiationDetailSerializer(negotiation, context={'request': request}).data,
-            status=status.HTTP_201_CREATED
-        )
+        return self._detail_response(negotiation, status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'], url_path='submit-offer')
     def submit_offer(self, request, pk=None):
@@ -165,10 +185,7 @@ class NegotiationViewSet(viewsets.ModelViewSet):
         )
         
         # Return updated negotiation
-        negotiation.refresh_from_db()
-        return Response(
-            NegotiationDetailSerializer(negotiation, context={'request': request}).data
-        )
+        return self._detail_response(negotiation)
     
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
@@ -191,9 +208,7 @@ class NegotiationViewSet(viewsets.ModelViewSet):
             user=request.user
         )
         
-        return Response(
-            NegotiationDetailSerializer(negotiation, context={'request': request}).data
-        )
+        return self._detail_response(negotiation)
     
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
@@ -217,9 +232,7 @@ class NegotiationViewSet(viewsets.ModelViewSet):
             reason=serializer.validated_data.get('reason', '')
         )
         
-        return Response(
-            NegotiationDetailSerializer(negotiation, context={'request': request}).data
-        )
+        return self._detail_response(negotiation)
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -235,9 +248,31 @@ class NegotiationViewSet(viewsets.ModelViewSet):
             buyer=request.user
         )
         
-        return Response(
-            NegotiationDetailSerializer(negotiation, context={'request': request}).data
-        )
+        return self._detail_response(negotiation)
+    
+    @action(detail=True, methods=['get'])
+    def events(self, request, pk=None):
+        """
+        GET /negotiations/{id}/events/?since=<seq>
+        
+        Get events recorded after the given sequence number.
+        Clients poll with the last `seq` they received instead of
+        re-fetching the full negotiation.
+        """
+        negotiation = self.get_object()
+        
+        try:
+            since = int(request.query_params.get('since', 0))
+        except (TypeError, ValueError):
+            raise ValidationError({'since': 'Must be an integer sequence number.'})
+        
+        events = NegotiationService.get_events_since(negotiation, since=since)
+        last_seq = events[-1].id if events else since
+        
+        return Response({
+            'events': NegotiationEventSerializer(events, many=True).data,
+            'last_seq': last_seq,
+        })
     
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -246,8 +281,9 @@ class NegotiationViewSet(viewsets.ModelViewSet):
         
         Get only active negotiations requiring attention.
         """
-        queryset = self.get_queryset().filter(
-            status=Negotiation.Status.ACTIVE
+        queryset = NegotiationService.get_user_negotiations(
+            request.user,
+            status_filter=Negotiation.Status.ACTIVE
         )
         serializer = NegotiationListSerializer(
             queryset,
@@ -261,18 +297,70 @@ class NegotiationViewSet(viewsets.ModelViewSet):
         """
         GET /negotiations/stats/
         
-        Get negotiation statistics for the user.
+        Get negotiation statistics for the user: counts per status,
+        buyer/dealer splits and how many negotiations await their response.
         """
-        queryset = self.get_queryset()
+        return Response(NegotiationService.get_stats(request.user))
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        POST /negotiations/bulk/
+        
+        Apply reject/counter actions to many negotiations (dealer only).
+        Each action succeeds or fails on its own.
         
-        stats = {
-            'total': queryset.count(),
-            'active': queryset.filter(status=Negotiation.Status.ACTIVE).count(),
-            'accepted': queryset.filter(status=Negotiation.Status.ACCEPTED).count(),
-            'rejected': queryset.filter(status=Negotiation.Status.REJECTED).count(),
-            'cancelled': queryset.filter(status=Negotiation.Status.CANCELLED).count(),
-            'expired': queryset.filter(status=Negotiation.Status.EXPIRED).count(),
-            'completed': queryset.filter(status=Negotiation.Status.COMPLETED).count(),
+        Request body:
+        {
+            "actions": [
+                {"negotiation_id": "uuid", "action": "reject", "reason": "Sold"},
+                {"negotiation_id": "uuid", "action": "counter", "amount": 34000.00}
+            ]
         }
+        """
+        serializer = BulkNegotiationActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = NegotiationService.bulk_dealer_actions(
+            request.user, serializer.validated_data['actions']
+        )
+        succeeded = sum(1 for result in results if result['success'])
         
-        return Response(stats)
+        return Response({
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+        })
+
+
+class PricingRuleViewSet(viewsets.ModelViewSet):
+    """
+    Dealer pricing rules for answering buyer offers automatically.
+    
+    Endpoints:
+    - GET /negotiations/pricing-rules/ - List dealer's rules
+    - POST /negotiations/pricing-rules/ - Create a rule (omit vehicle_id for the default)
+    - PATCH /negotiations/pricing-rules/{id}/ - Update a rule
+    - DELETE /negotiations/pricing-rules/{id}/ - Delete a rule
+    """
+    serializer_class = PricingRuleSerializer
+    permission_classes = [IsAuthenticated, IsDealer]
+    
+    def get_dealer(self):
+        if not hasattr(self.request.user, 'dealer_profile'):
+            raise PermissionDenied("Only dealers can manage pricing rules")
+        return self.request.user.dealer_profile
+    
+    def get_queryset(self):
+        return PricingRule.objects.filter(
+            dealer=self.get_dealer()
+        ).order_by('-created_at')
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None and self.request.user.is_authenticated:
+            context['dealer'] = self.get_dealer()
+        return context
+    
+    def perform_create(self, serializer):
+        serializer.save(dealer=self.get_dealer())
@@ -3,7 +3,7 @@ Django admin configuration for notifications app.
 """
 from django.contrib import admin
 
-from .models import Notification
+from .models import Notification, NotificationPreference
 
 
 @admin.register(Notification)
@@ -27,3 +27,11 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ['user', 'email_offers', 'email_counter_offers', 'email_accepted',
+                    'email_expiring', 'email_daily_digest', 'push_enabled']
+    search_fields = ['user__email']
+    raw_id_fields = ['user']
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+def mark_queued_emails_pending(apps, schema_editor):
+    """Notifications still waiting in the outbox are delivered under the new status check."""
+    Notification = apps.get_model('notifications', 'Notification')
+    Notification.objects.filter(
+        outbox_entries__dispatched_at__isnull=True,
+        outbox_entries__isnull=False
+    ).update(email_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='email_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('skipped', 'Skipped')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='emailed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_queued_emails_pending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:05
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_email_delivery_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('email_offers', models.BooleanField(default=True)),
+                ('email_counter_offers', models.BooleanField(default=True)),
+                ('email_accepted', models.BooleanField(default=True)),
+                ('email_expiring', models.BooleanField(default=True)),
+                ('email_daily_digest', models.BooleanField(default=False)),
+                ('push_enabled', models.BooleanField(default=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_preference', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'notification preference',
+                'verbose_name_plural': 'notification preferences',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Concat
+
+
+def backfill_action_urls(apps, schema_editor):
+    """Store the link each existing notification resolved to at read time."""
+    Notification = apps.get_model('notifications', 'Notification')
+    # Least specific first, so negotiation links win as they did before
+    Notification.objects.filter(data__has_key='dealer_id').update(action_url='/dealer')
+    Notification.objects.filter(data__has_key='vehicle_id').update(
+        action_url=Concat(Value('/vehicles/'), KT('data__vehicle_id'))
+    )
+    Notification.objects.filter(data__has_key='negotiation_id').update(
+        action_url=Concat(Value('/negotiations/'), KT('data__negotiation_id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_retention_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='action_url',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.RunPython(backfill_action_urls, migrations.RunPython.noop),
+    ]
@@ -24,6 +24,12 @@ class Notification(TimeStampedModel):
         PRICE_DROP = 'price_drop', 'Price Drop Alert'
         VEHICLE_SOLD = 'vehicle_sold', 'Vehicle Sold'
     
+    class EmailStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+        SKIPPED = 'skipped', 'Skipped'
+    
     user = models.ForeignKey(
         CustomUser,
         on_delete=models.CASCADE,
@@ -36,23 +42,130 @@ class Notification(TimeStampedModel):
     title = models.CharField(max_length=200)
     message = models.TextField()
     data = models.JSONField(default=dict, blank=True)  # Flexible payload for frontend
+    action_url = models.CharField(max_length=200, null=True, blank=True)  # Frontend path, set on creation
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
     
+    # Email delivery; blank when the notification is not emailed individually
+    email_status = models.CharField(max_length=10, choices=EmailStatus.choices, blank=True)
+    email_attempts = models.PositiveSmallIntegerField(default=0)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+    email_error = models.CharField(max_length=255, blank=True)
+    
     class Meta:
         verbose_name = 'notification'
         verbose_name_plural = 'notifications'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', '-created_at']),
+            # Retention sweep: only read notifications are indexed
+            models.Index(
+                fields=['created_at'],
+                name='notif_read_created_idx',
+                condition=models.Q(is_read=True)
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.user.email}"
     
+    @staticmethod
+    def build_action_url(data: dict):
+        """Frontend path a notification links to, derived from its payload."""
+        data = data or {}
+        if 'negotiation_id' in data:
+            return f"/negotiations/{data['negotiation_id']}"
+        elif 'vehicle_id' in data:
+            return f"/vehicles/{data['vehicle_id']}"
+        elif 'dealer_id' in data:
+            return "/dealer"
+        return None
+    
     def mark_as_read(self):
         """Mark the notification as read."""
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at', 'updated_at'])
+
+
+class NotificationPreference(TimeStampedModel):
+    """
+    A user's email and push preferences. Users without a row get the
+    field defaults.
+    """
+    
+    # Preference field deciding whether each notification type is emailed;
+    # types not listed are always emailed
+    EMAIL_FIELDS = {
+        'offer_received': 'email_offers',
+        'offer_rejected': 'email_offers',
+        'counter_offer': 'email_counter_offers',
+        'offer_accepted': 'email_accepted',
+        'negotiation_expiring': 'email_expiring',
+        'negotiation_expired': 'email_expiring',
+    }
+    
+    user = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='notification_preference'
+    )
+    email_offers = models.BooleanField(default=True)
+    email_counter_offers = models.BooleanField(default=True)
+    email_accepted = models.BooleanField(default=True)
+    email_expiring = models.BooleanField(default=True)
+    email_daily_digest = models.BooleanField(default=False)
+    push_enabled = models.BooleanField(default=True)
+    
+    class Meta:
+        verbose_name = 'notification preference'
+        verbose_name_plural = 'notification preferences'
+    
+    def __str__(self):
+        return f"Notification preferences for {self.user.email}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Pending delivery of a notification over an external channel.
+
+    Written in the same transaction as the notification so delivery is
+    never enqueued for a row that was rolled back, and never lost if the
+    broker is unavailable at commit time. The relay task hands pending
+    rows to the delivery tasks in batches.
+    """
+    
+    class Channel(models.TextChoices):
+        EMAIL = 'email', 'Email'
+    
+    id = models.BigAutoField(primary_key=True)
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name='outbox_entries'
+    )
+    channel = models.CharField(
+        max_length=20,
+        choices=Channel.choices,
+        default=Channel.EMAIL
+    )
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'notification outbox entry'
+        verbose_name_plural = 'notification outbox'
+        ordering = ['id']
+        indexes = [
+            # Relay scan: only undispatched rows are indexed
+            models.Index(
+                fields=['available_at', 'id'],
+                name='notif_outbox_pending_idx',
+                condition=models.Q(dispatched_at__isnull=True)
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel} for {self.notification_id}"
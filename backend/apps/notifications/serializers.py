@@ -1,18 +1,37 @@
 """
 Notification Serializers for CarNegotiate API.
 """
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, NotificationPreference
+
+
+def format_time_ago(created_at, now) -> str:
+    """Human-readable age of a timestamp relative to now."""
+    seconds = (now - created_at).total_seconds()
+    if seconds < 60:
+        return "Just now"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)}m ago"
+    elif seconds < 86400:
+        return f"{int(seconds // 3600)}h ago"
+    elif seconds < 7 * 86400:
+        return f"{int(seconds // 86400)}d ago"
+    return created_at.strftime("%b %d")
 
 
 class NotificationSerializer(serializers.ModelSerializer):
-    """Serializer for notifications."""
+    """
+    Serializer for notifications.
+    
+    action_url is stored on the notification when it is created; time_ago
+    is measured against a single timestamp taken once per response.
+    """
     type_display = serializers.CharField(
         source='get_notification_type_display',
         read_only=True
     )
     time_ago = serializers.SerializerMethodField()
-    action_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
@@ -21,49 +40,21 @@ class NotificationSerializer(serializers.ModelSerializer):
             'message', 'data', 'is_read', 'read_at',
             'created_at', 'time_ago', 'action_url'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'action_url']
     
     def get_time_ago(self, obj):
         """Get human-readable time ago string."""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        diff = now - obj.created_at
-        
-        if diff < timedelta(minutes=1):
-            return "Just now"
-        elif diff < timedelta(hours=1):
-            minutes = int(diff.total_seconds() / 60)
-            return f"{minutes}m ago"
-        elif diff < timedelta(days=1):
-            hours = int(diff.total_seconds() / 3600)
-            return f"{hours}h ago"
-        elif diff < timedelta(days=7):
-            days = diff.days
-            return f"{days}d ago"
-        else:
-            return obj.created_at.strftime("%b %d")
-    
-    def get_action_url(self, obj):
-        """Get URL for notification action."""
-        data = obj.data or {}
-        
-        if 'negotiation_id' in data:
-            return f"/negotiations/{data['negotiation_id']}"
-        elif 'vehicle_id' in data:
-            return f"/vehicles/{data['vehicle_id']}"
-        elif 'dealer_id' in data:
-            return f"/dealer"
-        
-        return None
+        # The context is shared by every row of a list
+        now = self.context.setdefault('now', timezone.now())
+        return format_time_ago(obj.created_at, now)
 
 
-class NotificationPreferencesSerializer(serializers.Serializer):
+class NotificationPreferencesSerializer(serializers.ModelSerializer):
     """Serializer for notification preferences."""
-    email_offers = serializers.BooleanField(default=True)
-    email_counter_offers = serializers.BooleanField(default=True)
-    email_accepted = serializers.BooleanField(default=True)
-    email_expiring = serializers.BooleanField(default=True)
-    email_daily_digest = serializers.BooleanField(default=False)
-    push_enabled = serializers.BooleanField(default=True)
+    
+    class Meta:
+        model = NotificationPreference
+        fields = [
+            'email_offers', 'email_counter_offers', 'email_accepted',
+            'email_expiring', 'email_daily_digest', 'push_enabled'
+        ]
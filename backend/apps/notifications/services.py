@@ -2,14 +2,106 @@
 Notification Service Layer for CarNegotiate.
 Centralized notification management for all platform events.
 """
-from typing import Optional
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import groupby
+from typing import Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from .models import Notification
+from core.realtime import get_redis, publish_many
+from .models import Notification, NotificationOutbox, NotificationPreference
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+# Notifications buffered by NotificationService.batched(), per thread
+_batch_state = threading.local()
+
+UNREAD_COUNT_KEY = 'notifications:unread:{user_id}'
+
+# Bumped by every counter update, so a recount can tell whether an update
+# landed while it was counting (outside the counter prefix, which is scanned)
+UNREAD_VERSION_KEY = 'notifications:unread-version:{user_id}'
+
+# Types folded into the recipient's unread notification for the same
+# negotiation while offers are traded quickly
+COALESCED_TYPES = {
+    Notification.NotificationType.OFFER_RECEIVED,
+    Notification.NotificationType.COUNTER_OFFER,
+}
+
+PREFERENCES_CACHE_KEY = 'notifications:preferences:{user_id}'
+
+PREFERENCE_FIELDS = [
+    'email_offers', 'email_counter_offers', 'email_accepted',
+    'email_expiring', 'email_daily_digest', 'push_enabled',
+]
+
+# Adjust a counter only if it is loaded (a missing key is recounted on
+# read), never below zero, refreshing its TTL. The version is bumped either
+# way so a recount in progress does not store a count missing this update.
+ADJUST_UNREAD_SCRIPT = """
+redis.call('incr', KEYS[2])
+redis.call('expire', KEYS[2], ARGV[2])
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('incrby', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('set', KEYS[1], 0)
+    value = 0
+end
+redis.call('expire', KEYS[1], ARGV[2])
+return value
+"""
+
+# Set the counter to ARGV[1] only if no update happened since the version
+# ARGV[2] was read before counting. ARGV[4] is NX (seed a missing counter)
+# or XX (recount a loaded one).
+STORE_UNREAD_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '0') ~= ARGV[2] then
+    return 0
+end
+local loaded = redis.call('exists', KEYS[1]) == 1
+if (ARGV[4] == 'NX' and loaded) or (ARGV[4] == 'XX' and not loaded) then
+    return 0
+end
+redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+# Zero a counter and bump its version
+RESET_UNREAD_SCRIPT = """
+redis.call('incr', KEYS[2])
+redis.call('expire', KEYS[2], ARGV[1])
+redis.call('set', KEYS[1], 0, 'EX', ARGV[1])
+return 0
+"""
+
+def _kick_outbox_relay(countdown: int = 0):
+    """Enqueue the outbox relay; the periodic relay run picks up anything missed."""
+    from .tasks import relay_notification_outbox
+    try:
+        relay_notification_outbox.apply_async(countdown=countdown)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue notification outbox relay: {e}")
+
+
+def _kick_debounced_outbox_relay():
+    """Enqueue the outbox relay for when debounced entries fall due."""
+    _kick_outbox_relay(countdown=settings.NOTIFICATION_EMAIL_DEBOUNCE_SECONDS)
+
 
 class NotificationService:
     """
@@ -27,7 +119,16 @@ class NotificationService:
         data: Optional[dict] = None
     ) -> Notification:
         """
-        Create a notification and trigger async delivery.
+        Create a notification and queue it for async delivery.
+        
+        Email delivery goes through the outbox: the entry is written in the
+        caller's transaction and relayed to the broker after commit. No
+        entry is written if the user opted out of this type of email.
+        
+        Offer notifications are coalesced: within NOTIFICATION_COALESCE_SECONDS
+        of the last update, the user's unread notification of the same type
+        for the negotiation is updated instead, and their email is debounced
+        so only the latest state is sent.
         
         Args:
             user: User to notify
@@ -37,22 +138,251 @@ class NotificationService:
             data: Optional metadata dictionary
             
         Returns:
-            Created Notification instance
+            Created or coalesced Notification instance (not yet saved inside
+            batched())
         """
-        notification = Notification.objects.create(
+        coalesced = cls._coalesce(user, notification_type, title, message, data)
+        if coalesced is not None:
+            return coalesced
+        
+        notification = Notification(
             user=user,
             notification_type=notification_type,
             title=title,
             message=message,
-            data=data or {}
+            data=data or {},
+            action_url=Notification.build_action_url(data),
+            email_status=Notification.EmailStatus.PENDING
         )
         
-        # Trigger async email delivery
-        from .tasks import send_notification_email
-        send_notification_email.delay(str(notification.id))
+        pending = getattr(_batch_state, 'pending', None)
+        if pending is not None:
+            pending.append(notification)
+            return notification
+        
+        emailed = cls.filter_email_recipients([notification])
+        notification.save()
+        
+        # Queue email delivery for after commit
+        if emailed:
+            NotificationOutbox.objects.create(
+                notification=notification,
+                available_at=cls._email_available_at(notification_type)
+            )
+            cls.schedule_outbox_relay(debounced=notification_type in COALESCED_TYPES)
+        
+        # Push to connected clients
+        cls.push_notifications([notification])
+        cls.adjust_unread_counts({user.id: 1})
         
         return notification
     
+    @classmethod
+    def create_notifications_bulk(cls, notifications: List[Notification]) -> List[Notification]:
+        """
+        Save unsaved notifications with one insert each for the rows and
+        their outbox entries, and push them in a single pipeline.
+        
+        The relay is scheduled once, so the whole batch reaches the email
+        task as one list of ids. Recipients' preferences are read in one
+        lookup and opted-out emails get no outbox entry. Notifiers with
+        several recipients go through batched() rather than calling this
+        directly.
+        """
+        if not notifications:
+            return []
+        emailed = cls.filter_email_recipients(notifications)
+        Notification.objects.bulk_create(notifications)
+        if emailed:
+            NotificationOutbox.objects.bulk_create([
+                NotificationOutbox(
+                    notification=notification,
+                    available_at=cls._email_available_at(notification.notification_type)
+                )
+                for notification in emailed
+            ])
+            for debounced in {n.notification_type in COALESCED_TYPES for n in emailed}:
+                cls.schedule_outbox_relay(debounced=debounced)
+        cls.push_notifications(notifications)
+        cls.adjust_unread_counts(Counter(notification.user_id for notification in notifications))
+        return notifications
+    
+    @classmethod
+    @contextmanager
+    def batched(cls):
+        """
+        Buffer notifications created in the block and save them in bulk on exit.
+        
+        Yields the buffer so callers can drop entries belonging to work that
+        was rolled back. Nested blocks share the outermost buffer; nothing is
+        saved if the block raises.
+        """
+        pending = getattr(_batch_state, 'pending', None)
+        if pending is not None:
+            yield pending
+            return
+        
+        pending = _batch_state.pending = []
+        try:
+            yield pending
+        finally:
+            _batch_state.pending = None
+        cls.create_notifications_bulk(pending)
+    
+    @classmethod
+    def _coalesce(cls, user, notification_type, title, message, data) -> Optional[Notification]:
+        """
+        Fold a notification into the user's unread one of the same type for
+        the same negotiation, if that was updated within the coalescing window.
+        
+        Its email is pushed back by NOTIFICATION_EMAIL_DEBOUNCE_SECONDS, or
+        queued again if it already went out, so one email carries the latest
+        state. The unread count does not change.
+        
+        Returns:
+            The updated notification, or None if there is none to fold into
+        """
+        negotiation_id = (data or {}).get('negotiation_id')
+        window = settings.NOTIFICATION_COALESCE_SECONDS
+        if notification_type not in COALESCED_TYPES or not negotiation_id or not window:
+            return None
+        
+        now = timezone.now()
+        with transaction.atomic():
+            notification = (
+                Notification.objects
+                .select_for_update()
+                .filter(
+                    user_id=user.pk,
+                    notification_type=notification_type,
+                    is_read=False,
+                    data__negotiation_id=str(negotiation_id),
+                    updated_at__gte=now - timedelta(seconds=window)
+                )
+                .order_by('-updated_at')
+                .first()
+            )
+            if notification is None:
+                return None
+            
+            notification.title = title
+            notification.message = message
+            notification.data = data
+            notification.action_url = Notification.build_action_url(data)
+            update_fields = ['title', 'message', 'data', 'action_url', 'updated_at']
+            
+            send_at = cls._email_available_at(notification_type)
+            deferred = NotificationOutbox.objects.filter(
+                notification=notification,
+                dispatched_at__isnull=True
+            ).update(available_at=send_at)
+            requeued = not deferred and notification.email_status in (
+                Notification.EmailStatus.SENT, Notification.EmailStatus.FAILED
+            )
+            if requeued:
+                notification.email_status = Notification.EmailStatus.PENDING
+                update_fields.append('email_status')
+                NotificationOutbox.objects.create(notification=notification, available_at=send_at)
+            
+            notification.save(update_fields=update_fields)
+            if deferred or requeued:
+                # The relay already scheduled would find the entry not yet due
+                cls.schedule_outbox_relay(debounced=True)
+        
+        cls.push_notifications([notification])
+        return notification
+    
+    @classmethod
+    def _email_available_at(cls, notification_type: str):
+        """When an outbox entry may be relayed; coalesced types wait for further updates."""
+        if notification_type in COALESCED_TYPES:
+            return timezone.now() + timedelta(seconds=settings.NOTIFICATION_EMAIL_DEBOUNCE_SECONDS)
+        return timezone.now()
+    
+    @classmethod
+    def push_notifications(cls, notifications: List[Notification]) -> None:
+        """
+        Push new or updated notifications to the recipients' event streams
+        and long-poll requests after commit, skipping users who turned push
+        off.
+        """
+        preferences = cls.get_preferences_bulk(n.user_id for n in notifications)
+        pushed = [n for n in notifications if preferences[n.user_id]['push_enabled']]
+        publish_many(
+            ([notification.user_id], 'notification', cls._realtime_payload(notification))
+            for notification in pushed
+        )
+    
+    @classmethod
+    def _realtime_payload(cls, notification: Notification) -> dict:
+        """Event data pushed to the recipient's live connections."""
+        return {
+            'id': str(notification.id),
+            'notification_type': notification.notification_type,
+            'title': notification.title,
+            'data': notification.data,
+        }
+    
+    @classmethod
+    def schedule_outbox_relay(cls, debounced: bool = False):
+        """
+        Run the outbox relay once the current transaction commits, or for
+        debounced entries NOTIFICATION_EMAIL_DEBOUNCE_SECONDS after it, when
+        they fall due.
+        
+        Registered at most once per transaction for each kind however many
+        notifications it creates; outside a transaction the relay is
+        enqueued immediately.
+        """
+        kick = _kick_debounced_outbox_relay if debounced else _kick_outbox_relay
+        connection = transaction.get_connection()
+        if any(func is kick for _, func, _ in connection.run_on_commit):
+            return
+        transaction.on_commit(kick)
+    
+    @classmethod
+    def relay_outbox(cls, batch_size: Optional[int] = None) -> int:
+        """
+        Hand pending outbox entries to the delivery task in batches.
+        
+        Each batch is claimed with SKIP LOCKED, marked dispatched and
+        enqueued in one transaction, so concurrent relays never share rows
+        and a broker failure leaves the batch pending for the next run.
+        Delivery is at-least-once.
+        
+        Returns:
+            Number of entries relayed
+        """
+        from .tasks import send_notification_emails
+        
+        batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+        relayed = 0
+        while True:
+            with transaction.atomic():
+                entries = list(
+                    NotificationOutbox.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(
+                        channel=NotificationOutbox.Channel.EMAIL,
+                        dispatched_at__isnull=True,
+                        available_at__lte=timezone.now()
+                    )
+                    .order_by('id')
+                    .values_list('id', 'notification_id')[:batch_size]
+                )
+                if not entries:
+                    break
+                NotificationOutbox.objects.filter(
+                    pk__in=[entry_id for entry_id, _ in entries]
+                ).update(dispatched_at=timezone.now())
+                send_notification_emails.delay(
+                    [str(notification_id) for _, notification_id in entries]
+                )
+            relayed += len(entries)
+            if len(entries) < batch_size:
+                break
+        return relayed
+    
     # -------------------------------------------------------------------------
     # Negotiation Notifications
     # -------------------------------------------------------------------------
@@ -107,31 +437,56 @@ class NotificationService:
         """Notify both parties of acceptance."""
         vehicle = negotiation.vehicle
         
-        # Notify buyer
-        cls.create_notification(
-            user=negotiation.buyer,
-            notification_type=Notification.NotificationType.OFFER_ACCEPTED,
-            title="🎉 Your offer was accepted!",
-            message=f"Congratulations! Your offer of ${negotiation.accepted_price:,.2f} for the {vehicle.year} {vehicle.make} {vehicle.model} was accepted.",
-            data={
-                'negotiation_id': str(negotiation.id),
-                'accepted_price': str(negotiation.accepted_price),
-                'vehicle_title': f"{vehicle.year} {vehicle.make} {vehicle.model}"
-            }
-        )
+        with cls.batched():
+            # Notify buyer
+            cls.create_notification(
+                user=negotiation.buyer,
+                notification_type=Notification.NotificationType.OFFER_ACCEPTED,
+                title="🎉 Your offer was accepted!",
+                message=f"Congratulations! Your offer of ${negotiation.accepted_price:,.2f} for the {vehicle.year} {vehicle.make} {vehicle.model} was accepted.",
+                data={
+                    'negotiation_id': str(negotiation.id),
+                    'accepted_price': str(negotiation.accepted_price),
+                    'vehicle_title': f"{vehicle.year} {vehicle.make} {vehicle.model}"
+                }
+            )
         
-        # Notify dealer
-        cls.create_notification(
-            user=vehicle.dealer.user,
-            notification_type=Notification.NotificationType.OFFER_ACCEPTED,
-            title="Deal accepted!",
-            message=f"You accepted an offer of ${negotiation.accepted_price:,.2f} for the {vehicle.year} {vehicle.make} {vehicle.model}.",
-            data={
-                'negotiation_id': str(negotiation.id),
-                'accepted_price': str(negotiation.accepted_price),
-                'vehicle_title': f"{vehicle.year} {vehicle.make} {vehicle.model}"
-            }
-        )
+            # Notify dealer
+            cls.create_notification(
+                user=negotiation.dealer.user,
+                notification_type=Notification.NotificationType.OFFER_ACCEPTED,
+                title="Deal accepted!",
+                message=f"You accepted an offer of ${negotiation.accepted_price:,.2f} for the {vehicle.year} {vehicle.make} {vehicle.model}.",
+                data={
+                    'negotiation_id': str(negotiation.id),
+                    'accepted_price': str(negotiation.accepted_price),
+                    'vehicle_title': f"{vehicle.year} {vehicle.make} {vehicle.model}"
+                }
+            )
+    
+    @classmethod
+    def notify_vehicle_sold(cls, vehicle, negotiations):
+        """
+        Notify buyers whose negotiations closed because the vehicle was sold.
+        
+        Args:
+            vehicle: Vehicle that was sold
+            negotiations: (negotiation id, buyer id) pairs
+        """
+        vehicle_title = f"{vehicle.year} {vehicle.make} {vehicle.model}"
+        with cls.batched():
+            for negotiation_id, buyer_id in negotiations:
+                cls.create_notification(
+                    user=User(pk=buyer_id),
+                    notification_type=Notification.NotificationType.VEHICLE_SOLD,
+                    title="Vehicle no longer available",
+                    message=f"The {vehicle_title} you were negotiating on was sold to another buyer.",
+                    data={
+                        'negotiation_id': str(negotiation_id),
+                        'vehicle_id': str(vehicle.id),
+                        'vehicle_title': vehicle_title
+                    }
+                )
     
     @classmethod
     def notify_offer_rejected(cls, negotiation, reason: str = ""):
@@ -212,23 +567,93 @@ class NotificationService:
         """Notify both parties of expiration."""
         vehicle = negotiation.vehicle
         
-        # Notify buyer
-        cls.create_notification(
-            user=negotiation.buyer,
-            notification_type=Notification.NotificationType.NEGOTIATION_EXPIRED,
-            title="Negotiation expired",
-            message=f"Your negotiation on the {vehicle.year} {vehicle.make} {vehicle.model} has expired.",
-            data={'negotiation_id': str(negotiation.id)}
-        )
+        with cls.batched():
+            # Notify buyer
+            cls.create_notification(
+                user=negotiation.buyer,
+                notification_type=Notification.NotificationType.NEGOTIATION_EXPIRED,
+                title="Negotiation expired",
+                message=f"Your negotiation on the {vehicle.year} {vehicle.make} {vehicle.model} has expired.",
+                data={'negotiation_id': str(negotiation.id)}
+            )
         
-        # Notify dealer
-        cls.create_notification(
-            user=vehicle.dealer.user,
-            notification_type=Notification.NotificationType.NEGOTIATION_EXPIRED,
-            title="Negotiation expired",
-            message=f"A negotiation on the {vehicle.year} {vehicle.make} {vehicle.model} has expired.",
-            data={'negotiation_id': str(negotiation.id)}
+            # Notify dealer
+            cls.create_notification(
+                user=vehicle.dealer.user,
+                notification_type=Notification.NotificationType.NEGOTIATION_EXPIRED,
+                title="Negotiation expired",
+                message=f"A negotiation on the {vehicle.year} {vehicle.make} {vehicle.model} has expired.",
+                data={'negotiation_id': str(negotiation.id)}
+            )
+    
+    # -------------------------------------------------------------------------
+    # Vehicle Notifications
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def notify_price_drop(cls, vehicle, old_price) -> Tuple[int, List[str]]:
+        """
+        Create in-app price-drop notifications for everyone who saved the vehicle.
+        
+        Savers are read in keyset-ordered chunks and each chunk is written
+        with one bulk insert. Email goes out separately through batched
+        send_price_drop_emails tasks, so no outbox entries are written;
+        notifications to be emailed are left pending for them.
+        
+        Returns:
+            Number of notifications created and ids of those to email
+        """
+        from apps.vehicles.models import SavedVehicle
+        
+        vehicle_title = f"{vehicle.year} {vehicle.make} {vehicle.model}"
+        data = {
+            'vehicle_id': str(vehicle.id),
+            'vehicle_title': vehicle_title,
+            'old_price': str(old_price),
+            'new_price': str(vehicle.asking_price),
+        }
+        title = f"Price drop on {vehicle_title}"
+        action_url = Notification.build_action_url(data)
+        message = (
+            f"The {vehicle_title} you saved dropped from ${old_price:,.2f} "
+            f"to ${vehicle.asking_price:,.2f}."
         )
+        
+        savers = SavedVehicle.objects.filter(vehicle_id=vehicle.pk).order_by('user_id')
+        chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        created = 0
+        emailed_ids = []
+        last_user_id = None
+        while True:
+            chunk = savers if last_user_id is None else savers.filter(user_id__gt=last_user_id)
+            user_ids = list(chunk.values_list('user_id', flat=True)[:chunk_size])
+            if not user_ids:
+                break
+            notifications = [
+                Notification(
+                    user_id=user_id,
+                    notification_type=Notification.NotificationType.PRICE_DROP,
+                    title=title,
+                    message=message,
+                    data=data,
+                    action_url=action_url
+                )
+                for user_id in user_ids
+            ]
+            emailed = cls.filter_email_recipients(notifications)
+            for notification in emailed:
+                notification.email_status = Notification.EmailStatus.PENDING
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications)
+                cls.push_notifications(notifications)
+                cls.adjust_unread_counts({user_id: 1 for user_id in user_ids})
+            created += len(notifications)
+            emailed_ids.extend(str(notification.pk) for notification in emailed)
+            last_user_id = user_ids[-1]
+            if len(user_ids) < chunk_size:
+                break
+        
+        return created, emailed_ids
     
     # -------------------------------------------------------------------------
     # Dealer Notifications
@@ -267,25 +692,397 @@ class NotificationService:
     @classmethod
     def mark_as_read(cls, notification: Notification) -> Notification:
         """Mark single notification as read."""
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+        now = timezone.now()
+        updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(
+            is_read=True, read_at=now, updated_at=now
+        )
+        if updated:
+            notification.is_read = True
+            notification.read_at = notification.updated_at = now
+            cls.adjust_unread_counts({notification.user_id: -1})
         return notification
     
     @classmethod
     def mark_all_read(cls, user: User) -> int:
         """Mark all user notifications as read."""
-        return Notification.objects.filter(
+        count = Notification.objects.filter(
             user=user,
             is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        cls.reset_unread_count(user.pk)
+        return count
+    
+    @classmethod
+    def get_recent_notifications(cls, user: User, limit: int = 10, fields: Optional[List[str]] = None):
+        """
+        Get recent notifications for a user.
+        
+        With fields, returns plain dicts of just those columns instead of
+        model instances.
+        """
+        notifications = Notification.objects.filter(user=user).order_by('-created_at')
+        if fields:
+            notifications = notifications.values(*fields)
+        return notifications[:limit]
+    
+    @classmethod
+    def get_notifications_since(cls, user_id, since, since_id=None, limit: int = 20) -> list:
+        """
+        Unread notifications created or updated after a cursor, oldest
+        first, as plain dicts for the long-poll endpoint.
+        
+        The cursor is the (updated_at, id) of the last row a client got, so
+        paging forward skips nothing when more than `limit` arrive between
+        calls. Read notifications are left out: marking one read bumps
+        updated_at but is nothing to push.
+        """
+        after = Q(updated_at__gt=since)
+        if since_id is not None:
+            after |= Q(updated_at=since, id__gt=since_id)
+        return list(
+            Notification.objects
+            .filter(after, user_id=user_id, is_read=False)
+            .order_by('updated_at', 'id')
+            .values(
+                'id', 'notification_type', 'title', 'message', 'data',
+                'is_read', 'action_url', 'created_at', 'updated_at'
+            )[:limit]
+        )
+    
+    # -------------------------------------------------------------------------
+    # Retention
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def purge_old_notifications(
+        cls,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        pause: Optional[float] = None
+    ) -> dict:
+        """
+        Delete read notifications past retention, and dispatched outbox
+        entries past theirs.
+        
+        Rows are deleted with raw statements in primary-key batches of
+        NOTIFICATION_RETENTION_BATCH_SIZE, one short transaction each, with
+        a pause between batches. Read notifications are found through the
+        partial (created_at) WHERE is_read index, and their outbox entries
+        are deleted in the same transaction.
+        
+        Args:
+            older_than_days: Override for NOTIFICATION_RETENTION_DAYS
+            batch_size: Override for NOTIFICATION_RETENTION_BATCH_SIZE
+            pause: Override for NOTIFICATION_RETENTION_BATCH_PAUSE
+            
+        Returns:
+            Counts of deleted notifications and outbox entries, and batches run
+        """
+        if older_than_days is None:
+            older_than_days = settings.NOTIFICATION_RETENTION_DAYS
+        if batch_size is None:
+            batch_size = settings.NOTIFICATION_RETENTION_BATCH_SIZE
+        if pause is None:
+            pause = settings.NOTIFICATION_RETENTION_BATCH_PAUSE
+        
+        qn = connection.ops.quote_name
+        notifications = qn(Notification._meta.db_table)
+        outbox = qn(NotificationOutbox._meta.db_table)
+        now = timezone.now()
+        read_cutoff = Notification._meta.get_field('created_at').get_db_prep_value(
+            now - timedelta(days=older_than_days), connection
+        )
+        dispatched_cutoff = NotificationOutbox._meta.get_field('dispatched_at').get_db_prep_value(
+            now - timedelta(days=settings.NOTIFICATION_OUTBOX_RETENTION_DAYS), connection
+        )
+        metrics = {'notifications': 0, 'outbox_entries': 0, 'batches': 0}
+        
+        def delete_read(cursor):
+            cursor.execute(
+                f'DELETE FROM {notifications} WHERE id IN ('
+                f'SELECT id FROM {notifications} WHERE is_read AND created_at < %s LIMIT %s'
+                f') RETURNING id',
+                [read_cutoff, batch_size]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if ids:
+                # Foreign keys are checked at commit, so the parents can go first
+                cursor.execute(
+                    f'DELETE FROM {outbox} WHERE notification_id IN ({", ".join(["%s"] * len(ids))})',
+                    ids
+                )
+                metrics['outbox_entries'] += cursor.rowcount
+            metrics['notifications'] += len(ids)
+            return len(ids)
+        
+        def delete_dispatched(cursor):
+            cursor.execute(
+                f'DELETE FROM {outbox} WHERE id IN ('
+                f'SELECT id FROM {outbox} WHERE dispatched_at < %s LIMIT %s'
+                f')',
+                [dispatched_cutoff, batch_size]
+            )
+            metrics['outbox_entries'] += cursor.rowcount
+            return cursor.rowcount
+        
+        started = time.monotonic()
+        for delete_batch in (delete_read, delete_dispatched):
+            while True:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    deleted = delete_batch(cursor)
+                if deleted:
+                    metrics['batches'] += 1
+                if deleted < batch_size:
+                    break
+                time.sleep(pause)
+        
+        logger.info(
+            f"Notification retention removed {metrics['notifications']} notifications and "
+            f"{metrics['outbox_entries']} outbox entries in {metrics['batches']} batches "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+        return metrics
+    
+    # -------------------------------------------------------------------------
+    # Preferences
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def get_preferences(cls, user: User) -> NotificationPreference:
+        """Get a user's preferences; an unsaved default row if they never set any."""
+        try:
+            return NotificationPreference.objects.get(user=user)
+        except NotificationPreference.DoesNotExist:
+            return NotificationPreference(user=user)
+    
+    @classmethod
+    def update_preferences(cls, user: User, data: dict) -> NotificationPreference:
+        """Save preference changes and drop the cached copy after commit."""
+        preference, _ = NotificationPreference.objects.update_or_create(user=user, defaults=data)
+        key = PREFERENCES_CACHE_KEY.format(user_id=user.pk)
+        transaction.on_commit(lambda: cache.delete(key))
+        return preference
+    
+    @classmethod
+    def get_preferences_bulk(cls, user_ids) -> dict:
+        """
+        Map each user id to a dict of their preference fields.
+        
+        Served from the cache; misses are loaded with one query, with the
+        model defaults for users who never saved preferences.
+        """
+        keys = {PREFERENCES_CACHE_KEY.format(user_id=user_id): user_id for user_id in set(user_ids)}
+        if not keys:
+            return {}
+        cached = cache.get_many(list(keys))
+        preferences = {keys[key]: value for key, value in cached.items()}
+        
+        missing = [user_id for key, user_id in keys.items() if key not in cached]
+        if missing:
+            rows = {
+                str(row.pop('user_id')): row
+                for row in NotificationPreference.objects
+                .filter(user_id__in=missing)
+                .values('user_id', *PREFERENCE_FIELDS)
+            }
+            defaults = {
+                field: NotificationPreference._meta.get_field(field).default
+                for field in PREFERENCE_FIELDS
+            }
+            loaded = {}
+            for user_id in missing:
+                preferences[user_id] = rows.get(str(user_id), defaults)
+                loaded[PREFERENCES_CACHE_KEY.format(user_id=user_id)] = preferences[user_id]
+            cache.set_many(loaded, settings.NOTIFICATION_PREFERENCES_CACHE_SECONDS)
+        return preferences
+    
+    @classmethod
+    def filter_email_recipients(cls, notifications: List[Notification]) -> List[Notification]:
+        """
+        Return the notifications that should be emailed.
+        
+        The rest are marked skipped: types without an email, and types the
+        recipient opted out of. Preferences are read in one bulk lookup.
+        """
+        from .tasks import get_email_config
+        
+        preferences = cls.get_preferences_bulk(n.user_id for n in notifications)
+        emailed = []
+        for notification in notifications:
+            field = NotificationPreference.EMAIL_FIELDS.get(notification.notification_type)
+            if not get_email_config(notification.notification_type) or (
+                field and not preferences[notification.user_id][field]
+            ):
+                notification.email_status = Notification.EmailStatus.SKIPPED
+            else:
+                emailed.append(notification)
+        return emailed
+    
+    # -------------------------------------------------------------------------
+    # Daily Digest
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def iter_digests(cls, since, title_count: Optional[int] = None) -> Iterator[dict]:
+        """
+        Stream one digest per opted-in user with unread notifications since a time.
+        
+        A single query ranks each user's unread notifications with window
+        functions, carrying the per-user count on every row, and keeps the
+        most recent few. Rows are read with iterator() and grouped per user.
+        
+        Yields:
+            {'email', 'unread_count', 'titles'} per user
+        """
+        title_count = title_count or settings.NOTIFICATION_DIGEST_TITLE_COUNT
+        by_user = {'partition_by': [F('user_id')]}
+        rows = (
+            Notification.objects
+            .filter(
+                is_read=False,
+                created_at__gte=since,
+                user__is_active=True,
+                user__notification_preference__email_daily_digest=True
+            )
+            .annotate(
+                unread_count=Window(Count('id'), **by_user),
+                rank=Window(RowNumber(), order_by=F('created_at').desc(), **by_user)
+            )
+            .filter(rank__lte=title_count)
+            .order_by('user_id', 'rank')
+            .values_list('user_id', 'user__email', 'unread_count', 'title')
+        )
+        
+        for _, user_rows in groupby(rows.iterator(chunk_size=2000), key=lambda row: row[0]):
+            user_rows = list(user_rows)
+            yield {
+                'email': user_rows[0][1],
+                'unread_count': user_rows[0][2],
+                'titles': [row[3] for row in user_rows],
+            }
+    
+    # -------------------------------------------------------------------------
+    # Unread Counter
+    # -------------------------------------------------------------------------
     
     @classmethod
     def get_unread_count(cls, user: User) -> int:
-        """Get count of unread notifications."""
-        return Notification.objects.filter(user=user, is_read=False).count()
+        """
+        Get count of unread notifications.
+        
+        Served from a per-user Redis counter, loaded from the database on a
+        miss. The loaded count is only stored if no counter update landed
+        while counting; otherwise the next read counts again. Falls back to
+        a database count if Redis is unavailable.
+        """
+        key = UNREAD_COUNT_KEY.format(user_id=user.pk)
+        version_key = UNREAD_VERSION_KEY.format(user_id=user.pk)
+        try:
+            client = get_redis()
+            cached = client.get(key)
+            if cached is not None:
+                return int(cached)
+            
+            version = client.get(version_key) or b'0'
+            count = Notification.objects.filter(user_id=user.pk, is_read=False).count()
+            client.register_script(STORE_UNREAD_SCRIPT)(
+                keys=[key, version_key],
+                args=[count, version, settings.NOTIFICATION_UNREAD_CACHE_SECONDS, 'NX']
+            )
+            return count
+        except Exception as e:
+            logger.warning(f"Unread counter cache unavailable: {e}")
+            return Notification.objects.filter(user_id=user.pk, is_read=False).count()
+    
+    @classmethod
+    def adjust_unread_counts(cls, deltas: dict) -> None:
+        """
+        Add per-user deltas to the loaded unread counters once the current
+        transaction commits. Drift from failures is fixed by
+        reconcile_unread_counts.
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        ttl = settings.NOTIFICATION_UNREAD_CACHE_SECONDS
+        
+        def _apply():
+            try:
+                client = get_redis()
+                script = client.register_script(ADJUST_UNREAD_SCRIPT)
+                pipe = client.pipeline(transaction=False)
+                for user_id, delta in deltas.items():
+                    script(
+                        keys=[UNREAD_COUNT_KEY.format(user_id=user_id), UNREAD_VERSION_KEY.format(user_id=user_id)],
+                        args=[delta, ttl],
+                        client=pipe
+                    )
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to update {len(deltas)} unread counters: {e}")
+        
+        transaction.on_commit(_apply)
     
     @classmethod
-    def get_recent_notifications(cls, user: User, limit: int = 10):
-        """Get recent notifications for a user."""
-        return Notification.objects.filter(user=user).order_by('-created_at')[:limit]
+    def reset_unread_count(cls, user_id) -> None:
+        """Set the user's unread counter to zero once the transaction commits."""
+        keys = [UNREAD_COUNT_KEY.format(user_id=user_id), UNREAD_VERSION_KEY.format(user_id=user_id)]
+        
+        def _reset():
+            try:
+                get_redis().register_script(RESET_UNREAD_SCRIPT)(
+                    keys=keys, args=[settings.NOTIFICATION_UNREAD_CACHE_SECONDS]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to reset unread counter: {e}")
+        
+        transaction.on_commit(_reset)
+    
+    @classmethod
+    def reconcile_unread_counts(cls, batch_size: Optional[int] = None) -> int:
+        """
+        Recount every loaded unread counter from the database.
+        
+        Counters are scanned in batches and each batch is recounted with one
+        grouped query on the (user, is_read, -created_at) index. Counters
+        that expired meanwhile are not recreated, and counters updated
+        while their batch was counted are left for the next run.
+        
+        Returns:
+            Number of counters reconciled
+        """
+        batch_size = batch_size or settings.NOTIFICATION_UNREAD_RECONCILE_BATCH_SIZE
+        ttl = settings.NOTIFICATION_UNREAD_CACHE_SECONDS
+        client = get_redis()
+        store = client.register_script(STORE_UNREAD_SCRIPT)
+        prefix = UNREAD_COUNT_KEY.format(user_id='')
+        keys = client.scan_iter(match=f'{prefix}*', count=batch_size)
+        
+        reconciled = 0
+        while True:
+            batch = [key.decode() for _, key in zip(range(batch_size), keys)]
+            if not batch:
+                break
+            user_ids = [key[len(prefix):] for key in batch]
+            version_keys = [UNREAD_VERSION_KEY.format(user_id=user_id) for user_id in user_ids]
+            versions = [version or b'0' for version in client.mget(version_keys)]
+            counts = dict(
+                Notification.objects
+                .filter(user_id__in=user_ids, is_read=False)
+                .order_by()
+                .values('user_id')
+                .annotate(unread=Count('id'))
+                .values_list('user_id', 'unread')
+            )
+            counts = {str(user_id): unread for user_id, unread in counts.items()}
+            
+            pipe = client.pipeline(transaction=False)
+            for key, version_key, version, user_id in zip(batch, version_keys, versions, user_ids):
+                store(
+                    keys=[key, version_key],
+                    args=[counts.get(user_id, 0), version, ttl, 'XX'],
+                    client=pipe
+                )
+            pipe.execute()
+            reconciled += len(batch)
+        return reconciled
@@ -1,61 +1,212 @@
 """
 Celery tasks for notifications app.
 """
+import logging
+import smtplib
+from collections import defaultdict
+
 from celery import shared_task
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.conf import settings
 from datetime import timedelta
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
 def send_notification_email(notification_id: str):
     """
     Send email for a notification.
-    Called asynchronously after notification creation.
+    """
+    send_notification_emails.delay([notification_id])
+
+
+@shared_task(bind=True, max_retries=settings.NOTIFICATION_EMAIL_MAX_RETRIES)
+def send_notification_emails(self, notification_ids: list):
+    """
+    Send emails for a batch of notifications over one SMTP connection.
+    Enqueued by the notification outbox relay.
+    
+    Each template is loaded once per batch. Preferences are checked again
+    so an opt-out made since the notification was created is honoured. A
+    transient SMTP failure retries the undelivered rest of the batch with
+    exponential backoff; the outcome is recorded on every notification.
+    
+    Returns:
+        Count of emails sent
     """
     from .models import Notification
+    from .services import NotificationService
     
-    try:
-        notification = Notification.objects.select_related('user').get(pk=notification_id)
-    except Notification.DoesNotExist:
-        return
+    notifications = list(Notification.objects.select_related('user').filter(
+        pk__in=notification_ids,
+        email_status=Notification.EmailStatus.PENDING
+    ))
+    wanted = {n.pk for n in NotificationService.filter_email_recipients(notifications)}
+    
+    outcomes = {}
+    messages = []
+    templates = {}
+    for notification in notifications:
+        email_config = get_email_config(notification.notification_type)
+        if notification.pk not in wanted or not notification.user.email:
+            outcomes[notification.pk] = (Notification.EmailStatus.SKIPPED, '')
+            continue
+        try:
+            messages.append((notification.pk, _build_email(notification, email_config, templates)))
+        except Exception as e:
+            logger.error(f"Failed to render email for notification {notification.pk}: {e}")
+            outcomes[notification.pk] = (Notification.EmailStatus.FAILED, str(e))
     
-    # Skip if user has unsubscribed (future feature)
-    # if not notification.user.email_notifications_enabled:
-    #     return
+    return _deliver_emails(self, messages, outcomes)
+
+
+def _deliver_emails(task, messages: list, outcomes: dict) -> int:
+    """
+    Send (notification_id, message) pairs over one SMTP connection.
+    
+    A transient SMTP failure retries the undelivered rest of the batch
+    through task.retry with exponential backoff; a permanent one is
+    recorded and not retried. Outcomes already in `outcomes` are recorded
+    with the delivery results.
+    
+    Returns:
+        Count of emails sent
+    """
+    from .models import Notification
+    
+    sent, failed, retry_ids, retry_error = _send_messages(messages)
+    for notification_id in sent:
+        outcomes[notification_id] = (Notification.EmailStatus.SENT, '')
+    for notification_id, error in failed.items():
+        outcomes[notification_id] = (Notification.EmailStatus.FAILED, str(error))
+    
+    exhausted = task.request.retries >= task.max_retries
+    for notification_id in retry_ids:
+        status = Notification.EmailStatus.FAILED if exhausted else Notification.EmailStatus.PENDING
+        outcomes[notification_id] = (status, str(retry_error))
+    _record_email_outcomes(outcomes)
+    
+    if retry_ids and not exhausted:
+        _retry_delivery(task, [str(pk) for pk in retry_ids], retry_error)
+    
+    return sum(1 for status, _ in outcomes.values() if status == Notification.EmailStatus.SENT)
+
+
+def _send_messages(messages: list):
+    """
+    Send (key, message) pairs over one SMTP connection, stopping at the
+    first transient failure.
+    
+    Returns:
+        (sent keys, {key: error} for permanent failures,
+         keys left for a retry, the transient error)
+    """
+    from django.core.mail import get_connection
     
-    # Email template mapping
-    email_config = get_email_config(notification.notification_type)
-    if not email_config:
-        return
+    sent, failed = [], {}
+    retry_keys, retry_error = [], None
+    if not messages:
+        return sent, failed, retry_keys, retry_error
     
+    connection = get_connection()
     try:
-        context = {
-            'user': notification.user,
-            'notification': notification,
-            'site_url': settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost:3000',
-            **notification.data
-        }
-        
-        # Render email
-        subject = email_config['subject'].format(**notification.data) if notification.data else email_config['subject']
-        
-        html_content = render_to_string(email_config['template'], context)
-        plain_content = notification.message  # Fallback
-        
-        send_mail(
-            subject=subject,
-            message=plain_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[notification.user.email],
-            html_message=html_content,
-            fail_silently=True
-        )
+        connection.open()
+        for index, (key, message) in enumerate(messages):
+            try:
+                connection.send_messages([message])
+                sent.append(key)
+            except Exception as e:
+                if not _is_transient_smtp_error(e):
+                    failed[key] = e
+                    continue
+                retry_keys, retry_error = [k for k, _ in messages[index:]], e
+                break
     except Exception as e:
-        # Log error but don't fail
-        print(f"Failed to send email for notification {notification_id}: {e}")
+        # Could not connect: the whole batch waits for the retry
+        retry_keys, retry_error = [k for k, _ in messages], e
+    finally:
+        connection.close()
+    return sent, failed, retry_keys, retry_error
+
+
+def _retry_delivery(task, remaining: list, error):
+    """Retry a delivery task with the undelivered rest, backing off exponentially."""
+    logger.warning(f"Retrying {len(remaining)} emails from {task.name}: {error}")
+    raise task.retry(
+        args=[remaining],
+        countdown=settings.NOTIFICATION_EMAIL_RETRY_BACKOFF * 2 ** task.request.retries,
+        exc=error
+    )
+
+
+def _build_email(notification, email_config, templates):
+    """Render the email for one notification, loading each template once per batch."""
+    from django.core.mail import EmailMultiAlternatives
+    
+    context = {
+        'user': notification.user,
+        'notification': notification,
+        'site_url': settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost:3000',
+        **notification.data
+    }
+    subject = email_config['subject'].format(**notification.data) if notification.data else email_config['subject']
+    
+    template_name = email_config['template']
+    if template_name not in templates:
+        templates[template_name] = get_template(template_name)
+    html_content = templates[template_name].render(context)
+    
+    message = EmailMultiAlternatives(
+        subject,
+        notification.message,  # Plain-text fallback
+        settings.DEFAULT_FROM_EMAIL,
+        [notification.user.email]
+    )
+    message.attach_alternative(html_content, 'text/html')
+    return message
+
+
+def _is_transient_smtp_error(error) -> bool:
+    """4xx replies and dropped connections are worth retrying; 5xx replies are not."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, OSError)
+
+
+def _record_email_outcomes(outcomes: dict):
+    """Store delivery outcomes with one update per (status, error) pair."""
+    from django.db.models import F
+    from .models import Notification
+    
+    grouped = defaultdict(list)
+    for notification_id, (status, error) in outcomes.items():
+        grouped[(status, error[:255])].append(notification_id)
+    
+    now = timezone.now()
+    for (status, error), ids in grouped.items():
+        fields = {'email_status': status, 'email_error': error}
+        if status != Notification.EmailStatus.SKIPPED:
+            fields['email_attempts'] = F('email_attempts') + 1
+        if status == Notification.EmailStatus.SENT:
+            fields['emailed_at'] = now
+        Notification.objects.filter(pk__in=ids).update(**fields)
+
+
+@shared_task
+def relay_notification_outbox():
+    """
+    Dispatch pending notification outbox entries to the delivery tasks.
+    Enqueued after each commit that writes to the outbox, and run every
+    minute via Celery Beat to pick up entries a broker outage left behind.
+    """
+    from .services import NotificationService
+    
+    return NotificationService.relay_outbox()
 
 
 def get_email_config(notification_type: str) -> dict:
@@ -92,17 +243,104 @@ def get_email_config(notification_type: str) -> dict:
         'dealer_rejected': {
             'subject': 'Verification update',
             'template': 'emails/dealer_rejected.html'
+        },
+        'price_drop': {
+            'subject': 'Price drop on {vehicle_title}',
+            'template': 'emails/price_drop.html'
         }
     }
     return configs.get(notification_type)
 
 
+@shared_task
+def notify_price_drop(vehicle_id: str, old_price: str):
+    """
+    Alert everyone who saved a vehicle that its price dropped.
+    Enqueued after a price change commits; in-app notifications are
+    created in chunks and the emails to those same recipients go out in
+    batched send_price_drop_emails tasks.
+    """
+    from apps.vehicles.models import Vehicle
+    from .services import NotificationService
+    
+    try:
+        vehicle = Vehicle.objects.get(pk=vehicle_id)
+    except Vehicle.DoesNotExist:
+        return 0
+    
+    old_price = Decimal(old_price)
+    if vehicle.asking_price >= old_price:
+        # Raised again before the job ran
+        return 0
+    
+    notified, emailed_ids = NotificationService.notify_price_drop(vehicle, old_price)
+    chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    for start in range(0, len(emailed_ids), chunk_size):
+        send_price_drop_emails.delay(emailed_ids[start:start + chunk_size])
+    return notified
+
+
+@shared_task(bind=True, max_retries=settings.NOTIFICATION_EMAIL_MAX_RETRIES)
+def send_price_drop_emails(self, notification_ids: list):
+    """
+    Email a batch of price-drop notifications over one SMTP connection.
+    Enqueued by notify_price_drop with the recipients it notified.
+    
+    The email is the same for every saver of a vehicle, so it is rendered
+    once per vehicle. Preferences are checked again and delivery failures
+    are retried and recorded as in send_notification_emails.
+    
+    Returns:
+        Count of emails sent
+    """
+    from django.core.mail import EmailMultiAlternatives
+    from .models import Notification
+    from .services import NotificationService
+    
+    notifications = list(Notification.objects.select_related('user').filter(
+        pk__in=notification_ids,
+        notification_type=Notification.NotificationType.PRICE_DROP,
+        email_status=Notification.EmailStatus.PENDING
+    ))
+    wanted = {n.pk for n in NotificationService.filter_email_recipients(notifications)}
+    
+    email_config = get_email_config('price_drop')
+    site_url = settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost:3000'
+    rendered = {}
+    outcomes = {}
+    messages = []
+    for notification in notifications:
+        if notification.pk not in wanted or not notification.user.email:
+            outcomes[notification.pk] = (Notification.EmailStatus.SKIPPED, '')
+            continue
+        data = notification.data
+        key = (data['vehicle_id'], data['old_price'], data['new_price'])
+        if key not in rendered:
+            context = {
+                **data,
+                'site_url': site_url,
+                'price_drop': str(Decimal(data['old_price']) - Decimal(data['new_price'])),
+            }
+            rendered[key] = (
+                email_config['subject'].format(**context),
+                render_to_string(email_config['template'], context),
+            )
+        subject, html_content = rendered[key]
+        message = EmailMultiAlternatives(
+            subject, notification.message, settings.DEFAULT_FROM_EMAIL, [notification.user.email]
+        )
+        message.attach_alternative(html_content, 'text/html')
+        messages.append((notification.pk, message))
+    
+    return _deliver_emails(self, messages, outcomes)
+
+
 @shared_task
 def check_expiring_negotiations():
     """
     Check for negotiations expiring in the next 24 hours
     and send warning notifications.
-    Run hourly via Celery Beat.
+    Not scheduled: beat runs apps.negotiations.tasks.check_expiring_negotiations.
     """
     from apps.negotiations.models import Negotiation
     from .models import Notification
@@ -138,69 +376,106 @@ def check_expiring_negotiations():
 @shared_task
 def cleanup_old_notifications():
     """
-    Periodic task to delete old read notifications.
+    Periodic task to delete old read notifications and dispatched
+    outbox entries in small batches.
     Run daily via Celery Beat.
+    
+    Returns:
+        Counts of deleted rows (see NotificationService.purge_old_notifications)
     """
-    from .models import Notification
+    from .services import NotificationService
     
-    # Delete read notifications older than 90 days
-    cutoff = timezone.now() - timedelta(days=90)
-    deleted_count, _ = Notification.objects.filter(
-        is_read=True,
-        created_at__lt=cutoff
-    ).delete()
+    return NotificationService.purge_old_notifications()
+
+
+@shared_task
+def reconcile_unread_counts():
+    """
+    Recount the cached unread notification counters from the database.
+    Run every 15 minutes via Celery Beat.
+    """
+    from .services import NotificationService
     
-    return deleted_count
+    return NotificationService.reconcile_unread_counts()
 
 
 @shared_task
 def send_daily_digest():
     """
-    Send daily digest email to users with pending notifications.
+    Send daily digest email to users with pending notifications who
+    opted in to it.
     Run daily at 9 AM via Celery Beat.
-    """
-    from django.contrib.auth import get_user_model
-    from .models import Notification
     
-    User = get_user_model()
+    Digests are computed in one streamed query and handed to
+    send_digest_emails in chunks, so workers send them in parallel.
     
-    # Get users with unread notifications from the last 24 hours
+    Returns:
+        Count of digests queued
+    """
+    from .services import NotificationService
+    
+    # Unread notifications from the last 24 hours
     yesterday = timezone.now() - timedelta(days=1)
+    chunk_size = settings.NOTIFICATION_DIGEST_CHUNK_SIZE
     
-    users_with_notifications = User.objects.filter(
-        notifications__is_read=False,
-        notifications__created_at__gte=yesterday
-    ).distinct()
-    
-    sent_count = 0
-    for user in users_with_notifications:
-        unread = Notification.objects.filter(
-            user=user,
-            is_read=False,
-            created_at__gte=yesterday
-        ).count()
-        
-        if unread > 0:
-            # Send digest email
-            try:
-                context = {
-                    'user': user,
-                    'unread_count': unread,
-                    'site_url': settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost:3000'
-                }
-                
-                html_content = render_to_string('emails/daily_digest.html', context)
-                
-                send_mail(
-                    subject=f"You have {unread} unread notification{'s' if unread > 1 else ''} on CarNegotiate",
-                    message=f"You have {unread} unread notifications. Visit CarNegotiate to view them.",
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    html_message=html_content,
-                    fail_silently=True
-                )
-                sent_count += 1
-            except Exception:
-                pass
-    
-    return sent_count
+    queued = 0
+    chunk = []
+    for digest in NotificationService.iter_digests(yesterday):
+        chunk.append(digest)
+        if len(chunk) >= chunk_size:
+            send_digest_emails.delay(chunk)
+            queued += len(chunk)
+            chunk = []
+    if chunk:
+        send_digest_emails.delay(chunk)
+        queued += len(chunk)
+    
+    return queued
+
+
+@shared_task(bind=True, max_retries=settings.NOTIFICATION_EMAIL_MAX_RETRIES)
+def send_digest_emails(self, digests: list):
+    """
+    Send a chunk of daily digests over one SMTP connection.
+    Enqueued by send_daily_digest.
+    
+    Delivery failures are handled as in send_notification_emails: a
+    transient one retries the unsent rest of the chunk with exponential
+    backoff, a permanent one is logged and not retried. Digests have no
+    row to record the outcome on, so outcomes are logged.
+    
+    Returns:
+        Count of emails sent
+    """
+    from django.core.mail import EmailMultiAlternatives
+    
+    template = get_template('emails/daily_digest.html')
+    site_url = settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost:3000'
+    
+    messages = []
+    for index, digest in enumerate(digests):
+        unread = digest['unread_count']
+        message = EmailMultiAlternatives(
+            f"You have {unread} unread notification{'s' if unread > 1 else ''} on CarNegotiate",
+            f"You have {unread} unread notifications. Visit CarNegotiate to view them.",
+            settings.DEFAULT_FROM_EMAIL,
+            [digest['email']]
+        )
+        message.attach_alternative(template.render({
+            'unread_count': unread,
+            'titles': digest['titles'],
+            'more_count': unread - len(digest['titles']),
+            'site_url': site_url,
+        }), 'text/html')
+        messages.append((index, message))
+    
+    sent, failed, retry_indexes, retry_error = _send_messages(messages)
+    for index, error in failed.items():
+        logger.error(f"Failed to send daily digest to {digests[index]['email']}: {error}")
+    
+    if retry_indexes:
+        if self.request.retries < self.max_retries:
+            _retry_delivery(self, [digests[index] for index in retry_indexes], retry_error)
+        logger.error(f"Gave up on {len(retry_indexes)} daily digests: {retry_error}")
+    
+    return len(sent)
@@ -8,5 +8,7 @@ router = DefaultRouter()
 router.register(r'', views.NotificationViewSet, basename='notification')
 
 urlpatterns = [
+    path('stream/', views.notification_stream, name='notification-stream'),
+    path('wait/', views.notification_wait, name='notification-wait'),
     path('', include(router.urls)),
 ]
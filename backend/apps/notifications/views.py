@@ -1,15 +1,38 @@
 """
 Notification ViewSet for CarNegotiate API.
 """
+import asyncio
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
+from core.realtime import hub, stream_user_events, wait_for_event
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationPreferencesSerializer, NotificationSerializer
 from .services import NotificationService
 
+logger = logging.getLogger(__name__)
+
+# Columns /notifications/recent/?fields= may project
+RECENT_FIELDS = [
+    'id', 'notification_type', 'title', 'message', 'data',
+    'is_read', 'read_at', 'created_at', 'action_url',
+]
+
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -21,6 +44,9 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /notifications/unread_count/ - Get unread count
     - POST /notifications/{id}/mark_read/ - Mark as read
     - POST /notifications/mark_all_read/ - Mark all as read
+    - GET/PATCH /notifications/preferences/ - Email and push preferences
+    
+    See also notification_stream and notification_wait for the push channels.
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
@@ -59,9 +85,18 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'])
+    @action(
+        detail=False,
+        methods=['get'],
+        authentication_classes=[JWTStatelessUserAuthentication]
+    )
     def unread_count(self, request):
-        """GET /notifications/unread_count/"""
+        """
+        GET /notifications/unread_count/
+        
+        Authenticates from the token alone and reads the cached counter,
+        so this frequently polled call needs no database query.
+        """
         count = NotificationService.get_unread_count(request.user)
         return Response({'unread_count': count})
     
@@ -78,11 +113,184 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         count = NotificationService.mark_all_read(request.user)
         return Response({'marked_count': count})
     
+    @action(detail=False, methods=['get', 'patch'])
+    def preferences(self, request):
+        """
+        GET /notifications/preferences/
+        PATCH /notifications/preferences/
+        """
+        preference = NotificationService.get_preferences(request.user)
+        if request.method == 'GET':
+            return Response(NotificationPreferencesSerializer(preference).data)
+        
+        serializer = NotificationPreferencesSerializer(preference, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        preference = NotificationService.update_preferences(request.user, serializer.validated_data)
+        return Response(NotificationPreferencesSerializer(preference).data)
+    
     @action(detail=False, methods=['get'])
     def recent(self, request):
-        """GET /notifications/recent/ - Get 5 most recent notifications"""
+        """
+        GET /notifications/recent/ - Get 5 most recent notifications
+        
+        Query params:
+        - fields: Comma-separated columns (see RECENT_FIELDS) to return as
+          plain values, skipping the serializer, e.g. for the bell dropdown
+        """
+        fields = request.query_params.get('fields')
+        if fields:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+            unknown = sorted(set(fields) - set(RECENT_FIELDS))
+            if unknown:
+                raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+            notifications = NotificationService.get_recent_notifications(
+                request.user, limit=5, fields=fields
+            )
+            return Response(list(notifications))
+        
         notifications = NotificationService.get_recent_notifications(
             request.user, limit=5
         )
         serializer = self.get_serializer(notifications, many=True)
         return Response(serializer.data)
+
+
+def _stream_user_id(request):
+    """
+    Resolve the user id for the event stream from a JWT access token.
+    
+    EventSource cannot send headers, so the token may also be passed as
+    ?token=. Only the token signature is checked, keeping the handshake
+    free of database queries.
+    """
+    raw_token = request.GET.get('token')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not raw_token and header.startswith('Bearer '):
+        raw_token = header.split(' ', 1)[1]
+    if not raw_token:
+        return None
+    try:
+        return AccessToken(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+async def notification_stream(request):
+    """
+    GET /notifications/stream/?token=<access token>
+    
+    Server-Sent Events stream of the user's notifications and negotiation
+    updates. Events:
+    - notification: {id, notification_type, title, data}
+    - negotiation: {negotiation_id, seq, event_type, status}
+    
+    Must be served under ASGI (see config/asgi.py).
+    """
+    user_id = _stream_user_id(request)
+    if user_id is None:
+        return JsonResponse(
+            {'error': {'code': 'NOT_AUTHENTICATED', 'message': 'Valid access token required.'}},
+            status=401
+        )
+    
+    response = StreamingHttpResponse(
+        stream_user_events(user_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _parse_wait_cursor(cursor: str):
+    """
+    Split a long-poll cursor into its timestamp and, after the first page,
+    the id of the last notification returned.
+    
+    Returns:
+        (aware datetime, UUID or None), or (None, None) if malformed
+    """
+    timestamp, _, last_id = cursor.partition('_')
+    try:
+        since = parse_datetime(timestamp)
+        since_id = uuid.UUID(last_id) if last_id else None
+    except ValueError:
+        return None, None
+    if since is None or timezone.is_naive(since):
+        return None, None
+    return since, since_id
+
+
+async def notification_wait(request):
+    """
+    GET /notifications/wait/?since=<cursor>&token=<access token>
+    
+    Long-poll for clients that cannot hold an event stream. Returns as soon
+    as the user has unread notifications created or updated after the
+    cursor, oldest first and at most a page of them, or with an empty list
+    after LONGPOLL_TIMEOUT_SECONDS. Pass the returned cursor as since on the
+    next call; without since only a cursor is returned.
+    
+    The wait listens on the process-wide realtime hub, like the event
+    stream, so it holds no thread, database or Redis connection and every
+    open request of the user is woken. Users with push turned off, or a
+    Redis outage, get an immediate answer and should fall back to polling.
+    
+    Must be served under ASGI (see config/asgi.py).
+    """
+    user_id = _stream_user_id(request)
+    if user_id is None:
+        return JsonResponse(
+            {'error': {'code': 'NOT_AUTHENTICATED', 'message': 'Valid access token required.'}},
+            status=401
+        )
+    
+    since = request.GET.get('since')
+    if not since:
+        return JsonResponse({'notifications': [], 'cursor': timezone.now().isoformat()})
+    since, since_id = _parse_wait_cursor(since)
+    if since is None:
+        return JsonResponse(
+            {'error': {'code': 'VALIDATION_ERROR', 'message': 'since must be a cursor from a previous response.'}},
+            status=400
+        )
+    
+    get_since = sync_to_async(NotificationService.get_notifications_since)
+    preferences = await sync_to_async(NotificationService.get_preferences_bulk)([user_id])
+    push_enabled = preferences[user_id]['push_enabled']
+    
+    if not push_enabled:
+        notifications = await get_since(user_id, since, since_id)
+    else:
+        # Subscribe before the first check so nothing committed in between is missed
+        try:
+            queue = await hub.join(user_id)
+        except Exception as e:
+            logger.warning(f"Long-poll subscribe failed: {e}")
+            queue = None
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.LONGPOLL_TIMEOUT_SECONDS
+            while True:
+                notifications = await get_since(user_id, since, since_id)
+                remaining = deadline - loop.time()
+                if notifications or queue is None or remaining <= 0:
+                    break
+                try:
+                    # A wake-up for an update already seen just costs another check
+                    woken = await wait_for_event(queue, 'notification', remaining)
+                except Exception as e:
+                    logger.warning(f"Long-poll wait failed: {e}")
+                    break
+                if not woken:
+                    notifications = await get_since(user_id, since, since_id)
+                    break
+        finally:
+            if queue is not None:
+                await hub.leave(user_id, queue)
+    
+    cursor = request.GET['since']
+    if notifications:
+        cursor = f"{notifications[-1]['updated_at'].isoformat()}_{notifications[-1]['id']}"
+    return JsonResponse({'notifications': notifications, 'cursor': cursor})
+
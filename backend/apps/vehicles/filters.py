@@ -73,5 +73,52 @@ class VehicleFilterSet(django_filters.FilterSet):
         return queryset
 
 
+class InventoryFilterSet(django_filters.FilterSet):
+    """
+    FilterSet for a dealer's own inventory grid.
+    """
+    status = django_filters.MultipleChoiceFilter(choices=Vehicle.Status.choices)
+    make = django_filters.CharFilter(lookup_expr='iexact')
+    model = django_filters.CharFilter(lookup_expr='icontains')
+    body_type = django_filters.CharFilter(lookup_expr='iexact')
+    year_min = django_filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = django_filters.NumberFilter(field_name='year', lookup_expr='lte')
+    price_min = django_filters.NumberFilter(field_name='asking_price', lookup_expr='gte')
+    price_max = django_filters.NumberFilter(field_name='asking_price', lookup_expr='lte')
+    q = django_filters.CharFilter(method='filter_search')
+    
+    ordering = django_filters.OrderingFilter(
+        fields=(
+            ('asking_price', 'price'),
+            ('year', 'year'),
+            ('make', 'make'),
+            ('stock_number', 'stock_number'),
+            ('views_count', 'views'),
+            ('created_at', 'date'),
+            ('updated_at', 'updated'),
+        )
+    )
+    
+    class Meta:
+        model = Vehicle
+        fields = [
+            'status', 'make', 'model', 'body_type', 'year_min', 'year_max',
+            'price_min', 'price_max', 'q'
+        ]
+    
+    def filter_search(self, queryset, name, value):
+        """Match make, model, trim, VIN or stock number."""
+        value = value.strip()
+        if not value:
+            return queryset
+        return queryset.filter(
+            models.Q(make__icontains=value) |
+            models.Q(model__icontains=value) |
+            models.Q(trim__icontains=value) |
+            models.Q(vin__icontains=value) |
+            models.Q(stock_number__icontains=value)
+        )
+
+
 # Import models at end
 from django.db import models
@@ -219,6 +219,7 @@ class Command(BaseCommand):
             vehicle=active_vehicle,
             buyer=buyer,
             defaults={
+                'dealer': active_vehicle.dealer,
                 'status': 'active',
                 'expires_at': timezone.now() + timedelta(days=2)
             }
@@ -239,6 +240,7 @@ class Command(BaseCommand):
             vehicle=accepted_vehicle,
             buyer=buyer,
             defaults={
+                'dealer': accepted_vehicle.dealer,
                 'status': 'accepted',
                 'expires_at': timezone.now() + timedelta(days=1),
                 'accepted_price': accepted_vehicle.asking_price - 500,
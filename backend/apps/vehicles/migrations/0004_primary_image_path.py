@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0003_add_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='primary_image_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='savedvehicle',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='vehicles_sa_user_id_131cca_idx'),
+        ),
+    ]
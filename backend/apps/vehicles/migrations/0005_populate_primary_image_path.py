@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+
+
+def populate_primary_image_path(apps, schema_editor):
+    """Copy each vehicle's primary image (thumbnail when processed) path."""
+    Vehicle = apps.get_model('vehicles', 'Vehicle')
+    VehicleImage = apps.get_model('vehicles', 'VehicleImage')
+    primary = VehicleImage.objects.filter(
+        vehicle_id=OuterRef('pk')
+    ).order_by('-is_primary', 'display_order', 'created_at').values(
+        path=Coalesce(NullIf('thumbnail', Value('')), 'image', output_field=CharField())
+    )[:1]
+    Vehicle.objects.update(
+        primary_image_path=Coalesce(Subquery(primary), Value(''))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0004_primary_image_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_primary_image_path, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0001_initial'),
+        ('vehicles', '0005_populate_primary_image_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['dealer', '-created_at', '-id'], name='vehicles_ve_dealer__c88b41_idx'),
+        ),
+    ]
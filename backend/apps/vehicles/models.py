@@ -64,6 +64,10 @@ class Vehicle(TimeStampedModel):
     )
     views_count = models.PositiveIntegerField(default=0)
     
+    # Denormalized storage path of the primary image (thumbnail once
+    # processed) so card lists need no image query
+    primary_image_path = models.CharField(max_length=255, blank=True)
+    
     class Meta:
         verbose_name = 'vehicle'
         verbose_name_plural = 'vehicles'
@@ -74,6 +78,8 @@ class Vehicle(TimeStampedModel):
             models.Index(fields=['asking_price']),
             models.Index(fields=['body_type']),
             models.Index(fields=['-created_at']),
+            # Dealer inventory grid, newest first
+            models.Index(fields=['dealer', '-created_at', '-id']),
         ]
         constraints = [
             models.CheckConstraint(
@@ -98,6 +104,16 @@ class Vehicle(TimeStampedModel):
         """Get the primary image for this vehicle."""
         return self.images.filter(is_primary=True).first() or self.images.first()
     
+    def refresh_primary_image(self):
+        """Recompute primary_image_path from the vehicle's images."""
+        image = self.images.order_by('-is_primary', 'display_order', 'created_at').first()
+        path = ''
+        if image:
+            path = image.thumbnail.name or image.image.name or ''
+        if path != self.primary_image_path:
+            Vehicle.objects.filter(pk=self.pk).update(primary_image_path=path)
+            self.primary_image_path = path
+    
     @property
     def discount_from_msrp(self):
         """Calculate the discount from MSRP."""
@@ -158,6 +174,12 @@ class VehicleImage(TimeStampedModel):
                 is_primary=True
             ).exclude(pk=self.pk).update(is_primary=False)
         super().save(*args, **kwargs)
+        self.vehicle.refresh_primary_image()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.vehicle.refresh_primary_image()
+        return result
 
 
 class SavedVehicle(TimeStampedModel):
@@ -180,6 +202,10 @@ class SavedVehicle(TimeStampedModel):
         verbose_name_plural = 'saved vehicles'
         ordering = ['-created_at']
         unique_together = ['user', 'vehicle']  # Prevent duplicate saves
+        indexes = [
+            # Keyset pagination of a user's saved list
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} saved {self.vehicle}"
@@ -1,6 +1,7 @@
 """
 Vehicle Serializers for CarNegotiate API.
 """
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from decimal import Decimal
 
@@ -279,6 +280,69 @@ class VehicleSearchSerializer(serializers.Serializer):
     offset = serializers.IntegerField(default=0, min_value=0)
 
 
+class VehicleCardSerializer(serializers.ModelSerializer):
+    """Slim vehicle card; reads the denormalized primary image path."""
+    title = serializers.SerializerMethodField()
+    primary_image = serializers.SerializerMethodField()
+    mileage = serializers.SerializerMethodField()
+    dealer = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Vehicle
+        fields = [
+            'id', 'title', 'make', 'model', 'year', 'trim',
+            'msrp', 'asking_price', 'mileage', 'primary_image',
+            'dealer', 'status'
+        ]
+    
+    def get_title(self, obj):
+        return f"{obj.year} {obj.make} {obj.model}"
+    
+    def get_mileage(self, obj):
+        if obj.specifications:
+            return obj.specifications.get('mileage', 0)
+        return 0
+    
+    def get_primary_image(self, obj):
+        if not obj.primary_image_path:
+            return None
+        url = default_storage.url(obj.primary_image_path)
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(url)
+        return url
+    
+    def get_dealer(self, obj):
+        return {
+            'id': str(obj.dealer_id),
+            'business_name': obj.dealer.business_name,
+            'city': obj.dealer.city,
+            'state': obj.dealer.state,
+        }
+
+
+class InventoryVehicleSerializer(VehicleCardSerializer):
+    """Dealer inventory grid row; expects a queryset limited with only()."""
+    dealer = None
+    
+    class Meta:
+        model = Vehicle
+        fields = [
+            'id', 'title', 'vin', 'stock_number', 'make', 'model', 'year', 'trim',
+            'msrp', 'floor_price', 'asking_price', 'mileage', 'primary_image',
+            'status', 'views_count', 'created_at', 'updated_at'
+        ]
+
+
+class SavedVehicleListSerializer(serializers.ModelSerializer):
+    """Saved vehicle entry for the paginated saved list."""
+    vehicle = VehicleCardSerializer(read_only=True)
+    
+    class Meta:
+        model = SavedVehicle
+        fields = ['id', 'vehicle', 'created_at']
+
+
 class SavedVehicleSerializer(serializers.ModelSerializer):
     """Serializer for saved vehicles."""
     vehicle = VehicleListSerializer(read_only=True)
@@ -2,16 +2,47 @@
 Vehicle Service Layer for CarNegotiate.
 Handles vehicle creation, updates, search, and image processing.
 """
-from typing import List
+import logging
+from typing import Iterable, List, Set
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from .models import Vehicle, VehicleImage
+from django.conf import settings
+
+from core.realtime import get_redis
+from .models import Vehicle, VehicleImage, SavedVehicle
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+SAVED_IDS_KEY = 'saved_vehicles:{user_id}'
+# Member that marks a loaded set, so users with no saves still hit the cache
+SAVED_IDS_SENTINEL = '-'
+
+# Columns the dealer inventory grid reads (see InventoryVehicleSerializer)
+INVENTORY_GRID_FIELDS = (
+    'id', 'dealer_id', 'vin', 'stock_number', 'make', 'model', 'year', 'trim',
+    'msrp', 'floor_price', 'asking_price', 'specifications', 'primary_image_path',
+    'status', 'views_count', 'created_at', 'updated_at',
+)
+
+
+def _enqueue_price_drop(vehicle_id: str, old_price: str):
+    """
+    Enqueue price-drop alerts for a vehicle. Runs after the price change
+    has committed, so a broker failure is logged rather than failing the
+    request that saved it.
+    """
+    from apps.notifications.tasks import notify_price_drop
+    try:
+        notify_price_drop.delay(vehicle_id, old_price)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue price-drop alerts for vehicle {vehicle_id}: {e}")
+
 
 class VehicleService:
     """
@@ -123,13 +154,35 @@ class VehicleService:
             'msrp', 'asking_price', 'floor_price', 'stock_number'
         ]
         
+        old_price = vehicle.asking_price
         for field, value in kwargs.items():
             if field in allowed_fields and value is not None:
                 setattr(vehicle, field, value)
         
         vehicle.save()
+        cls.handle_price_change(vehicle, old_price)
         return vehicle
     
+    @classmethod
+    def handle_price_change(cls, vehicle: Vehicle, old_price: Decimal) -> bool:
+        """
+        Queue price-drop alerts for savers once the update commits.
+        
+        Returns:
+            True if alerts were queued
+        """
+        if (
+            old_price is None
+            or vehicle.asking_price is None
+            or vehicle.asking_price >= old_price
+            or vehicle.status != Vehicle.Status.ACTIVE
+        ):
+            return False
+        
+        vehicle_id, price = str(vehicle.pk), str(old_price)
+        transaction.on_commit(lambda: _enqueue_price_drop(vehicle_id, price))
+        return True
+    
     @classmethod
     def publish_vehicle(cls, vehicle: Vehicle) -> Vehicle:
         """
@@ -171,6 +224,83 @@ class VehicleService:
         vehicle.save()
         return vehicle
     
+    # -------------------------------------------------------------------------
+    # Dealer Inventory
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def get_inventory_queryset(cls, dealer):
+        """Dealer's vehicles in every status, limited to the grid columns."""
+        return Vehicle.objects.filter(dealer=dealer).only(*INVENTORY_GRID_FIELDS)
+    
+    @classmethod
+    def get_inventory_status_counts(cls, dealer) -> dict:
+        """Count the dealer's vehicles per status in a single aggregate query."""
+        return Vehicle.objects.filter(dealer=dealer).aggregate(
+            total=Count('id'),
+            **{
+                value: Count('id', filter=Q(status=value))
+                for value in Vehicle.Status.values
+            }
+        )
+    
+    # -------------------------------------------------------------------------
+    # Saved Vehicles
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def get_saved_vehicle_ids(cls, user: User, vehicle_ids: Iterable[str]) -> Set[str]:
+        """
+        Return which of vehicle_ids the user has saved.
+        
+        Answered from a per-user Redis set holding all of the user's saved
+        ids, loaded from the database on a miss. Falls back to a database
+        query if Redis is unavailable.
+        """
+        vehicle_ids = list(vehicle_ids)
+        if not vehicle_ids:
+            return set()
+        key = SAVED_IDS_KEY.format(user_id=user.pk)
+        
+        try:
+            client = get_redis()
+            pipe = client.pipeline(transaction=False)
+            pipe.exists(key)
+            pipe.smismember(key, vehicle_ids)
+            exists, members = pipe.execute()
+            if exists:
+                return {vid for vid, member in zip(vehicle_ids, members) if member}
+            
+            saved = {
+                str(vid) for vid in
+                SavedVehicle.objects.filter(user=user).values_list('vehicle_id', flat=True)
+            }
+            pipe = client.pipeline(transaction=False)
+            pipe.sadd(key, SAVED_IDS_SENTINEL, *saved)
+            pipe.expire(key, settings.SAVED_VEHICLES_CACHE_SECONDS)
+            pipe.execute()
+            return saved.intersection(vehicle_ids)
+        except Exception as e:
+            logger.warning(f"Saved vehicle cache unavailable: {e}")
+            return {
+                str(vid) for vid in SavedVehicle.objects.filter(
+                    user=user, vehicle_id__in=vehicle_ids
+                ).values_list('vehicle_id', flat=True)
+            }
+    
+    @classmethod
+    def invalidate_saved_vehicle_ids(cls, user_id) -> None:
+        """Drop the user's cached saved set once the transaction commits."""
+        key = SAVED_IDS_KEY.format(user_id=user_id)
+        
+        def _delete():
+            try:
+                get_redis().delete(key)
+            except Exception as e:
+                logger.warning(f"Failed to invalidate saved vehicle cache: {e}")
+        
+        transaction.on_commit(_delete)
+    
     # -------------------------------------------------------------------------
     # Image Management
     # -------------------------------------------------------------------------
@@ -230,6 +360,7 @@ class VehicleService:
                 id=image_id,
                 vehicle=vehicle
             ).update(display_order=order)
+        vehicle.refresh_primary_image()
     
     @classmethod
     def delete_image(cls, image: VehicleImage) -> None:
@@ -1,9 +1,19 @@
 """
 Vehicle ViewSet for CarNegotiate API.
 """
+import csv
+import itertools
+import json
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
@@ -15,14 +25,55 @@ from .serializers import (
     VehicleDetailSerializer, 
     VehicleCreateSerializer, 
     VehicleUpdateSerializer,
-    SavedVehicleSerializer
+    SavedVehicleSerializer,
+    SavedVehicleListSerializer,
+    InventoryVehicleSerializer,
 )
-from .filters import VehicleFilterSet
+from .filters import VehicleFilterSet, InventoryFilterSet
+from .services import VehicleService
+from core.pagination import CursorResultsSetPagination
+from core.utils import EchoBuffer
 
 
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 
+# Bulk upload CSV columns; inventory exports use the same headers so an
+# export can be edited and uploaded again
+BULK_UPLOAD_HEADERS = [
+    'vin', 'make', 'model', 'year', 'trim', 'body_type',
+    'price', 'msrp', 'floor_price', 'mileage', 'transmission',
+    'fuel_type', 'exterior_color', 'interior_color', 'features', 'description', 'status', 'image_url'
+]
+
+# Queryset column behind each bulk upload header
+INVENTORY_EXPORT_COLUMNS = {
+    'vin': 'vin',
+    'make': 'make',
+    'model': 'model',
+    'year': 'year',
+    'trim': 'trim',
+    'body_type': 'body_type',
+    'price': 'asking_price',
+    'msrp': 'msrp',
+    'floor_price': 'floor_price',
+    'mileage': 'specifications__mileage',
+    'transmission': 'specifications__transmission',
+    'fuel_type': 'specifications__fuel_type',
+    'exterior_color': 'exterior_color',
+    'interior_color': 'interior_color',
+    'features': 'features',
+    'description': 'specifications__description',
+    'status': 'status',
+    'image_url': 'primary_image_path',
+}
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'inventory.csv'),
+    'ndjson': ('application/x-ndjson', 'inventory.ndjson'),
+}
+
+
 class VehicleViewSet(viewsets.ModelViewSet):
     """
     Vehicle CRUD operations.
@@ -38,8 +89,11 @@ class VehicleViewSet(viewsets.ModelViewSet):
     - GET /vehicles/featured/ - Get featured vehicles
     - GET /vehicles/makes/ - Get list of car makes
     - GET /vehicles/{id}/similar/ - Get similar vehicles
-    - GET /vehicles/saved/ - Get user's saved vehicles
+    - GET /vehicles/my_inventory/ - Dealer's inventory (paginated, with status counts)
+    - GET /vehicles/my_inventory/export/ - Stream dealer's inventory (CSV or NDJSON)
+    - GET /vehicles/saved/ - Get user's saved vehicles (cursor-paginated)
     - POST /vehicles/saved/ - Save a vehicle
+    - GET /vehicles/saved/contains/?ids= - Which of the given vehicles are saved
     - DELETE /vehicles/saved/{vehicle_id}/ - Remove from saved
     """
     queryset = Vehicle.objects.select_related('dealer', 'dealer__user').prefetch_related('images')
@@ -89,6 +143,12 @@ class VehicleViewSet(viewsets.ModelViewSet):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("Only dealers can create vehicles")
     
+    def perform_update(self, serializer):
+        """Save the update and alert savers if the price dropped."""
+        old_price = serializer.instance.asking_price
+        vehicle = serializer.save()
+        VehicleService.handle_price_change(vehicle, old_price)
+    
     def destroy(self, request, *args, **kwargs):
         """Soft delete - mark vehicle as inactive instead of deleting."""
         vehicle = self.get_object()
@@ -96,26 +156,94 @@ class VehicleViewSet(viewsets.ModelViewSet):
         vehicle.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
+    def _get_inventory(self, request):
+        """Dealer's filtered and sorted inventory queryset."""
+        if not hasattr(request.user, 'dealer_profile'):
+            raise PermissionDenied('Only dealers can access inventory')
+        
+        filterset = InventoryFilterSet(
+            request.query_params,
+            queryset=VehicleService.get_inventory_queryset(request.user.dealer_profile)
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        
+        queryset = filterset.qs
+        # Tie-break on id so pages stay stable when the sort key repeats
+        ordering = queryset.query.order_by or ('-created_at',)
+        return queryset.order_by(*ordering, '-id')
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_inventory(self, request):
-        """Get dealer's own vehicles with all statuses."""
-        if not hasattr(request.user, 'dealer_profile'):
-            return Response(
-                {'detail': 'Only dealers can access inventory'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        """
+        Get dealer's own vehicles with all statuses (paginated).
         
-        vehicles = Vehicle.objects.filter(
-            dealer=request.user.dealer_profile
-        ).select_related('dealer', 'dealer__user').prefetch_related('images')
+        GET /api/v1/vehicles/my_inventory/?status=active&q=camry&ordering=-price
         
-        # Optional status filter
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            vehicles = vehicles.filter(status=status_filter)
+        status_counts covers the whole inventory, for the status tabs.
+        """
+        queryset = self._get_inventory(request)
+        page = self.paginate_queryset(queryset)
+        serializer = InventoryVehicleSerializer(page, many=True, context={'request': request})
+        response = self.get_paginated_response(serializer.data)
+        response.data['status_counts'] = VehicleService.get_inventory_status_counts(
+            request.user.dealer_profile
+        )
+        return response
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        url_path='my_inventory/export'
+    )
+    def export_inventory(self, request):
+        """
+        Stream the dealer's inventory with the bulk upload columns.
         
-        serializer = VehicleListSerializer(vehicles, many=True)
-        return Response({'results': serializer.data})
+        GET /api/v1/vehicles/my_inventory/export/?output=ndjson&status=active
+        
+        output is csv (default) or ndjson; accepts the my_inventory filters
+        and ordering. Rows are read through a server-side cursor, so memory
+        stays flat however large the inventory is.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+        
+        rows = self._iter_export_rows(self._get_inventory(request), request)
+        if output == 'csv':
+            writer = csv.writer(EchoBuffer())
+            lines = itertools.chain(
+                [writer.writerow(BULK_UPLOAD_HEADERS)],
+                (writer.writerow(row) for row in rows)
+            )
+        else:
+            lines = (
+                json.dumps(dict(zip(BULK_UPLOAD_HEADERS, row)), cls=DjangoJSONEncoder) + '\n'
+                for row in rows
+            )
+        
+        content_type, filename = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def _iter_export_rows(self, queryset, request):
+        """Yield one list per vehicle, in BULK_UPLOAD_HEADERS order."""
+        columns = [INVENTORY_EXPORT_COLUMNS[header] for header in BULK_UPLOAD_HEADERS]
+        features = BULK_UPLOAD_HEADERS.index('features')
+        image_url = BULK_UPLOAD_HEADERS.index('image_url')
+        
+        rows = queryset.values_list(*columns).iterator(
+            chunk_size=settings.INVENTORY_EXPORT_CHUNK_SIZE
+        )
+        for row in rows:
+            row = list(row)
+            row[features] = ', '.join(row[features] or [])
+            if row[image_url]:
+                row[image_url] = request.build_absolute_uri(default_storage.url(row[image_url]))
+            yield row
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def upload_images(self, request, pk=None):
@@ -511,11 +639,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
         
         GET /api/v1/vehicles/bulk_upload_template/
         """
-        headers = [
-            'vin', 'make', 'model', 'year', 'trim', 'body_type',
-            'price', 'msrp', 'floor_price', 'mileage', 'transmission',
-            'fuel_type', 'exterior_color', 'interior_color', 'features', 'description', 'status', 'image_url'
-        ]
+        headers = BULK_UPLOAD_HEADERS
         
         sample_data = [
             '1HGCV1F34LA123456', 'Honda', 'Accord', '2025', 'EX-L', 'sedan',
@@ -568,22 +692,6 @@ class VehicleViewSet(viewsets.ModelViewSet):
         serializer = VehicleListSerializer(queryset, many=True)
         return Response({'results': serializer.data})
     
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
-    def my_inventory(self, request):
-        """Get dealer's own inventory."""
-        if not hasattr(request.user, 'dealer_profile'):
-            return Response({'results': []})
-        
-        queryset = self.queryset.filter(dealer=request.user.dealer_profile)
-        
-        # Filter by status if provided
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        serializer = VehicleListSerializer(queryset, many=True)
-        return Response({'results': serializer.data})
-    
     # ==================== NEW ENDPOINTS ====================
     
     @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
@@ -668,10 +776,12 @@ class VehicleViewSet(viewsets.ModelViewSet):
         if request.method == 'GET':
             saved = SavedVehicle.objects.filter(
                 user=request.user
-            ).select_related('vehicle__dealer').prefetch_related('vehicle__images')
+            ).select_related('vehicle__dealer').defer('vehicle__features')
             
-            serializer = SavedVehicleSerializer(saved, many=True)
-            return Response({'results': serializer.data})
+            paginator = CursorResultsSetPagination()
+            page = paginator.paginate_queryset(saved, request, view=self)
+            serializer = SavedVehicleListSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         
         elif request.method == 'POST':
             serializer = SavedVehicleSerializer(
@@ -680,9 +790,36 @@ class VehicleViewSet(viewsets.ModelViewSet):
             )
             if serializer.is_valid():
                 serializer.save()
+                VehicleService.invalidate_saved_vehicle_ids(request.user.pk)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    # Registered before remove_saved (routes follow method name order), so
+    # "contains" is not captured as a vehicle id
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='saved/contains',
+        permission_classes=[IsAuthenticated]
+    )
+    def check_saved(self, request):
+        """
+        GET /vehicles/saved/contains/?ids=<uuid>,<uuid>
+        
+        Report which of the given vehicles the user has saved, so listing
+        grids can mark saved vehicles without loading the saved list.
+        """
+        raw_ids = [i for i in request.query_params.get('ids', '').split(',') if i.strip()]
+        if len(raw_ids) > 100:
+            raise ValidationError({'ids': 'At most 100 ids per request.'})
+        try:
+            vehicle_ids = [str(uuid.UUID(i.strip())) for i in raw_ids]
+        except ValueError:
+            raise ValidationError({'ids': 'Must be a comma-separated list of vehicle ids.'})
+        
+        saved = VehicleService.get_saved_vehicle_ids(request.user, vehicle_ids)
+        return Response({'saved': {vid: vid in saved for vid in vehicle_ids}})
+    
     @action(
         detail=False, 
         methods=['delete'], 
@@ -701,6 +838,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
                 vehicle_id=vehicle_id
             )
             saved.delete()
+            VehicleService.invalidate_saved_vehicle_ids(request.user.pk)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except SavedVehicle.DoesNotExist:
             return Response(
@@ -2,6 +2,11 @@
 ASGI config for CarNegotiate project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+
+Serve under ASGI so the Server-Sent Events stream (/api/v1/notifications/stream/)
+holds idle connections on the event loop instead of a worker thread each:
+
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
 """
 import os
 
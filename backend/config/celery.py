@@ -0,0 +1,19 @@
+"""
+Celery application for CarNegotiate.
+
+Tasks are declared with @shared_task in each app's tasks.py and picked up
+by autodiscovery; CELERY_* settings (including the beat schedule) are read
+from Django settings.
+
+    celery -A config worker -l info
+    celery -A config beat -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+app = Celery('carnegotiate')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -7,6 +7,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -183,6 +184,9 @@ CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Redis (shared by Celery, cache and the real-time push channel)
+REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/0')
+
 # Celery Configuration
 CELERY_BROKER_URL = env('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = env('REDIS_URL', default='redis://localhost:6379/0')
@@ -193,6 +197,51 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 
+# Periodic tasks (run by `celery -A config beat`)
+CELERY_BEAT_SCHEDULE = {
+    # Recovers outbox entries a broker outage left undispatched
+    'relay-notification-outbox': {
+        'task': 'apps.notifications.tasks.relay_notification_outbox',
+        'schedule': 60,
+    },
+    'expire-negotiations': {
+        'task': 'apps.negotiations.tasks.expire_negotiations',
+        'schedule': 5 * 60,
+    },
+    'check-expiring-negotiations': {
+        'task': 'apps.negotiations.tasks.check_expiring_negotiations',
+        'schedule': crontab(minute=0),
+    },
+    'reconcile-unread-counts': {
+        'task': 'apps.notifications.tasks.reconcile_unread_counts',
+        'schedule': 15 * 60,
+    },
+    'send-daily-digest': {
+        'task': 'apps.notifications.tasks.send_daily_digest',
+        'schedule': crontab(hour=9, minute=0),
+    },
+    'cleanup-old-notifications': {
+        'task': 'apps.notifications.tasks.cleanup_old_notifications',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'archive-closed-negotiation-offers': {
+        'task': 'apps.negotiations.tasks.archive_closed_negotiation_offers',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'cleanup-orphaned-images': {
+        'task': 'apps.vehicles.tasks.cleanup_orphaned_images',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'rollup-dealer-metrics': {
+        'task': 'apps.analytics.tasks.rollup_dealer_metrics',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'rollup-dealer-metrics-today': {
+        'task': 'apps.analytics.tasks.rollup_dealer_metrics_today',
+        'schedule': crontab(minute=30),
+    },
+}
+
 # Redis Cache
 CACHES = {
     'default': {
@@ -266,3 +315,35 @@ LOGGING = {
 NEGOTIATION_EXPIRY_HOURS = 72  # Negotiations expire after 72 hours
 NEGOTIATION_WARNING_HOURS = 24  # Warn 24 hours before expiration
 MIN_OFFER_PERCENTAGE = 50  # Minimum offer must be 50% of asking price
+NEGOTIATION_STATS_CACHE_SECONDS = 300  # Per-user stats cache, cleared on transitions
+OFFER_ARCHIVE_AFTER_DAYS = 30  # Move offers of closed negotiations to the archive table
+OFFER_ARCHIVE_BATCH_SIZE = 500  # Negotiations archived per transaction
+NEGOTIATION_BULK_MAX_ACTIONS = 100  # Actions per bulk dealer request
+
+# Vehicle Settings
+SAVED_VEHICLES_CACHE_SECONDS = 3600  # Per-user Redis set of saved vehicle ids
+INVENTORY_EXPORT_CHUNK_SIZE = 2000  # Rows per server-side cursor fetch when streaming exports
+
+# Analytics Settings
+DEALER_METRICS_BATCH_SIZE = 1000  # DealerMetrics rows per upsert in the daily rollup
+
+# Notification Settings
+NOTIFICATION_OUTBOX_BATCH_SIZE = 100  # Outbox entries per delivery task
+NOTIFICATION_OUTBOX_RETENTION_DAYS = 7  # Dispatched entries kept for auditing
+NOTIFICATION_RETENTION_DAYS = 90  # Read notifications older than this are deleted
+NOTIFICATION_RETENTION_BATCH_SIZE = 1000  # Rows deleted per transaction
+NOTIFICATION_RETENTION_BATCH_PAUSE = 0.1  # Seconds between batches to spare replication
+NOTIFICATION_EMAIL_MAX_RETRIES = 5  # Retries of a batch after transient SMTP failures
+NOTIFICATION_EMAIL_RETRY_BACKOFF = 60  # Seconds before the first retry, doubled each time
+NOTIFICATION_FANOUT_CHUNK_SIZE = 1000  # Recipients per insert/SMTP batch in fan-outs
+NOTIFICATION_UNREAD_CACHE_SECONDS = 86400  # Per-user unread counter in Redis
+NOTIFICATION_UNREAD_RECONCILE_BATCH_SIZE = 500  # Counters recounted per query
+NOTIFICATION_PREFERENCES_CACHE_SECONDS = 3600  # Per-user preferences in the cache
+NOTIFICATION_DIGEST_CHUNK_SIZE = 500  # Digests per sending task
+NOTIFICATION_DIGEST_TITLE_COUNT = 5  # Most recent titles listed in a digest
+NOTIFICATION_COALESCE_SECONDS = 120  # Offer updates within this fold into the unread notification
+NOTIFICATION_EMAIL_DEBOUNCE_SECONDS = 60  # Offer emails wait this long for further updates
+
+# Real-time Settings
+SSE_HEARTBEAT_SECONDS = 15  # Keepalive comment interval on the event stream
+LONGPOLL_TIMEOUT_SECONDS = 25  # Longest /notifications/wait/ hold, under proxy idle timeouts
@@ -10,8 +10,12 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
 # CORS - Allow all origins in development
 CORS_ALLOW_ALL_ORIGINS = True
 
-# Email - Use console backend in development
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Email - Use console backend in development. To exercise real SMTP
+# delivery, run a local stand-in (pip install aiosmtpd):
+#   python -m aiosmtpd -n -l localhost:1025
+# and set EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend,
+# EMAIL_PORT=1025, EMAIL_USE_TLS=False
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')  # noqa: F405
 
 # Use local file storage in development
 DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
@@ -41,8 +45,11 @@ CACHES = {
     }
 }
 
-# Celery - Use synchronous execution in development
+# Celery - Use synchronous execution in development. As on a worker, a
+# failing task is logged and recorded on its result rather than raised
+# into the request that queued it, and task.retry() runs inline.
 CELERY_TASK_ALWAYS_EAGER = True
-CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_EAGER_PROPAGATES = False
 CELERY_BROKER_URL = 'memory://'
 CELERY_RESULT_BACKEND = 'cache'
+CELERY_CACHE_BACKEND = 'memory'
@@ -1,7 +1,7 @@
 """
 Custom pagination classes for CarNegotiate API.
 """
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -23,3 +23,11 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+
+class CursorResultsSetPagination(CursorPagination):
+    """Keyset pagination, newest first; stable under inserts and cheap at any depth."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,236 @@
+"""
+Real-time push channel for CarNegotiate.
+
+Services publish small events to a per-user Redis pub/sub channel after
+their transaction commits. The SSE endpoint holds one shared Redis
+subscription per worker process and fans messages out to connected
+clients, so idle browsers cost an asyncio queue rather than a Redis
+connection or a polling request each.
+
+Clients that cannot hold a stream open long-poll instead: the waiting
+request joins the same hub as an SSE client would, so every open request
+of a user is woken by the user's next notification event.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_sync_client = None
+
+
+def user_channel(user_id) -> str:
+    """Redis channel name for a user's event stream."""
+    return f"realtime:user:{user_id}"
+
+
+def get_redis():
+    """Get the process-wide synchronous Redis client."""
+    global _sync_client
+    if _sync_client is None:
+        import redis
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
+
+
+def publish_to_users(user_ids: Iterable, event: str, data: dict) -> None:
+    """
+    Publish an event to each user's channel once the current transaction commits.
+
+    Failures are logged and swallowed: the push channel is best-effort and
+    clients fall back to polling.
+    """
+    user_ids = {str(user_id) for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    message = json.dumps({'event': event, 'data': data}, default=str)
+
+    def _publish():
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.publish(user_channel(user_id), message)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish realtime event '{event}': {e}")
+
+    transaction.on_commit(_publish)
+
+
+def publish_many(messages: Iterable) -> None:
+    """
+    Publish several (user_ids, event, data) messages in one pipeline once
+    the current transaction commits. Same best-effort semantics as
+    publish_to_users.
+    """
+    frames = []
+    for user_ids, event, data in messages:
+        message = json.dumps({'event': event, 'data': data}, default=str)
+        frames.extend(
+            (user_channel(user_id), message) for user_id in {str(u) for u in user_ids if u}
+        )
+    if not frames:
+        return
+
+    def _publish():
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for channel, message in frames:
+                pipe.publish(channel, message)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(frames)} realtime events: {e}")
+
+    transaction.on_commit(_publish)
+
+
+class RealtimeHub:
+    """
+    Shares one Redis pub/sub connection between all SSE clients of a process.
+
+    Each connected client gets an asyncio.Queue; the hub subscribes to a
+    user's channel when their first client connects and unsubscribes when
+    the last one leaves.
+    """
+
+    def __init__(self):
+        self._queues = defaultdict(set)
+        self._client = None
+        self._pubsub = None
+        self._reader = None
+        self._lock = asyncio.Lock()
+
+    async def join(self, user_id) -> asyncio.Queue:
+        """Register a client for a user and return its message queue."""
+        queue = asyncio.Queue(maxsize=100)
+        channel = user_channel(user_id)
+        async with self._lock:
+            await self._ensure_connected()
+            first = not self._queues[channel]
+            self._queues[channel].add(queue)
+            if first:
+                await self._pubsub.subscribe(channel)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        return queue
+
+    async def leave(self, user_id, queue: asyncio.Queue) -> None:
+        """Unregister a client, dropping the subscription if it was the last."""
+        channel = user_channel(user_id)
+        async with self._lock:
+            self._queues[channel].discard(queue)
+            if not self._queues[channel]:
+                del self._queues[channel]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(channel)
+
+    async def _ensure_connected(self):
+        if self._pubsub is None:
+            from redis import asyncio as aioredis
+            self._client = aioredis.Redis.from_url(settings.REDIS_URL)
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+    async def _read(self):
+        """Fan incoming messages out to every queue on the channel."""
+        while self._queues:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                logger.warning(f"Realtime subscription error: {e}")
+                await self._reset()
+                return
+            if not message or message.get('type') != 'message':
+                continue
+            channel = message['channel'].decode()
+            payload = message['data'].decode()
+            for queue in list(self._queues.get(channel, ())):
+                if queue.full():
+                    # Slow consumer: drop the oldest event rather than block the hub
+                    queue.get_nowait()
+                queue.put_nowait(payload)
+
+    async def _reset(self):
+        """Drop the broken connection and disconnect clients so they reconnect."""
+        async with self._lock:
+            queues = [q for qs in self._queues.values() for q in qs]
+            self._queues.clear()
+            pubsub, client = self._pubsub, self._client
+            self._pubsub = self._client = None
+        for queue in queues:
+            queue.put_nowait(None)
+        try:
+            await pubsub.aclose()
+            await client.aclose()
+        except Exception:
+            pass
+
+
+hub = RealtimeHub()
+
+
+def format_sse(event: str, data: str) -> str:
+    """Format a Server-Sent Events frame."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def wait_for_event(queue: asyncio.Queue, event: str, timeout: float) -> bool:
+    """
+    Wait on a hub queue until an event of the given type arrives or the timeout passes.
+
+    Anything else already queued is dropped on wake-up, since the caller
+    re-checks its source of truth anyway.
+
+    Returns:
+        True if the event arrived, False on timeout
+
+    Raises:
+        ConnectionError: if the hub lost its Redis subscription
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            payload = await asyncio.wait_for(queue.get(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return False
+        if payload is None:
+            raise ConnectionError("Realtime subscription lost")
+        if json.loads(payload)['event'] == event:
+            while not queue.empty():
+                if queue.get_nowait() is None:
+                    raise ConnectionError("Realtime subscription lost")
+            return True
+
+
+async def stream_user_events(user_id):
+    """
+    Async generator of SSE frames for a user.
+
+    Sends a comment line every SSE_HEARTBEAT_SECONDS so proxies keep the
+    connection open.
+    """
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+    queue = await hub.join(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if payload is None:
+                break
+            message = json.loads(payload)
+            yield format_sse(message['event'], json.dumps(message['data']))
+    finally:
+        await hub.leave(user_id, queue)
@@ -55,3 +55,10 @@ def sanitize_dict(data: Dict[str, Any], sensitive_keys: list = None) -> Dict[str
         else:
             result[key] = value
     return result
+
+
+class EchoBuffer:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+    
+    def write(self, value):
+        return value
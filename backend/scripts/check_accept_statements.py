@@ -0,0 +1,142 @@
+"""
+Statement-count benchmark for accepting an offer.
+
+Builds throwaway data inside a transaction that is rolled back: a vehicle
+with a negotiation to accept and a growing number of competing
+negotiations from other buyers. Accepting must issue the same number of
+SQL statements (ACCEPT_STATEMENT_COUNT) however many negotiations are
+cancelled alongside it.
+
+Usage:
+    python scripts/check_accept_statements.py
+"""
+import os
+import sys
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.dealers.models import Dealer
+from apps.negotiations.models import Negotiation, Offer
+from apps.negotiations.services import NegotiationService
+from apps.vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Pending offer, negotiation/sibling UPDATE ... RETURNING, offer UPDATE,
+# vehicle UPDATE, event INSERT, bulk event INSERT, notification INSERT,
+# outbox INSERT, the dealer's user for the notification and the recipient's
+# notification preferences. The bulk event INSERT is skipped when there is
+# nothing to cancel; the preferences SELECT when they are already cached,
+# which they are not for the fresh users built here.
+ACCEPT_STATEMENT_COUNT = 10
+
+SIBLING_COUNTS = [0, 5, 50]
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_vehicle(sibling_count: int):
+    suffix = uuid.uuid4().hex[:8]
+    dealer_user = User.objects.create_user(f'accept_dealer_{suffix}@example.com', 'x', user_type='dealer')
+    dealer = Dealer.objects.create(
+        user=dealer_user,
+        business_name=f'Accept Bench Motors {suffix}',
+        license_number=f'AB{suffix}',
+    )
+    vehicle = Vehicle.objects.create(
+        dealer=dealer,
+        vin=f'AB{uuid.uuid4().hex[:15]}'.upper(),
+        make='TestMake',
+        model='TestModel',
+        year=2024,
+        msrp=Decimal('30000'),
+        floor_price=Decimal('25000'),
+        asking_price=Decimal('29000'),
+        status='active',
+    )
+
+    negotiations = []
+    for i in range(sibling_count + 1):
+        buyer = User.objects.create_user(f'accept_buyer_{suffix}_{i}@example.com', 'x', user_type='buyer')
+        negotiation = Negotiation.objects.create(
+            vehicle=vehicle,
+            buyer=buyer,
+            dealer=dealer,
+            status=Negotiation.Status.ACTIVE,
+            expires_at=timezone.now() + timedelta(hours=72),
+        )
+        Offer.objects.create(
+            negotiation=negotiation,
+            amount=Decimal('27000') + i,
+            offered_by=Offer.OfferedBy.BUYER,
+            status=Offer.Status.PENDING,
+        )
+        negotiations.append(negotiation)
+    return negotiations[0], dealer_user
+
+
+def measure(sibling_count: int):
+    negotiation, dealer_user = build_vehicle(sibling_count)
+    # Loaded the way the accept endpoint loads it
+    negotiation = Negotiation.objects.select_related(
+        'vehicle', 'dealer', 'buyer'
+    ).get(pk=negotiation.pk)
+    dealer_user = User.objects.select_related('dealer_profile').get(pk=dealer_user.pk)
+
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as ctx:
+        with transaction.atomic():
+            NegotiationService.accept_offer(negotiation, dealer_user)
+    elapsed = time.perf_counter() - started
+
+    statements = [
+        q['sql'] for q in ctx.captured_queries
+        if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+    ]
+    cancelled = Negotiation.objects.filter(
+        vehicle_id=negotiation.vehicle_id, status=Negotiation.Status.CANCELLED
+    ).count()
+    assert cancelled == sibling_count, (cancelled, sibling_count)
+    return len(statements), elapsed
+
+
+def run() -> bool:
+    results = []
+    try:
+        with transaction.atomic():
+            for sibling_count in SIBLING_COUNTS:
+                results.append((sibling_count, *measure(sibling_count)))
+            raise Rollback()
+    except Rollback:
+        pass
+
+    ok = True
+    for sibling_count, statements, elapsed in results:
+        expected = ACCEPT_STATEMENT_COUNT if sibling_count else ACCEPT_STATEMENT_COUNT - 1
+        passed = statements == expected
+        ok = ok and passed
+        status = "✅" if passed else "❌"
+        print(
+            f"{status} accept with {sibling_count} competing negotiations: "
+            f"{statements} statements in {elapsed * 1000:.1f}ms (expected {expected})"
+        )
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run() else 1)
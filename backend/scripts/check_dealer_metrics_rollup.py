@@ -0,0 +1,174 @@
+"""
+Consistency and query-count check for the DealerMetrics rollups.
+
+Builds a dealer with negotiation activity spread over the last few days
+inside a transaction that is rolled back, rolls the past days up and then
+checks that:
+
+- the overview read from the rollups (plus today live) matches the same
+  metrics computed live over the whole period
+- the overview takes OVERVIEW_QUERY_COUNT queries however long the period
+- the daily trends add up to the overview
+
+Usage:
+    python scripts/check_dealer_metrics_rollup.py [days]
+"""
+import os
+import sys
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.analytics.services import AnalyticsService
+from apps.analytics.tasks import rollup_dealer_metrics
+from apps.dealers.models import Dealer
+from apps.negotiations.models import Negotiation, NegotiationEvent, Offer
+from apps.vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Rollup sum, today's offers, events, response times and vehicles, plus
+# distinct negotiated vehicles and active negotiations
+OVERVIEW_QUERY_COUNT = 7
+
+NEGOTIATIONS_PER_DAY = 3
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_activity(days: int):
+    suffix = uuid.uuid4().hex[:8]
+    dealer_user = User.objects.create_user(f'rollup_dealer_{suffix}@example.com', 'x', user_type='dealer')
+    dealer = Dealer.objects.create(
+        user=dealer_user,
+        business_name=f'Rollup Motors {suffix}',
+        license_number=f'RU{suffix}',
+    )
+    now = timezone.now()
+    today_start = AnalyticsService._day_bounds(timezone.localdate())[0]
+    elapsed = now - today_start
+    EventType = NegotiationEvent.EventType
+
+    for offset in range(days):
+        day_start = today_start - timedelta(days=offset)
+        offered_at = day_start + elapsed / 2
+        countered_at = offered_at + elapsed / 4
+        for i in range(NEGOTIATIONS_PER_DAY):
+            vehicle = Vehicle.objects.create(
+                dealer=dealer,
+                vin=f'RU{uuid.uuid4().hex[:15]}'.upper(),
+                make='TestMake',
+                model='TestModel',
+                year=2024,
+                msrp=Decimal('30000'),
+                floor_price=Decimal('25000'),
+                asking_price=Decimal('29000'),
+                status='active',
+            )
+            buyer = User.objects.create_user(
+                f'rollup_buyer_{suffix}_{offset}_{i}@example.com', 'x', user_type='buyer'
+            )
+            accepted = i == 0
+            negotiation = Negotiation.objects.create(
+                vehicle=vehicle,
+                buyer=buyer,
+                dealer=dealer,
+                status=Negotiation.Status.ACCEPTED if accepted else Negotiation.Status.ACTIVE,
+                accepted_price=Decimal('27000') + offset * 100 if accepted else None,
+                expires_at=now + timedelta(hours=72),
+            )
+            offers = [
+                Offer.objects.create(negotiation=negotiation, amount=Decimal('26000'),
+                                     offered_by=Offer.OfferedBy.BUYER),
+                Offer.objects.create(negotiation=negotiation, amount=Decimal('28000'),
+                                     offered_by=Offer.OfferedBy.DEALER),
+            ]
+            Offer.objects.filter(pk=offers[0].pk).update(created_at=offered_at)
+            Offer.objects.filter(pk=offers[1].pk).update(created_at=countered_at)
+            Negotiation.objects.filter(pk=negotiation.pk).update(created_at=offered_at)
+
+            events = [(EventType.STARTED, offered_at)]
+            if accepted:
+                events.append((EventType.OFFER_ACCEPTED, countered_at))
+            elif i == 1:
+                events.append((EventType.REJECTED, countered_at))
+            for event_type, created_at in events:
+                event = NegotiationEvent.objects.create(negotiation=negotiation, event_type=event_type)
+                NegotiationEvent.objects.filter(pk=event.pk).update(created_at=created_at)
+    return dealer
+
+
+def run(days: int) -> bool:
+    results = {}
+    try:
+        with transaction.atomic():
+            dealer = build_activity(days)
+            results['rows'] = rollup_dealer_metrics.apply(kwargs={'days': days - 1}).get()
+
+            with CaptureQueriesContext(connection) as ctx:
+                overview = AnalyticsService.get_dealer_overview(dealer, days)
+            results['queries'] = len(ctx.captured_queries)
+            with CaptureQueriesContext(connection) as ctx:
+                AnalyticsService.get_dealer_overview(dealer, 1)
+            results['queries_today'] = len(ctx.captured_queries)
+            results['overview'] = overview
+            results['trends'] = AnalyticsService.get_dealer_trends(dealer, days)
+
+            period_start = AnalyticsService._day_bounds(timezone.localdate() - timedelta(days=days - 1))[0]
+            results['live'] = AnalyticsService.compute_dealer_metrics(
+                period_start, timezone.now(), dealer_ids=[dealer.pk]
+            )[dealer.pk]
+            raise Rollback()
+    except Rollback:
+        pass
+
+    overview, live, trends = results['overview'], results['live'], results['trends']
+    rollup = (
+        overview['negotiations']['total'],
+        overview['negotiations']['accepted'],
+        overview['negotiations']['rejected'],
+        Decimal(str(overview['revenue']['total'])),
+        overview['performance']['avg_response_hours'],
+    )
+    expected = (
+        live['negotiations_started'],
+        live['offers_accepted'],
+        live['offers_rejected'],
+        live['total_revenue'],
+        round(float(live['avg_response_time_hours'] or 0), 1),
+    )
+    trend_total = sum(row['negotiations'] for row in trends)
+
+    checks = [
+        ('past days rolled up', results['rows'] == days - 1, f"{results['rows']} rows for {days - 1} days"),
+        ('rollups match live metrics', rollup == expected, f"{rollup} vs {expected}"),
+        ('overview query count', results['queries'] == OVERVIEW_QUERY_COUNT,
+         f"{results['queries']} queries for {days} days (expected {OVERVIEW_QUERY_COUNT})"),
+        ('query count independent of period', results['queries'] == results['queries_today'],
+         f"{results['queries_today']} queries for today only"),
+        ('trends add up', trend_total == overview['negotiations']['total'],
+         f"{trend_total} negotiations over {len(trends)} days"),
+    ]
+    ok = True
+    for name, passed, detail in checks:
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {name}: {detail}")
+    return ok
+
+
+if __name__ == '__main__':
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    sys.exit(0 if run(days) else 1)
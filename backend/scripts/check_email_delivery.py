@@ -0,0 +1,142 @@
+"""
+SMTP delivery check for notification emails.
+
+Starts a local SMTP stand-in (aiosmtpd, see requirements/development.txt),
+points the SMTP backend at it and runs send_notification_emails over a
+batch of throwaway notifications inside a transaction that is rolled back.
+The stand-in answers one message with a temporary 451 and one recipient
+with a permanent 550, so the run checks that:
+
+- the whole batch shares one SMTP connection per attempt
+- the transient failure is retried and then delivered
+- the permanent failure is recorded and not retried
+
+Usage:
+    python scripts/check_email_delivery.py [batch size]
+"""
+import os
+import sys
+import uuid
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+django.setup()
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    sys.exit("aiosmtpd is required: pip install aiosmtpd")
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test.utils import override_settings
+
+from apps.notifications.models import Notification
+from apps.notifications.tasks import send_notification_emails
+
+User = get_user_model()
+
+SMTP_PORT = 8025
+
+
+class FlakyHandler:
+    """Accepts mail, failing the second message once and refusing one address."""
+
+    def __init__(self, refused: str):
+        self.refused = refused
+        self.sessions = set()
+        self.delivered = []
+        self.data_calls = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == self.refused:
+            return '550 5.1.1 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.data_calls += 1
+        if self.data_calls == 2:
+            return '451 4.3.0 Try again later'
+        self.delivered.extend(envelope.rcpt_tos)
+        return '250 Message accepted'
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_notifications(count: int):
+    suffix = uuid.uuid4().hex[:8]
+    notifications = []
+    for i in range(count):
+        user = User.objects.create_user(f'smtp_{suffix}_{i}@example.com', 'x', user_type='buyer')
+        notifications.append(Notification.objects.create(
+            user=user,
+            notification_type=Notification.NotificationType.OFFER_REJECTED,
+            title='Offer not accepted',
+            message='Your offer was not accepted.',
+            data={'vehicle_title': '2024 Test Car', 'negotiation_id': str(uuid.uuid4())},
+            email_status=Notification.EmailStatus.PENDING,
+        ))
+    return notifications
+
+
+def run(count: int) -> bool:
+    results = {}
+    try:
+        with transaction.atomic():
+            notifications = build_notifications(count)
+            refused = notifications[-1].user.email
+            handler = FlakyHandler(refused)
+            controller = Controller(handler, hostname='127.0.0.1', port=SMTP_PORT)
+            controller.start()
+            try:
+                with override_settings(
+                    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                    EMAIL_HOST='127.0.0.1',
+                    EMAIL_PORT=SMTP_PORT,
+                    EMAIL_USE_TLS=False,
+                    EMAIL_HOST_USER='',
+                    EMAIL_HOST_PASSWORD='',
+                    NOTIFICATION_EMAIL_RETRY_BACKOFF=0,
+                ):
+                    send_notification_emails.apply(args=[[str(n.pk) for n in notifications]])
+            finally:
+                controller.stop()
+
+            statuses = dict(
+                Notification.objects.filter(pk__in=[n.pk for n in notifications])
+                .values_list('user__email', 'email_status')
+            )
+            results = {
+                'sessions': len(handler.sessions),
+                'delivered': len(set(handler.delivered)),
+                'sent': sum(1 for s in statuses.values() if s == Notification.EmailStatus.SENT),
+                'refused_status': statuses[refused],
+            }
+            raise Rollback()
+    except Rollback:
+        pass
+
+    checks = [
+        ('one connection per attempt', results['sessions'] == 2, f"{results['sessions']} sessions"),
+        ('transient failure delivered on retry', results['delivered'] == count - 1,
+         f"{results['delivered']} of {count - 1} delivered"),
+        ('sent recorded', results['sent'] == count - 1, f"{results['sent']} marked sent"),
+        ('permanent failure recorded', results['refused_status'] == Notification.EmailStatus.FAILED,
+         f"refused recipient is {results['refused_status']}"),
+    ]
+    ok = True
+    for name, passed, detail in checks:
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {name}: {detail}")
+    return ok
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sys.exit(0 if run(count) else 1)
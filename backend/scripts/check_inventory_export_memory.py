@@ -0,0 +1,129 @@
+"""
+Memory benchmark for the streaming inventory export.
+
+Builds throwaway inventories inside a transaction that is rolled back and
+streams GET /vehicles/my_inventory/export/ in both formats, recording the
+peak Python allocation while the response is consumed. The export reads
+through a server-side cursor, so the peak must stay roughly flat as the
+inventory grows.
+
+Usage:
+    python scripts/check_inventory_export_memory.py [small] [large]
+
+small should exceed INVENTORY_EXPORT_CHUNK_SIZE so both runs hold a full chunk.
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.dealers.models import Dealer
+from apps.vehicles.models import Vehicle
+from apps.vehicles.views import VehicleViewSet
+
+User = get_user_model()
+
+# Peak memory of the large export may be at most this multiple of the small one
+MAX_PEAK_RATIO = 1.5
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_inventory(count: int):
+    suffix = uuid.uuid4().hex[:8]
+    dealer_user = User.objects.create_user(f'export_dealer_{suffix}@example.com', 'x', user_type='dealer')
+    dealer = Dealer.objects.create(
+        user=dealer_user,
+        business_name=f'Export Motors {suffix}',
+        license_number=f'EX{suffix}',
+    )
+    Vehicle.objects.bulk_create(
+        [
+            Vehicle(
+                dealer=dealer,
+                vin=f'{suffix}{i:09d}'.upper(),
+                stock_number=f'{i:08d}',
+                make='TestMake',
+                model='TestModel',
+                year=2024,
+                body_type='sedan',
+                exterior_color='White',
+                interior_color='Black',
+                msrp=Decimal('30000'),
+                floor_price=Decimal('25000'),
+                asking_price=Decimal('29000'),
+                specifications={'mileage': i, 'transmission': 'automatic', 'fuel_type': 'gasoline'},
+                features=['Sunroof', 'Heated Seats'],
+                status='active',
+            )
+            for i in range(count)
+        ],
+        batch_size=2000
+    )
+    return dealer_user
+
+
+def measure_export(user, output: str):
+    factory = APIRequestFactory()
+    view = VehicleViewSet.as_view({'get': 'export_inventory'})
+    request = factory.get('/api/v1/vehicles/my_inventory/export/', {'output': output})
+    force_authenticate(request, user=user)
+
+    tracemalloc.start()
+    started = time.monotonic()
+    response = view(request)
+    assert response.status_code == 200, response.status_code
+    lines = 0
+    for _ in response.streaming_content:
+        lines += 1
+    elapsed = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lines, peak, elapsed
+
+
+def run(small: int, large: int) -> bool:
+    results = []
+    try:
+        with transaction.atomic():
+            for count in (small, large):
+                user = build_inventory(count)
+                for output in ('csv', 'ndjson'):
+                    results.append((output, count, *measure_export(user, output)))
+            raise Rollback()
+    except Rollback:
+        pass
+
+    ok = True
+    for output in ('csv', 'ndjson'):
+        (_, small_count, _, small_peak, _), (_, large_count, lines, large_peak, elapsed) = [
+            r for r in results if r[0] == output
+        ]
+        passed = large_peak <= small_peak * MAX_PEAK_RATIO
+        ok = ok and passed
+        status = "✅" if passed else "❌"
+        print(
+            f"{status} {output}: {large_count} rows ({lines} lines) in {elapsed:.2f}s, "
+            f"peak {large_peak / 1024:.0f} KiB vs {small_peak / 1024:.0f} KiB for {small_count} rows"
+        )
+    return ok
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    small, large = (args + [5000, 50000][len(args):])[:2]
+    sys.exit(0 if run(small, large) else 1)
@@ -0,0 +1,124 @@
+"""
+Query-count regression check for the negotiation detail endpoint.
+
+Builds throwaway data inside a transaction that is rolled back, then calls
+GET /negotiations/{id}/ as both participants with a short and a long offer
+history. The number of queries must match DETAIL_QUERY_COUNT exactly,
+regardless of how many offers or images the negotiation has.
+
+Usage:
+    python scripts/check_negotiation_queries.py
+"""
+import os
+import sys
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.dealers.models import Dealer
+from apps.negotiations.models import Negotiation, Offer
+from apps.negotiations.views import NegotiationViewSet
+from apps.vehicles.models import Vehicle, VehicleImage
+
+User = get_user_model()
+
+# Negotiation with its select_related rows, offers and vehicle images;
+# dealers also load their dealer profile for the participant lookup
+DETAIL_QUERY_COUNT = {'buyer': 3, 'dealer': 4}
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_negotiation(offer_count: int, image_count: int):
+    suffix = uuid.uuid4().hex[:8]
+    buyer = User.objects.create_user(f'qcount_buyer_{suffix}@example.com', 'x', user_type='buyer')
+    dealer_user = User.objects.create_user(f'qcount_dealer_{suffix}@example.com', 'x', user_type='dealer')
+    dealer = Dealer.objects.create(
+        user=dealer_user,
+        business_name=f'Query Count Motors {suffix}',
+        license_number=f'QC{suffix}',
+    )
+    vehicle = Vehicle.objects.create(
+        dealer=dealer,
+        vin=f'QC{uuid.uuid4().hex[:15]}'.upper(),
+        make='TestMake',
+        model='TestModel',
+        year=2024,
+        msrp=Decimal('30000'),
+        floor_price=Decimal('25000'),
+        asking_price=Decimal('29000'),
+        status='active',
+    )
+    for i in range(image_count):
+        VehicleImage.objects.create(vehicle=vehicle, image=f'vehicles/qc_{i}.jpg', is_primary=i == 0)
+
+    negotiation = Negotiation.objects.create(
+        vehicle=vehicle,
+        buyer=buyer,
+        dealer=dealer,
+        status=Negotiation.Status.ACTIVE,
+        expires_at=timezone.now() + timedelta(hours=72),
+    )
+    for i in range(offer_count):
+        Offer.objects.create(
+            negotiation=negotiation,
+            amount=Decimal('26000') + i * 100,
+            offered_by=Offer.OfferedBy.BUYER if i % 2 == 0 else Offer.OfferedBy.DEALER,
+            status=Offer.Status.PENDING if i == offer_count - 1 else Offer.Status.COUNTERED,
+        )
+    return negotiation, buyer, dealer_user
+
+
+def count_detail_queries(negotiation, user) -> int:
+    factory = APIRequestFactory()
+    view = NegotiationViewSet.as_view({'get': 'retrieve'})
+    # Fresh user instance so cached relations don't hide queries
+    user = User.objects.get(pk=user.pk)
+    request = factory.get(f'/api/v1/negotiations/{negotiation.id}/')
+    force_authenticate(request, user=user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = view(request, pk=negotiation.id)
+        response.render()
+    assert response.status_code == 200, response.data
+    return len(ctx.captured_queries)
+
+
+def run() -> bool:
+    results = []
+    try:
+        with transaction.atomic():
+            for offer_count, image_count in [(1, 1), (12, 6)]:
+                negotiation, buyer, dealer_user = build_negotiation(offer_count, image_count)
+                for role, user in [('buyer', buyer), ('dealer', dealer_user)]:
+                    results.append((offer_count, role, count_detail_queries(negotiation, user)))
+            raise Rollback()
+    except Rollback:
+        pass
+
+    ok = True
+    for offer_count, role, queries in results:
+        expected = DETAIL_QUERY_COUNT[role]
+        passed = queries == expected
+        ok = ok and passed
+        status = "✅" if passed else "❌"
+        print(f"{status} detail as {role} with {offer_count} offers: {queries} queries (expected {expected})")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run() else 1)
@@ -31,7 +31,7 @@ import {
     Eye,
     AlertCircle,
 } from 'lucide-react';
-import { vehicleApi } from '@/lib/api/vehicles';
+import apiClient from '@/lib/api/client';
 import { toast } from 'sonner';
 
 interface BuyerStats {
@@ -68,6 +68,7 @@ function BuyerDashboardContent() {
     const [stats, setStats] = useState<BuyerStats>({ active: 0, total: 0, accepted: 0, pending_response: 0 });
     const [negotiations, setNegotiations] = useState<Negotiation[]>([]);
     const [savedVehicles, setSavedVehicles] = useState<SavedVehicle[]>([]);
+    const [hasMoreSaved, setHasMoreSaved] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
 
     useEffect(() => {
@@ -88,9 +89,10 @@ function BuyerDashboardContent() {
                 const negsData = await negotiationApi.list();
                 setNegotiations((negsData.results || []).slice(0, 5));
 
-                // Fetch saved vehicles
-                const savedData = await vehicleApi.getSaved();
-                setSavedVehicles((savedData as any[]).slice(0, 3)); // Show top 3
+                // Fetch the 3 most recently saved vehicles (cursor-paginated, newest first)
+                const savedResponse = await apiClient.get('/vehicles/saved/', { params: { page_size: 3 } });
+                setSavedVehicles(savedResponse.data.results);
+                setHasMoreSaved(savedResponse.data.next !== null);
             } catch (error) {
                 console.error('Failed to fetch dashboard data:', error);
             } finally {
@@ -164,7 +166,7 @@ function BuyerDashboardContent() {
                     />
                     <StatCard
                         title="Saved Vehicles"
-                        value={savedVehicles.length}
+                        value={hasMoreSaved ? `${savedVehicles.length}+` : savedVehicles.length}
                         icon={<Heart className="w-6 h-6" />}
                         color="teal"
                         href="/saved"
@@ -35,36 +35,100 @@ import {
 } from '@/components/ui/dialog';
 import { EmptyState } from '@/components/ui/EmptyState';
 import { vehicleApi } from '@/lib/api/vehicles';
-import { Vehicle } from '@/lib/types/vehicle';
+import apiClient from '@/lib/api/client';
 import { formatPrice } from '@/lib/utils';
 
+// Row of GET /vehicles/my_inventory/ (slim inventory grid serializer)
+interface InventoryVehicle {
+    id: string;
+    title: string;
+    vin: string;
+    stock_number: string;
+    make: string;
+    model: string;
+    year: number;
+    trim?: string;
+    asking_price: number | string;
+    primary_image: string | null;
+    status: string;
+    created_at: string;
+}
+
+// Vehicle counts per status across the whole inventory, plus `total`
+type StatusCounts = Record<string, number>;
+
+interface InventoryPage {
+    count: number;
+    next: string | null;
+    previous: string | null;
+    results: InventoryVehicle[];
+    status_counts: StatusCounts;
+}
+
+const PAGE_SIZE = 20;
+const SEARCH_DEBOUNCE_MS = 300;
+
+const STATUS_OPTIONS = [
+    { value: 'active', label: 'Active' },
+    { value: 'draft', label: 'Draft' },
+    { value: 'pending_sale', label: 'Pending Sale' },
+    { value: 'sold', label: 'Sold' },
+    { value: 'inactive', label: 'Inactive' },
+];
+
 export default function DealerInventoryPage() {
     const router = useRouter();
     const searchParams = useSearchParams();
-    const [vehicles, setVehicles] = useState<Vehicle[]>([]);
+    const [vehicles, setVehicles] = useState<InventoryVehicle[]>([]);
+    const [totalCount, setTotalCount] = useState(0);
+    const [statusCounts, setStatusCounts] = useState<StatusCounts>({});
+    const [page, setPage] = useState(1);
     const [loading, setLoading] = useState(true);
     const [searchQuery, setSearchQuery] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
     const [statusFilter, setStatusFilter] = useState('all');
-    const [vehicleToDelete, setVehicleToDelete] = useState<Vehicle | null>(null);
+    const [vehicleToDelete, setVehicleToDelete] = useState<InventoryVehicle | null>(null);
     const [isDeleting, setIsDeleting] = useState(false);
 
+    // Search runs server-side; wait for typing to pause, then start from the first page
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setDebouncedSearch(searchQuery.trim());
+            setPage(1);
+        }, SEARCH_DEBOUNCE_MS);
+        return () => clearTimeout(timer);
+    }, [searchQuery]);
+
+    const handleStatusFilter = (value: string) => {
+        setStatusFilter(value);
+        setPage(1);
+    };
+
     const fetchInventory = useCallback(async () => {
         try {
             setLoading(true);
-            const data = await vehicleApi.getMyInventory();
-            setVehicles(data);
+            const params: Record<string, string | number> = { page, page_size: PAGE_SIZE };
+            if (statusFilter !== 'all') params.status = statusFilter;
+            if (debouncedSearch) params.q = debouncedSearch;
+            const response = await apiClient.get('/vehicles/my_inventory/', { params });
+            const data: InventoryPage = response.data;
+            setVehicles(data.results);
+            setTotalCount(data.count);
+            setStatusCounts(data.status_counts);
         } catch (error) {
             console.error('Failed to fetch inventory:', error);
             toast.error('Failed to load inventory');
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [page, statusFilter, debouncedSearch]);
 
     useEffect(() => {
         fetchInventory();
     }, [fetchInventory]);
 
+    const pageCount = Math.max(1, Math.ceil(totalCount / PAGE_SIZE));
+
     const handleStatusUpdate = async (id: string, newStatus: string, successMessage: string) => {
         try {
             await vehicleApi.update(id, { status: newStatus });
@@ -90,7 +154,12 @@ export default function DealerInventoryPage() {
             await vehicleApi.delete(vehicleToDelete.id);
             toast.success('Vehicle deleted successfully');
             setVehicleToDelete(null);
-            fetchInventory();
+            if (vehicles.length === 1 && page > 1) {
+                // Deleted the last row of the page; the refetch follows the page change
+                setPage(page - 1);
+            } else {
+                fetchInventory();
+            }
         } catch (error) {
             console.error('Failed to delete vehicle:', error);
             toast.error('Failed to delete vehicle');
@@ -99,17 +168,6 @@ export default function DealerInventoryPage() {
         }
     };
 
-    const filteredVehicles = vehicles.filter((vehicle) => {
-        const matchesSearch =
-            vehicle.make.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            vehicle.model.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            vehicle.year.toString().includes(searchQuery);
-
-        const matchesStatus = statusFilter === 'all' || vehicle.status === statusFilter;
-
-        return matchesSearch && matchesStatus;
-    });
-
     const getStatusColor = (status: string) => {
         switch (status) {
             case 'active': return 'bg-green-100 text-green-700 hover:bg-green-100';
@@ -134,24 +192,24 @@ export default function DealerInventoryPage() {
                         <div className="relative flex-1 max-w-sm">
                             <Search className="absolute left-2.5 top-2.5 h-4 w-4 text-muted-foreground" />
                             <Input
-                                placeholder="Search make, model, year..."
+                                placeholder="Search make, model, VIN, stock #..."
                                 className="pl-8"
                                 value={searchQuery}
                                 onChange={(e) => setSearchQuery(e.target.value)}
                             />
                         </div>
-                        <Select value={statusFilter} onValueChange={setStatusFilter}>
+                        <Select value={statusFilter} onValueChange={handleStatusFilter}>
                             <SelectTrigger className="w-[180px]">
                                 <Filter className="w-4 h-4 mr-2" />
                                 <SelectValue placeholder="Filter by status" />
                             </SelectTrigger>
                             <SelectContent>
-                                <SelectItem value="all">All Statuses</SelectItem>
-                                <SelectItem value="active">Active</SelectItem>
-                                <SelectItem value="draft">Draft</SelectItem>
-                                <SelectItem value="pending_sale">Pending Sale</SelectItem>
-                                <SelectItem value="sold">Sold</SelectItem>
-                                <SelectItem value="inactive">Inactive</SelectItem>
+                                <SelectItem value="all">All Statuses ({statusCounts.total ?? 0})</SelectItem>
+                                {STATUS_OPTIONS.map(({ value, label }) => (
+                                    <SelectItem key={value} value={value}>
+                                        {label} ({statusCounts[value] ?? 0})
+                                    </SelectItem>
+                                ))}
                             </SelectContent>
                         </Select>
                     </div>
@@ -179,10 +237,10 @@ export default function DealerInventoryPage() {
                                 <div key={i} className="h-12 bg-muted/20 animate-pulse rounded" />
                             ))}
                         </div>
-                    ) : filteredVehicles.length === 0 ? (
+                    ) : vehicles.length === 0 ? (
                         <EmptyState
                             title="No vehicles found"
-                            message={searchQuery ? "No vehicles match your search." : "You haven't listed any vehicles yet."}
+                            message={statusCounts.total ? "No vehicles match your search." : "You haven't listed any vehicles yet."}
                             actionLabel="Add your first vehicle"
                             actionLink="/dealer/inventory/new"
                         />
@@ -199,15 +257,15 @@ export default function DealerInventoryPage() {
                                     </tr>
                                 </thead>
                                 <tbody>
-                                    {filteredVehicles.map((vehicle) => (
+                                    {vehicles.map((vehicle) => (
                                         <tr key={vehicle.id} className="bg-card border-b border-border hover:bg-muted/50">
                                             <td className="px-6 py-4 font-medium text-gray-900 dark:text-white">
                                                 <div className="flex items-center gap-3">
                                                     {/* Image Thumbnail */}
                                                     <div className="w-10 h-10 rounded bg-gray-100 flex-shrink-0 overflow-hidden">
-                                                        {vehicle.images && vehicle.images.length > 0 ? (
+                                                        {vehicle.primary_image ? (
                                                             <img
-                                                                src={vehicle.images[0].image}
+                                                                src={vehicle.primary_image}
                                                                 alt={vehicle.model}
                                                                 className="w-full h-full object-cover"
                                                             />
@@ -299,6 +357,24 @@ export default function DealerInventoryPage() {
                         </div>
                     )}
                 </div>
+
+                {/* Pagination */}
+                {!loading && totalCount > PAGE_SIZE && (
+                    <div className="flex items-center justify-between text-sm text-muted-foreground">
+                        <span>
+                            {(page - 1) * PAGE_SIZE + 1}-{Math.min(page * PAGE_SIZE, totalCount)} of {totalCount} vehicles
+                        </span>
+                        <div className="flex items-center gap-2">
+                            <Button variant="outline" size="sm" onClick={() => setPage(page - 1)} disabled={page <= 1}>
+                                Previous
+                            </Button>
+                            <span>Page {page} of {pageCount}</span>
+                            <Button variant="outline" size="sm" onClick={() => setPage(page + 1)} disabled={page >= pageCount}>
+                                Next
+                            </Button>
+                        </div>
+                    </div>
+                )}
             </div>
 
             {/* Delete Confirmation Dialog */}
@@ -12,6 +12,7 @@ import { Skeleton } from '@/components/ui/skeleton';
 import { Heart, Trash2, ArrowRight, Search, AlertCircle } from 'lucide-react';
 import { DealBadge } from '@/components/ui/deal-badge';
 import { vehicleApi } from '@/lib/api/vehicles';
+import apiClient from '@/lib/api/client';
 import { toast } from 'sonner';
 import { type DealRating } from '@/lib/design-tokens';
 import { PageContainer } from '@/components/layout/PageContainer';
@@ -31,17 +32,27 @@ interface SavedVehicleData {
         asking_price: number | string;
         msrp: number | string;
         primary_image?: string;
+        mileage?: number;
         dealer?: {
             city?: string;
             state?: string;
         };
-        specifications?: {
-            mileage?: number;
-        };
     };
     created_at: string;
 }
 
+// GET /vehicles/saved/ is cursor-paginated, newest first
+interface SavedVehiclesPage {
+    next: string | null;
+    previous: string | null;
+    results: SavedVehicleData[];
+}
+
+// Cursor for the page after this one, read from the `next` link
+function nextCursor(next: string | null): string | null {
+    return next ? new URL(next).searchParams.get('cursor') : null;
+}
+
 // Calculate deal rating based on discount percentage
 function calculateDealRating(asking: number, msrp: number): DealRating {
     if (msrp <= 0) return 'fair';
@@ -54,15 +65,19 @@ function calculateDealRating(asking: number, msrp: number): DealRating {
 
 function SavedVehiclesContent() {
     const [savedVehicles, setSavedVehicles] = useState<SavedVehicleData[]>([]);
+    const [cursor, setCursor] = useState<string | null>(null);
     const [isLoading, setIsLoading] = useState(true);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [error, setError] = useState<string | null>(null);
 
     const fetchSavedVehicles = async () => {
         try {
             setIsLoading(true);
             setError(null);
-            const data = await vehicleApi.getSaved();
-            setSavedVehicles(data as SavedVehicleData[]);
+            const response = await apiClient.get('/vehicles/saved/');
+            const page: SavedVehiclesPage = response.data;
+            setSavedVehicles(page.results);
+            setCursor(nextCursor(page.next));
         } catch (err) {
             console.error('Failed to fetch saved vehicles:', err);
             setError('Failed to load saved vehicles');
@@ -71,6 +86,22 @@ function SavedVehiclesContent() {
         }
     };
 
+    const fetchMore = async () => {
+        if (!cursor) return;
+        try {
+            setIsLoadingMore(true);
+            const response = await apiClient.get('/vehicles/saved/', { params: { cursor } });
+            const page: SavedVehiclesPage = response.data;
+            setSavedVehicles(prev => [...prev, ...page.results]);
+            setCursor(nextCursor(page.next));
+        } catch (err) {
+            console.error('Failed to fetch more saved vehicles:', err);
+            toast.error('Failed to load more vehicles');
+        } finally {
+            setIsLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         fetchSavedVehicles();
     }, []);
@@ -97,7 +128,7 @@ function SavedVehiclesContent() {
             <div className="mb-8">
                 <h1 className="text-3xl font-bold font-display text-foreground">Saved Vehicles</h1>
                 <p className="text-muted-foreground mt-1">
-                    {savedVehicles.length} vehicles saved
+                    {savedVehicles.length}{cursor ? '+' : ''} vehicles saved
                 </p>
             </div>
 
@@ -141,7 +172,7 @@ function SavedVehiclesContent() {
                         const msrpPrice = Number(vehicle.msrp);
                         const dealRating = calculateDealRating(askingPrice, msrpPrice);
                         const title = vehicle.title || `${vehicle.year} ${vehicle.make} ${vehicle.model}`;
-                        const mileage = vehicle.specifications?.mileage || 0;
+                        const mileage = vehicle.mileage || 0;
                         const location = vehicle.dealer
                             ? `${vehicle.dealer.city || ''}, ${vehicle.dealer.state || ''}`.replace(/^, |, $/g, '')
                             : '';
@@ -220,6 +251,15 @@ function SavedVehiclesContent() {
                     })}
                 </div>
             )}
+
+            {/* Next page */}
+            {!isLoading && !error && cursor && (
+                <div className="flex justify-center mt-8">
+                    <Button variant="outline" onClick={fetchMore} disabled={isLoadingMore}>
+                        {isLoadingMore ? 'Loading...' : 'Load more'}
+                    </Button>
+                </div>
+            )}
         </PageContainer>
     );
 }
@@ -85,15 +85,15 @@ function VehiclesPageContent() {
         fetchVehicles(1);
     }, [fetchVehicles]);
 
-    // Fetch saved vehicles only if user has a token (simple check to avoid 401 redirect)
+    // Look up saved state for the loaded vehicles only if user has a token (simple check to avoid 401 redirect)
     useEffect(() => {
         // We can check if a token exists in localStorage or use auth store
         // simpler here to just let the header handle auth state, but we need to know if we should fetch
         const token = localStorage.getItem('paylesscars_access_token');
-        if (token) {
-            fetchSavedVehicles();
+        if (token && vehicles.length > 0) {
+            fetchSavedVehicles(vehicles.map(vehicle => vehicle.id));
         }
-    }, [fetchSavedVehicles]);
+    }, [vehicles, fetchSavedVehicles]);
 
     // Sort vehicles based on selected option
     const sortedVehicles = [...vehicles].sort((a, b) => {
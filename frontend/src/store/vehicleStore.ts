@@ -4,6 +4,10 @@
 import { create } from 'zustand';
 import type { Vehicle, VehicleFilters } from '@/lib/types/vehicle';
 import { vehicleApi } from '@/lib/api';
+import apiClient from '@/lib/api/client';
+
+// Ids per GET /vehicles/saved/contains/ request (server limit)
+const SAVED_LOOKUP_BATCH = 100;
 
 interface VehicleState {
     vehicles: Vehicle[];
@@ -14,7 +18,7 @@ interface VehicleState {
     totalCount: number;
     currentPage: number;
     hasMore: boolean;
-    savedVehicles: string[]; // IDs of saved vehicles
+    savedVehicles: string[]; // IDs of saved vehicles among those looked up
     savedVehiclesLoaded: boolean;
 
     // Actions
@@ -25,7 +29,7 @@ interface VehicleState {
     searchVehicles: (query: string) => Promise<void>;
     saveVehicle: (id: string) => Promise<void>;
     unsaveVehicle: (id: string) => Promise<void>;
-    fetchSavedVehicles: () => Promise<void>;
+    fetchSavedVehicles: (vehicleIds: string[]) => Promise<void>;
     clearError: () => void;
     reset: () => void;
 }
@@ -93,7 +97,7 @@ export const useVehicleStore = create<VehicleState>((set, get) => ({
         }
     },
 
-    fetchSavedVehicles: async () => {
+    fetchSavedVehicles: async (vehicleIds: string[]) => {
         // Check if user is authenticated before fetching saved vehicles
         const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null;
         if (!token) {
@@ -102,14 +106,26 @@ export const useVehicleStore = create<VehicleState>((set, get) => ({
             return;
         }
 
+        // Ask only about the given vehicles rather than paging through the saved list
+        const ids = Array.from(new Set(vehicleIds));
         try {
-            const saved = await vehicleApi.getSaved();
-            const savedIds = saved.map(sv => sv.vehicle.id);
+            const lookups = [];
+            for (let i = 0; i < ids.length; i += SAVED_LOOKUP_BATCH) {
+                const batch = ids.slice(i, i + SAVED_LOOKUP_BATCH);
+                lookups.push(apiClient.get('/vehicles/saved/contains/', { params: { ids: batch.join(',') } }));
+            }
+            const responses = await Promise.all(lookups);
+            const saved: Record<string, boolean> = Object.assign(
+                {},
+                ...responses.map(response => response.data.saved)
+            );
+            const savedIds = get().savedVehicles.filter(id => !(id in saved));
+            savedIds.push(...ids.filter(id => saved[id]));
             set({ savedVehicles: savedIds, savedVehiclesLoaded: true });
         } catch (error) {
             // Silently handle errors for guests/expired tokens
             console.error('Failed to fetch saved vehicles:', error);
-            set({ savedVehicles: [], savedVehiclesLoaded: true });
+            set({ savedVehiclesLoaded: true });
         }
     },
 